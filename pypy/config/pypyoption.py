@@ -227,6 +227,11 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                    "use specialised tuples",
                    default=False),
 
+        BoolOption("withunboxedtuple",
+                   "store tuples of 3 or more ints or floats unboxed",
+                   default=False,
+                   requires=[("objspace.std.withspecialisedtuple", True)]),
+
         BoolOption("withliststrategies",
                    "enable optimized ways to store lists of primitives ",
                    default=True),
@@ -45,6 +45,8 @@ PYTHONIOENCODING: Encoding[:errors] used for stdin/stdout/stderr.
 PYPY_IRC_TOPIC: if set to a non-empty value, print a random #pypy IRC
                topic at startup of interactive mode.
 PYPYLOG: If set to a non-empty value, enable logging.
+PYPYSTARTUPIMAGE: file written by __pypy__.save_startup_image(); the
+               modules it contains are imported from it.
 """
 
 try:
@@ -595,6 +597,15 @@ def run_command_line(interactive,
     mainmodule = type(sys)('__main__')
     sys.modules['__main__'] = mainmodule
 
+    startup_image = not ignore_environment and os.getenv('PYPYSTARTUPIMAGE')
+    if startup_image:
+        try:
+            from __pypy__ import load_startup_image
+            load_startup_image(startup_image)
+        except:
+            print >> sys.stderr, "loading the startup image %r failed" % (
+                startup_image,)
+
     if not no_site:
         try:
             import site
@@ -64,6 +64,7 @@ class Block(object):
     marked = False
     have_return = False
     auto_inserted_return = False
+    position = -1       # index in the list of blocks, see _optimize_blocks()
 
     def __init__(self):
         self.instructions = []
@@ -310,6 +311,24 @@ class PythonCodeMaker(ast.ASTVisitor):
             self.lineno = lineno
             self.lineno_set = False
 
+    def _optimize_blocks(self, blocks):
+        """Peephole optimizations on the blocks in post order: remove the
+        instructions following an unconditional exit, make jumps go
+        directly to the final target of a chain of unconditional jumps,
+        replace STORE_FAST x; LOAD_FAST x with DUP_TOP; STORE_FAST x, and
+        finally drop the blocks that are no longer reachable.  Returns the
+        new list of blocks.
+        """
+        for i in range(len(blocks)):
+            blocks[i].position = i
+        for block in blocks:
+            _remove_dead_instructions(block)
+            for instr in block.instructions:
+                if instr.has_jump and instr.opcode in _THREADABLE_JUMPS:
+                    _thread_jump(block, instr)
+            _replace_store_load(block)
+        return _reachable_blocks(blocks)
+
     def _resolve_block_targets(self, blocks):
         """Compute the arguments of jump instructions."""
         last_extended_arg_count = 0
@@ -333,16 +352,11 @@ class PythonCodeMaker(ast.ASTVisitor):
                     if instr.has_jump:
                         target, absolute = instr.jump
                         op = instr.opcode
-                        # Optimize an unconditional jump going to another
-                        # unconditional jump.
+                        # Jumps to jumps are threaded by _optimize_blocks().
                         if op == ops.JUMP_ABSOLUTE or op == ops.JUMP_FORWARD:
                             if target.instructions:
                                 target_op = target.instructions[0].opcode
-                                if target_op == ops.JUMP_ABSOLUTE:
-                                    target = target.instructions[0].jump[0]
-                                    instr.opcode = ops.JUMP_ABSOLUTE
-                                    absolute = True
-                                elif target_op == ops.RETURN_VALUE:
+                                if target_op == ops.RETURN_VALUE:
                                     # Replace JUMP_* to a RETURN into
                                     # just a RETURN
                                     instr.opcode = ops.RETURN_VALUE
@@ -506,6 +520,7 @@ class PythonCodeMaker(ast.ASTVisitor):
             else:
                 self.first_lineno = 1
         blocks = self.first_block.post_order()
+        blocks = self._optimize_blocks(blocks)
         self._resolve_block_targets(blocks)
         lnotab = self._build_lnotab(blocks)
         stack_depth = self._stacksize(blocks)
@@ -534,6 +549,107 @@ class PythonCodeMaker(ast.ASTVisitor):
                       self.compile_info.hidden_applevel)
 
 
+_UNCONDITIONAL_EXITS = (ops.JUMP_ABSOLUTE, ops.JUMP_FORWARD,
+                        ops.RETURN_VALUE, ops.RAISE_VARARGS)
+
+_THREADABLE_JUMPS = (ops.JUMP_ABSOLUTE, ops.JUMP_FORWARD,
+                     ops.POP_JUMP_IF_FALSE, ops.POP_JUMP_IF_TRUE,
+                     ops.JUMP_IF_FALSE_OR_POP, ops.JUMP_IF_TRUE_OR_POP)
+
+# bound on the length of the chains of jumps followed, which also stops
+# on loops like "while 1: pass"
+_MAX_THREADED_JUMPS = 20
+
+
+def _remove_dead_instructions(block):
+    """Remove the instructions following an unconditional exit of the
+    block: they can't be reached, as jumps only go to the start of
+    blocks."""
+    instrs = block.instructions
+    for i in range(len(instrs) - 1):
+        if instrs[i].opcode in _UNCONDITIONAL_EXITS:
+            del instrs[i + 1:]
+            break
+
+
+def _final_jump_target(target, follow_back_edges):
+    for i in range(_MAX_THREADED_JUMPS):
+        if not target.instructions:
+            if target.next_block is None:
+                break
+            target = target.next_block
+            continue
+        first = target.instructions[0]
+        if first.opcode != ops.JUMP_ABSOLUTE and first.opcode != ops.JUMP_FORWARD:
+            break
+        next_target = first.jump[0]
+        if not follow_back_edges and next_target.position <= target.position:
+            break
+        target = next_target
+    return target
+
+
+def _thread_jump(block, instr):
+    """Make the jump go directly where the chain of unconditional jumps
+    starting at its target ends.  A conditional jump is not threaded
+    through a backward JUMP_ABSOLUTE: that is where the JIT notices the
+    loops, and it must still be reached from all the paths of the loop
+    body.  An unconditional jump can be, because it becomes a backward
+    JUMP_ABSOLUTE itself."""
+    target, absolute = instr.jump
+    unconditional = (instr.opcode == ops.JUMP_ABSOLUTE or
+                     instr.opcode == ops.JUMP_FORWARD)
+    final = _final_jump_target(target, unconditional)
+    if final is not target:
+        if instr.opcode == ops.JUMP_FORWARD and final.position <= block.position:
+            # the final target is before us.  Forward jumps must stay
+            # JUMP_FORWARDs: the JIT sees the targets of JUMP_ABSOLUTE as
+            # possible loop headers.
+            instr.opcode = ops.JUMP_ABSOLUTE
+            absolute = True
+        instr.jump = (final, absolute)
+
+
+def _replace_store_load(block):
+    """STORE_FAST x; LOAD_FAST x  ==>  DUP_TOP; STORE_FAST x
+
+    Only done if the LOAD_FAST doesn't start a new line, to keep the line
+    events of tracing unchanged."""
+    instrs = block.instructions
+    for i in range(len(instrs) - 1):
+        store = instrs[i]
+        load = instrs[i + 1]
+        if (store.opcode == ops.STORE_FAST and load.opcode == ops.LOAD_FAST and
+                store.arg == load.arg and load.lineno == 0):
+            load.opcode = ops.STORE_FAST
+            store.opcode = ops.DUP_TOP
+            store.arg = 0
+
+
+def _reachable_blocks(blocks):
+    """Return the blocks reachable from the first one, in the same order.
+    Control only falls through to the next block if the last instruction
+    isn't an unconditional exit."""
+    seen = {blocks[0]: None}
+    pending = [blocks[0]]
+    while pending:
+        block = pending.pop()
+        falls_through = True
+        for instr in block.instructions:
+            if instr.has_jump:
+                target = instr.jump[0]
+                if target not in seen:
+                    seen[target] = None
+                    pending.append(target)
+            if instr.opcode in _UNCONDITIONAL_EXITS:
+                falls_through = False
+        next_block = block.next_block
+        if falls_through and next_block is not None and next_block not in seen:
+            seen[next_block] = None
+            pending.append(next_block)
+    return [block for block in blocks if block in seen]
+
+
 def _list_from_dict(d, offset=0):
     result = [None] * len(d)
     for obj, index in d.iteritems():
@@ -491,7 +491,15 @@ class PythonCodeGenerator(assemble.PythonCodeMaker):
         end = self.new_block()
         self.emit_jump(ops.SETUP_LOOP, end)
         self.push_frame_block(F_BLOCK_LOOP, start)
-        fr.iter.walkabout(self)
+        w_const = None
+        iter = fr.iter
+        if isinstance(iter, ast.List):
+            # iterate over a list of constants as over a constant tuple
+            w_const = self._tuple_of_consts(iter.elts)
+        if w_const is not None:
+            self.load_const(w_const)
+        else:
+            fr.iter.walkabout(self)
         self.emit_op(ops.GET_ITER)
         self.use_next_block(start)
         # This adds another line, so each for iteration can be traced.
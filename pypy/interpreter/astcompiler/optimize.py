@@ -272,6 +272,13 @@ class OptimizingVisitor(ast.ASTVisitor):
             if name.ctx == ast.Load:
                 return ast.Const(self.space.w_None, name.lineno,
                                  name.col_offset)
+        elif name.id == "__debug__":
+            # Same for __debug__, which can't be assigned to either and is
+            # always True on PyPy: no LOAD_GLOBAL, and "if __debug__:" is
+            # folded away.
+            if name.ctx == ast.Load:
+                return ast.Const(self.space.w_True, name.lineno,
+                                 name.col_offset)
         return name
 
     def visit_Tuple(self, tup):
@@ -24,6 +24,7 @@ def generate_function_code(expr, space):
     generator = codegen.FunctionCodeGenerator(
         space, 'function', function_ast, 1, symbols, info)
     blocks = generator.first_block.post_order()
+    blocks = generator._optimize_blocks(blocks)
     generator._resolve_block_targets(blocks)
     return generator, blocks
 
@@ -1189,6 +1190,94 @@ class TestOptimizations:
             assert ops.BUILD_SET not in counts
             assert ops.LOAD_CONST in counts
 
+    def test_folding_of_list_constants_in_for(self):
+        source = """def f():
+            for x in [1, 2, 3]:
+                pass
+        """
+        counts = self.count_instructions(source)
+        assert ops.BUILD_LIST not in counts
+        source = """def f(y):
+            for x in [1, y]:
+                pass
+        """
+        counts = self.count_instructions(source)
+        assert counts[ops.BUILD_LIST] == 1
+
+    def test_fold_debug(self):
+        source = """def f():
+            if __debug__:
+                return 1
+            return 2
+        """
+        counts = self.count_instructions(source)
+        assert counts == {ops.LOAD_CONST: 1, ops.RETURN_VALUE: 1}
+
+    def test_thread_jumps(self):
+        source = """def f(x, y):
+            if x:
+                if y:
+                    a = 1
+                else:
+                    a = 2
+            else:
+                a = 3
+            return a
+        """
+        code, blocks = generate_function_code(source, self.space)
+        for block in blocks:
+            for instr in block.instructions:
+                if instr.has_jump:
+                    target = instr.jump[0]
+                    assert (not target.instructions or
+                            target.instructions[0].opcode not in
+                                (ops.JUMP_FORWARD, ops.JUMP_ABSOLUTE))
+
+    def test_dont_thread_conditional_jumps_to_loop_start(self):
+        # the JUMP_ABSOLUTE at the end of the loop body must stay reachable
+        # from the "if" too, because that's where the JIT sees the loop
+        source = """def f(l):
+            for x in l:
+                if x:
+                    g()
+        """
+        code, blocks = generate_function_code(source, self.space)
+        jumps = [instr for block in blocks for instr in block.instructions
+                 if instr.opcode == ops.POP_JUMP_IF_FALSE]
+        assert len(jumps) == 1
+        target = jumps[0].jump[0]
+        assert target.instructions[0].opcode == ops.JUMP_ABSOLUTE
+
+    def test_remove_dead_code_after_jump(self):
+        source = """def f(l):
+            for x in l:
+                if x:
+                    continue
+                g()
+        """
+        code, blocks = generate_function_code(source, self.space)
+        for block in blocks:
+            for instr in block.instructions[:-1]:
+                assert instr.opcode not in (ops.JUMP_FORWARD,
+                                            ops.JUMP_ABSOLUTE,
+                                            ops.RETURN_VALUE)
+
+    def test_store_load_fast(self):
+        source = """def f(l):
+            return [x for x in l]
+        """
+        counts = self.count_instructions(source)
+        assert counts[ops.DUP_TOP] == 1
+        assert counts[ops.STORE_FAST] == 1
+        assert counts[ops.LOAD_FAST] == 1      # only 'l'
+        # not if the LOAD_FAST starts a new statement, for tracing
+        source = """def f():
+            x = 5; return x
+        """
+        counts = self.count_instructions(source)
+        assert counts == {ops.LOAD_CONST: 1, ops.STORE_FAST: 1,
+                          ops.LOAD_FAST: 1, ops.RETURN_VALUE: 1}
+
     def test_dont_fold_huge_powers(self):
         for source in (
             "2 ** 3000",         # not constant-folded: too big
@@ -949,8 +949,14 @@ class __extend__(pyframe.PyFrame):
             from pypy.objspace.std.mapdict import LOAD_ATTR_caching
             w_value = LOAD_ATTR_caching(self.getcode(), w_obj, nameindex)
         else:
-            w_attributename = self.getname_w(nameindex)
-            w_value = self.space.getattr(w_obj, w_attributename)
+            from pypy.objspace.std.mapdict import (
+                LOAD_ATTR_is_megamorphic, LOAD_ATTR_megamorphic)
+            if LOAD_ATTR_is_megamorphic(self.getcode(), nameindex):
+                w_value = LOAD_ATTR_megamorphic(self.getcode(), w_obj,
+                                                nameindex)
+            else:
+                w_attributename = self.getname_w(nameindex)
+                w_value = self.space.getattr(w_obj, w_attributename)
         self.pushvalue(w_value)
 
     @jit.unroll_safe
@@ -71,6 +71,8 @@ class Module(MixedModule):
     """ PyPy specific "magic" functions. A lot of them are experimental and
     subject to change, many are internal. """
     appleveldefs = {
+        'save_startup_image'        : 'app_startup_image.save_startup_image',
+        'load_startup_image'        : 'app_startup_image.load_startup_image',
     }
 
     interpleveldefs = {
@@ -78,6 +80,7 @@ class Module(MixedModule):
         'internal_repr'             : 'interp_magic.internal_repr',
         'bytebuffer'                : 'bytebuffer.bytebuffer',
         'identity_dict'             : 'interp_identitydict.W_IdentityDict',
+        'columnar_list'             : 'interp_columnar.W_ColumnarList',
         'debug_start'               : 'interp_debug.debug_start',
         'debug_print'               : 'interp_debug.debug_print',
         'debug_stop'                : 'interp_debug.debug_stop',
@@ -0,0 +1,206 @@
+""" Startup images: the code objects of a chosen set of modules are saved
+in a single file, and a later run of the interpreter imports these modules
+from that file instead of searching sys.path and reading one source or .pyc
+file per module.  The module bodies are still executed normally.
+
+The entries whose source file has been modified since the image was written
+are ignored, and so is the whole image if it was made by an interpreter
+with a different bytecode format.  So are the entries whose directory is
+not on the search path any more: sys.path for the top-level modules, the
+__path__ of the package for the others, and the entries that a normal
+import would find elsewhere: in a directory that comes earlier on the
+search path (looked up with imp.find_module(), which uses the cached
+directory listings of the import machinery), in a zip file or other
+non-directory entry that comes earlier, or among the built-in modules.
+
+The code of each module is stored marshalled on its own, and only
+unmarshalled when the module is imported.
+"""
+
+_IMAGE_TAG = 'pypy-startup-image-2'
+
+
+def _search_dir(filename, is_package):
+    # the directory where the import machinery finds this module
+    import os
+    dirname = os.path.dirname(os.path.abspath(filename))
+    if is_package:
+        dirname = os.path.dirname(dirname)
+    return dirname
+
+
+def _source_of(module):
+    import os
+    filename = getattr(module, '__file__', None)
+    if not isinstance(filename, str):
+        return None
+    if filename.endswith(('.pyc', '.pyo')):
+        filename = filename[:-1]
+    if not filename.endswith('.py') or not os.path.isfile(filename):
+        return None
+    return filename
+
+
+class StartupImageImporter(object):
+    """A sys.meta_path importer serving the modules of a startup image."""
+
+    def __init__(self, filename, entries):
+        self.filename = filename
+        self.entries = entries
+        self._path_key = None
+        self._path_dirs = None
+        self._path_first_nondir = 0
+        self._busy = False
+
+    def __repr__(self):
+        return '<StartupImageImporter %r, %d modules>' % (self.filename,
+                                                          len(self.entries))
+
+    def _search_dirs(self, path):
+        # a dict mapping the absolute directories of 'path', or sys.path,
+        # to their first index in it; recomputed only when the list changes
+        import os, sys
+        if path is None:
+            path = sys.path
+        key = tuple(path)
+        if key != self._path_key:
+            dirs = {}
+            first_nondir = len(key)
+            for i in range(len(key)):
+                dirname = key[i]
+                if not isinstance(dirname, str):
+                    first_nondir = min(first_nondir, i)
+                    continue
+                if os.path.isfile(dirname):
+                    # a zip file, for example: it may contain anything
+                    first_nondir = min(first_nondir, i)
+                dirs.setdefault(os.path.abspath(dirname), i)
+            self._path_key = key
+            self._path_dirs = dirs
+            self._path_first_nondir = first_nondir
+        return self._path_dirs
+
+    def _found_earlier(self, fullname, path, index):
+        # would a normal import find 'fullname' before the index'th entry
+        # of the search path?
+        import imp, sys
+        if path is None and fullname in sys.builtin_module_names:
+            return True
+        if index == 0:
+            return False
+        if index > self._path_first_nondir:
+            return True
+        try:
+            f, _, _ = imp.find_module(fullname.rpartition('.')[2],
+                                      list(self._path_key[:index]))
+        except ImportError:
+            return False
+        if f is not None:
+            f.close()
+        return True
+
+    def find_module(self, fullname, path=None):
+        if self._busy:
+            # an import done by the checks below, like 'os' at startup:
+            # use the normal import instead of recursing
+            return None
+        if fullname not in self.entries:
+            return None
+        self._busy = True
+        try:
+            return self._find_module(fullname, path)
+        finally:
+            self._busy = False
+
+    def _find_module(self, fullname, path):
+        import os
+        entry = self.entries[fullname]
+        is_package, filename, mtime, size, search_dir, code = entry
+        index = self._search_dirs(path).get(search_dir, -1)
+        if index < 0:
+            return None     # not on the search path (any more, or yet)
+        if self._found_earlier(fullname, path, index):
+            return None     # shadowed by another module of the same name
+        try:
+            st = os.stat(filename)
+        except OSError:
+            st = None
+        if st is None or int(st.st_mtime) != mtime or st.st_size != size:
+            del self.entries[fullname]      # stale, use the normal import
+            return None
+        return self
+
+    def load_module(self, fullname):
+        import sys
+        if fullname in sys.modules:
+            return sys.modules[fullname]
+        import marshal
+        is_package, filename, mtime, size, search_dir, code = (
+            self.entries.pop(fullname))
+        code = marshal.loads(code)
+        module = type(sys)(fullname)
+        module.__file__ = filename
+        if is_package:
+            import os
+            module.__path__ = [os.path.dirname(filename)]
+        sys.modules[fullname] = module
+        try:
+            exec code in module.__dict__
+        except:
+            sys.modules.pop(fullname, None)
+            raise
+        return sys.modules[fullname]
+
+
+def save_startup_image(filename, modules=()):
+    """save_startup_image(filename, modules=())
+
+    Import the given modules, then write the code of every module currently
+    in sys.modules that was loaded from a .py file (or its .pyc) to the
+    given file.  Start the interpreter with PYPYSTARTUPIMAGE=filename to
+    use it.  Returns the sorted list of the names of the saved modules."""
+    import sys
+    import os
+    import marshal
+    from __pypy__ import PYC_MAGIC
+    for name in modules:
+        __import__(name)
+    entries = {}
+    for name, module in sys.modules.items():
+        if module is None or name == '__main__':
+            continue
+        source = _source_of(module)
+        if source is None:
+            continue
+        with open(source, 'U') as f:
+            code = compile(f.read(), source, 'exec', 0, True)
+        st = os.stat(source)
+        is_package = (hasattr(module, '__path__') and
+                      os.path.basename(source) == '__init__.py')
+        entries[name] = (is_package, source, int(st.st_mtime), st.st_size,
+                         _search_dir(source, is_package),
+                         marshal.dumps(code))
+    with open(filename, 'wb') as f:
+        marshal.dump((_IMAGE_TAG, PYC_MAGIC, entries), f)
+    return sorted(entries)
+
+
+def load_startup_image(filename):
+    """load_startup_image(filename)
+
+    Read a file written by save_startup_image() and install an importer in
+    front of sys.meta_path that serves the modules it contains.  Returns
+    the importer, or None if the image was made by an incompatible
+    interpreter."""
+    import sys
+    import marshal
+    from __pypy__ import PYC_MAGIC
+    with open(filename, 'rb') as f:
+        data = f.read()
+    image = marshal.loads(data)
+    if (not isinstance(image, tuple) or len(image) != 3 or
+            image[0] != _IMAGE_TAG or image[1] != PYC_MAGIC):
+        return None
+    importer = StartupImageImporter(filename, image[2])
+    sys.meta_path.insert(0, importer)
+    return importer
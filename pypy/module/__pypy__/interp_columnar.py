@@ -0,0 +1,328 @@
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import interp2app
+from pypy.interpreter.typedef import TypeDef
+from pypy.objspace.std.floatobject import W_FloatObject
+from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.mapdict import DICT, PlainAttribute, DictTerminator
+from pypy.objspace.std.objectobject import W_ObjectObject
+
+
+class Column(object):
+    """ The values of one attribute of all the objects of a columnar_list """
+    def append(self, w_value):
+        """ Returns False if 'w_value' cannot be stored in this column """
+        raise NotImplementedError("abstract base class")
+
+    def setitem(self, index, w_value):
+        raise NotImplementedError("abstract base class")
+
+    def getitem(self, space, index):
+        raise NotImplementedError("abstract base class")
+
+    def length(self):
+        raise NotImplementedError("abstract base class")
+
+    def w_column(self, space):
+        raise NotImplementedError("abstract base class")
+
+    def generalized(self, space):
+        """ Returns an ObjectColumn with the same content """
+        values_w = [self.getitem(space, i) for i in range(self.length())]
+        return ObjectColumn(values_w)
+
+
+class IntColumn(Column):
+    def __init__(self, values):
+        self.values = values
+
+    def append(self, w_value):
+        if type(w_value) is not W_IntObject:
+            return False
+        self.values.append(w_value.intval)
+        return True
+
+    def setitem(self, index, w_value):
+        if type(w_value) is not W_IntObject:
+            return False
+        self.values[index] = w_value.intval
+        return True
+
+    def getitem(self, space, index):
+        return space.newint(self.values[index])
+
+    def length(self):
+        return len(self.values)
+
+    def w_column(self, space):
+        return space.newlist_int(self.values[:])
+
+
+class FloatColumn(Column):
+    def __init__(self, values):
+        self.values = values
+
+    def append(self, w_value):
+        if type(w_value) is not W_FloatObject:
+            return False
+        self.values.append(w_value.floatval)
+        return True
+
+    def setitem(self, index, w_value):
+        if type(w_value) is not W_FloatObject:
+            return False
+        self.values[index] = w_value.floatval
+        return True
+
+    def getitem(self, space, index):
+        return space.newfloat(self.values[index])
+
+    def length(self):
+        return len(self.values)
+
+    def w_column(self, space):
+        return space.newlist_float(self.values[:])
+
+
+class ObjectColumn(Column):
+    def __init__(self, values_w):
+        self.values_w = values_w
+
+    def append(self, w_value):
+        self.values_w.append(w_value)
+        return True
+
+    def setitem(self, index, w_value):
+        self.values_w[index] = w_value
+        return True
+
+    def getitem(self, space, index):
+        return self.values_w[index]
+
+    def length(self):
+        return len(self.values_w)
+
+    def w_column(self, space):
+        return space.newlist(self.values_w[:])
+
+    def generalized(self, space):
+        return self
+
+
+def new_column(w_value):
+    if type(w_value) is W_IntObject:
+        return IntColumn([])
+    if type(w_value) is W_FloatObject:
+        return FloatColumn([])
+    return ObjectColumn([])
+
+
+def _get_plain_attributes(map):
+    """ Returns the list of attributes of 'map', ordered by storage index,
+    or None if the objects of this map cannot be stored in columns. """
+    length = map.length()
+    attrs = [None] * length
+    while isinstance(map, PlainAttribute):
+        if map.index != DICT:
+            return None       # a slot or a special attribute, like weakrefs
+        attrs[map.storageindex] = map
+        map = map.back
+    if type(map.terminator) is not DictTerminator:
+        return None
+    return attrs
+
+
+class W_ColumnarList(W_Root):
+    """ A list of instances which all have the same class and the same
+    attributes, stored as one unboxed column per attribute instead of one
+    object per item.  The items are created again when they are read, so
+    the identity of the objects is not preserved.  As soon as an object
+    which does not fit is added, all the items are created again and stored
+    as a regular list. """
+
+    def __init__(self, space):
+        self.space = space
+        self.map = None         # the common map of all the items
+        self.attrs = None       # the PlainAttributes of 'map', in order
+        self.columns = None     # one Column per attribute
+        self.length = 0
+        self.items_w = None     # the items, if they don't fit in columns
+
+    def descr_new(space, w_subtype, w_iterable=None):
+        w_self = space.allocate_instance(W_ColumnarList, w_subtype)
+        W_ColumnarList.__init__(w_self, space)
+        if w_iterable is not None:
+            w_self.descr_extend(space, w_iterable)
+        return w_self
+
+    def _fits(self, w_obj):
+        map = w_obj._get_mapdict_map()
+        if map is None:
+            return False
+        if self.map is not None:
+            return map is self.map
+        if not isinstance(w_obj, W_ObjectObject):
+            return False
+        if self.space.type(w_obj).hasuserdel:
+            return False      # __del__ would be called for every copy
+        attrs = _get_plain_attributes(map)
+        if attrs is None:
+            return False
+        self.map = map
+        self.attrs = attrs
+        self.columns = [new_column(w_obj._mapdict_read_storage(i))
+                        for i in range(len(attrs))]
+        return True
+
+    def _devolve(self):
+        items_w = [self._materialize(i) for i in range(self.length)]
+        self.items_w = items_w
+        self.map = None
+        self.attrs = None
+        self.columns = None
+
+    def _materialize(self, index):
+        space = self.space
+        map = self.map
+        columns = self.columns
+        w_type = map.terminator.w_cls
+        w_obj = space.allocate_instance(W_ObjectObject, w_type)
+        storage = [None] * map.size_estimate()
+        for i in range(len(columns)):
+            storage[i] = columns[i].getitem(space, index)
+        w_obj._set_mapdict_storage_and_map(storage, map)
+        return w_obj
+
+    def _store_attribute(self, i, index, w_value):
+        # writes the attribute number 'i' of the item 'index', or appends
+        # it if index == self.length
+        column = self.columns[i]
+        if index == self.length:
+            ok = column.append(w_value)
+        else:
+            ok = column.setitem(index, w_value)
+        if not ok:
+            column = column.generalized(self.space)
+            self.columns[i] = column
+            if index == self.length:
+                column.append(w_value)
+            else:
+                column.setitem(index, w_value)
+
+    def _store(self, index, w_obj):
+        if self.items_w is None:
+            if self._fits(w_obj):
+                for i in range(len(self.columns)):
+                    self._store_attribute(i, index,
+                                          w_obj._mapdict_read_storage(i))
+                return
+            self._devolve()
+        items_w = self.items_w
+        assert items_w is not None
+        if index == self.length:
+            items_w.append(w_obj)
+        else:
+            items_w[index] = w_obj
+
+    def getitem(self, index):
+        if self.items_w is not None:
+            return self.items_w[index]
+        return self._materialize(index)
+
+    def _check_index(self, space, w_index):
+        index = space.getindex_w(w_index, space.w_IndexError, "list index")
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise oefmt(space.w_IndexError, "list index out of range")
+        return index
+
+    def descr_append(self, space, w_obj):
+        self._store(self.length, w_obj)
+        self.length += 1
+
+    def descr_extend(self, space, w_iterable):
+        w_iter = space.iter(w_iterable)
+        while True:
+            try:
+                w_obj = space.next(w_iter)
+            except OperationError as e:
+                if not e.match(space, space.w_StopIteration):
+                    raise
+                break
+            self.descr_append(space, w_obj)
+
+    def descr_len(self, space):
+        return space.newint(self.length)
+
+    def descr_getitem(self, space, w_index):
+        return self.getitem(self._check_index(space, w_index))
+
+    def descr_setitem(self, space, w_index, w_obj):
+        self._store(self._check_index(space, w_index), w_obj)
+
+    def descr_iter(self, space):
+        return W_ColumnarListIter(self)
+
+    def descr_column(self, space, w_name):
+        """ column(name) -> list of the values of the attribute 'name' of
+        all the items """
+        name = space.text_w(w_name)
+        if self.items_w is not None:
+            return space.newlist([space.getattr(w_item, w_name)
+                                  for w_item in self.items_w])
+        if self.attrs is not None:
+            for i in range(len(self.attrs)):
+                if self.attrs[i].name == name:
+                    return self.columns[i].w_column(space)
+            raise oefmt(space.w_AttributeError,
+                        "the items have no attribute '%s'", name)
+        return space.newlist([])
+
+    def descr_is_columnar(self, space):
+        """ is_columnar() -> True if the items are stored as columns """
+        return space.newbool(self.items_w is None)
+
+
+class W_ColumnarListIter(W_Root):
+    def __init__(self, w_list):
+        self.w_list = w_list
+        self.index = 0
+
+    def descr_iter(self, space):
+        return self
+
+    def descr_next(self, space):
+        w_list = self.w_list
+        if w_list is None or self.index >= w_list.length:
+            self.w_list = None
+            raise OperationError(space.w_StopIteration, space.w_None)
+        w_res = w_list.getitem(self.index)
+        self.index += 1
+        return w_res
+
+
+W_ColumnarList.typedef = TypeDef("columnar_list",
+    __doc__ = """columnar_list([iterable])
+
+A list of instances of the same class, which all have the same attributes.
+The attribute values are stored in unboxed columns, and the items are
+created again whenever they are read: the identity of the items is not
+preserved.  If an object which does not fit is added, the list falls back
+to storing regular objects.""",
+    __new__ = interp2app(W_ColumnarList.descr_new.im_func),
+    __len__ = interp2app(W_ColumnarList.descr_len),
+    __getitem__ = interp2app(W_ColumnarList.descr_getitem),
+    __setitem__ = interp2app(W_ColumnarList.descr_setitem),
+    __iter__ = interp2app(W_ColumnarList.descr_iter),
+    append = interp2app(W_ColumnarList.descr_append),
+    extend = interp2app(W_ColumnarList.descr_extend),
+    column = interp2app(W_ColumnarList.descr_column),
+    is_columnar = interp2app(W_ColumnarList.descr_is_columnar),
+)
+
+W_ColumnarListIter.typedef = TypeDef("columnar_list_iterator",
+    __iter__ = interp2app(W_ColumnarListIter.descr_iter),
+    next = interp2app(W_ColumnarListIter.descr_next),
+)
+W_ColumnarListIter.typedef.acceptable_as_base_class = False
@@ -0,0 +1,98 @@
+class AppTestColumnarList:
+    spaceconfig = dict(usemodules=['__pypy__'])
+
+    def test_simple(self):
+        from __pypy__ import columnar_list
+        class Point(object):
+            def __init__(self, x, y, name):
+                self.x = x
+                self.y = y
+                self.name = name
+            def norm(self):
+                return abs(self.x) + abs(self.y)
+        l = columnar_list()
+        assert len(l) == 0
+        for i in range(10):
+            l.append(Point(i, i * 0.5, str(i)))
+        assert l.is_columnar()
+        assert len(l) == 10
+        p = l[3]
+        assert type(p) is Point
+        assert (p.x, p.y, p.name) == (3, 1.5, '3')
+        assert p.norm() == 4.5
+        assert l[-1].x == 9
+        raises(IndexError, "l[10]")
+        assert [p.x for p in l] == range(10)
+        assert l.column('x') == range(10)
+        assert l.column('y') == [i * 0.5 for i in range(10)]
+        assert l.column('name') == [str(i) for i in range(10)]
+        raises(AttributeError, l.column, 'z')
+        # the items are copies
+        l[3].x = 42
+        assert l[3].x == 3
+        l[3] = Point(42, 0.0, 'a')
+        assert l[3].x == 42
+        assert l.is_columnar()
+
+    def test_generalize_column(self):
+        from __pypy__ import columnar_list
+        class A(object):
+            pass
+        def make(v):
+            a = A()
+            a.v = v
+            return a
+        l = columnar_list([make(1), make(2)])
+        l.append(make("x"))
+        l.append(make(2 ** 100))
+        l[0] = make(1.5)
+        assert l.is_columnar()
+        assert l.column('v') == [1.5, 2, "x", 2 ** 100]
+
+    def test_devolve(self):
+        from __pypy__ import columnar_list
+        class A(object):
+            pass
+        a = A()
+        a.x = 1
+        b = A()
+        b.y = 2
+        l = columnar_list([a])
+        l.append(b)
+        assert not l.is_columnar()
+        assert l[0].x == 1
+        assert l[1] is b
+        raises(AttributeError, l.column, 'x')
+        l = columnar_list([1, 2, 3])
+        assert not l.is_columnar()
+        assert list(l) == [1, 2, 3]
+
+    def test_slots_and_weakrefs(self):
+        from __pypy__ import columnar_list
+        import weakref
+        class S(object):
+            __slots__ = ['x']
+        s = S()
+        s.x = 5
+        l = columnar_list([s])
+        assert not l.is_columnar()
+        class A(object):
+            pass
+        a = A()
+        a.x = 5
+        r = weakref.ref(a)
+        l = columnar_list([a])
+        assert not l.is_columnar()
+        assert l[0] is a
+
+    def test_del(self):
+        from __pypy__ import columnar_list
+        class D(object):
+            def __del__(self):
+                pass
+        d = D()
+        d.x = 5
+        l = columnar_list([d, d])
+        assert not l.is_columnar()
+        assert l[0] is d
+        assert l[1] is d
@@ -0,0 +1,132 @@
+from rpython.tool.udir import udir
+
+
+class AppTestStartupImage:
+    spaceconfig = dict(usemodules=['__pypy__'])
+
+    def setup_class(cls):
+        tmpdir = udir.ensure('startup_image', dir=1)
+        pkg = tmpdir.ensure('imgpkg', dir=1)
+        pkg.join('__init__.py').write('x = 42\n')
+        pkg.join('sub.py').write('from imgpkg import x\ny = x + 1\n')
+        tmpdir.join('imgmod.py').write('import imgpkg.sub\nz = 5\n')
+        cls.w_tmpdir = cls.space.wrap(str(tmpdir))
+
+    def test_save_and_load(self):
+        import sys, os, __pypy__
+        sys.path.insert(0, self.tmpdir)
+        try:
+            image = os.path.join(self.tmpdir, 'image')
+            names = __pypy__.save_startup_image(image, ['imgmod'])
+            assert 'imgmod' in names
+            assert 'imgpkg' in names
+            assert 'imgpkg.sub' in names
+            for name in ['imgmod', 'imgpkg', 'imgpkg.sub']:
+                del sys.modules[name]
+            importer = __pypy__.load_startup_image(image)
+            try:
+                assert sys.meta_path[0] is importer
+                # the code is only unmarshalled by load_module()
+                assert isinstance(importer.entries['imgmod'][-1], str)
+                assert importer.find_module('imgmod') is importer
+                assert importer.find_module('not_in_the_image') is None
+                import imgmod
+                assert imgmod.z == 5
+                assert imgmod.__file__ == os.path.join(self.tmpdir,
+                                                       'imgmod.py')
+                assert imgmod.imgpkg.sub.y == 43
+                assert imgmod.imgpkg.__path__ == [
+                    os.path.join(self.tmpdir, 'imgpkg')]
+                assert 'imgpkg.sub' not in importer.entries
+            finally:
+                sys.meta_path.remove(importer)
+        finally:
+            sys.path.remove(self.tmpdir)
+            for name in ['imgmod', 'imgpkg', 'imgpkg.sub']:
+                sys.modules.pop(name, None)
+
+    def test_stale_entry(self):
+        import sys, os, __pypy__
+        sys.path.insert(0, self.tmpdir)
+        try:
+            source = os.path.join(self.tmpdir, 'imgstale.py')
+            with open(source, 'w') as f:
+                f.write('value = 1\n')
+            image = os.path.join(self.tmpdir, 'image2')
+            __pypy__.save_startup_image(image, ['imgstale'])
+            del sys.modules['imgstale']
+            with open(source, 'w') as f:
+                f.write('value = 2 # changed\n')
+            importer = __pypy__.load_startup_image(image)
+            try:
+                assert importer.find_module('imgstale') is None
+                assert 'imgstale' not in importer.entries
+            finally:
+                sys.meta_path.remove(importer)
+        finally:
+            sys.path.remove(self.tmpdir)
+            sys.modules.pop('imgstale', None)
+
+    def test_not_on_sys_path(self):
+        import sys, os, __pypy__
+        sys.path.insert(0, self.tmpdir)
+        try:
+            source = os.path.join(self.tmpdir, 'imgpathmod.py')
+            with open(source, 'w') as f:
+                f.write('value = 1\n')
+            image = os.path.join(self.tmpdir, 'image4')
+            __pypy__.save_startup_image(image, ['imgpathmod'])
+            del sys.modules['imgpathmod']
+        finally:
+            sys.path.remove(self.tmpdir)
+        importer = __pypy__.load_startup_image(image)
+        try:
+            assert importer.find_module('imgpathmod') is None
+            raises(ImportError, "import imgpathmod")
+            sys.path.append(self.tmpdir)
+            try:
+                assert importer.find_module('imgpathmod') is importer
+            finally:
+                sys.path.remove(self.tmpdir)
+        finally:
+            sys.meta_path.remove(importer)
+            sys.modules.pop('imgpathmod', None)
+
+    def test_shadowed(self):
+        import sys, os, __pypy__
+        shadowdir = os.path.join(self.tmpdir, 'shadow')
+        os.mkdir(shadowdir)
+        sys.path.insert(0, self.tmpdir)
+        try:
+            source = os.path.join(self.tmpdir, 'imgshadowed.py')
+            with open(source, 'w') as f:
+                f.write('value = 1\n')
+            image = os.path.join(self.tmpdir, 'image5')
+            __pypy__.save_startup_image(image, ['imgshadowed'])
+            del sys.modules['imgshadowed']
+            importer = __pypy__.load_startup_image(image)
+            try:
+                sys.path.insert(0, shadowdir)
+                try:
+                    assert importer.find_module('imgshadowed') is importer
+                    # a module of the same name, earlier on sys.path
+                    with open(os.path.join(shadowdir, 'imgshadowed.py'),
+                              'w') as f:
+                        f.write('value = 2\n')
+                    assert importer.find_module('imgshadowed') is None
+                    import imgshadowed
+                    assert imgshadowed.value == 2
+                finally:
+                    sys.path.remove(shadowdir)
+            finally:
+                sys.meta_path.remove(importer)
+        finally:
+            sys.path.remove(self.tmpdir)
+            sys.modules.pop('imgshadowed', None)
+
+    def test_incompatible_image(self):
+        import os, marshal, __pypy__
+        image = os.path.join(self.tmpdir, 'image3')
+        with open(image, 'wb') as f:
+            marshal.dump(('pypy-startup-image-1', -1, {}), f)
+        assert __pypy__.load_startup_image(image) is None
@@ -7,6 +7,9 @@ class Module(MixedModule):
 
     interpleveldefs = {
         'loads' : 'interp_decoder.loads',
+        'encode' : 'interp_encoder.encode',
+        'iterload' : 'interp_stream.iterload',
+        'StreamDecoder' : 'interp_stream.W_StreamDecoder',
         'raw_encode_basestring_ascii':
             'interp_encoder.raw_encode_basestring_ascii',
         }
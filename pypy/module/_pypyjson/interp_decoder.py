@@ -58,12 +58,124 @@ def slice_hash(a):
     (ll_chars, start, length, h) = a
     return h
 
+# objects with more keys than this are not tracked by the shapes
+MAX_SHAPE_LENGTH = 64
+# limits on the size of a tree of shapes, which can live as long as a
+# StreamDecoder: the objects whose keys would need more shapes than this,
+# e.g. because they are all different, are decoded as regular dicts
+MAX_TRANSITIONS = 32
+MAX_SHAPES = 4096
+# number of objects with the same shape which must have been decoded
+# before the following ones use the compact JsonDictStrategy
+COMPACT_DICT_THRESHOLD = 2
+
+class ObjectShape(object):
+    """ The sequence of keys of a JSON object.  The shapes form a tree
+    rooted at the empty shape: a shape has one child per key which was
+    seen after its own keys.  Repeated object layouts then reuse the
+    same key strings, and can be created as compact dicts which share the
+    keys (see pypy/objspace/std/jsondict.py). """
+
+    def __init__(self, prev, key, key_repr):
+        self.prev = prev
+        self.key = key               # unicode, or None for the root
+        self.key_repr = key_repr     # utf-8 repr of the key in the JSON
+                                     # source, or None if it needs escaping
+        if prev is None:
+            self.length = 0
+            self.root = self
+        else:
+            self.length = prev.length + 1
+            self.root = prev.root
+        self.num_shapes = 1          # in the whole tree, only on the root
+        self.transitions = None      # {unicode key: ObjectShape}
+        self.first_next = None       # first child, tried before the lookup
+        self.instances = 0
+        self.keys_in_order = None
+        self.key_to_index = None
+        self.strategy = None
+
+    def get_next(self, key):
+        """ Returns the shape with 'key' added, or None if the key is
+        already in this shape, if the shape would become too long or if
+        the tree of shapes is full. """
+        if self.transitions is not None:
+            try:
+                return self.transitions[key]
+            except KeyError:
+                pass
+            if len(self.transitions) >= MAX_TRANSITIONS:
+                return None
+        root = self.root
+        if (self.length >= MAX_SHAPE_LENGTH or
+                root.num_shapes >= MAX_SHAPES or self.get_index(key) >= 0):
+            return None
+        nextshape = ObjectShape(self, key, _make_key_repr(key))
+        root.num_shapes += 1
+        if self.transitions is None:
+            self.transitions = {}
+            self.first_next = nextshape
+        self.transitions[key] = nextshape
+        return nextshape
+
+    def get_keys_in_order(self):
+        if self.keys_in_order is None:
+            keys = [u''] * self.length
+            shape = self
+            while shape.prev is not None:
+                keys[shape.length - 1] = shape.key
+                shape = shape.prev
+            self.keys_in_order = keys
+        return self.keys_in_order
+
+    def get_index(self, key):
+        if self.key_to_index is None:
+            d = {}
+            keys = self.get_keys_in_order()
+            for i in range(len(keys)):
+                d[keys[i]] = i
+            self.key_to_index = d
+        return self.key_to_index.get(key, -1)
+
+    def get_dict_strategy(self, space):
+        if self.strategy is None:
+            from pypy.objspace.std.jsondict import JsonDictStrategy
+            self.strategy = JsonDictStrategy(space, self)
+        return self.strategy
+
+    def create_dict(self, space, values_w):
+        from pypy.objspace.std.dictmultiobject import from_unicode_key_dict
+        from pypy.objspace.std.jsondict import from_values_and_shape
+        assert len(values_w) == self.length
+        self.instances += 1
+        if self.instances > COMPACT_DICT_THRESHOLD:
+            return from_values_and_shape(space, values_w, self)
+        d = {}
+        keys = self.get_keys_in_order()
+        for i in range(len(keys)):
+            d[keys[i]] = values_w[i]
+        return from_unicode_key_dict(space, d)
+
+def _make_key_repr(key):
+    for c in key:
+        if c == u'"' or c == u'\\' or ord(c) < 0x20:
+            return None
+    return runicode.unicode_encode_utf_8(key, len(key), 'strict')
+
+def new_shape_root():
+    return ObjectShape(None, None, None)
+
+
 TYPE_UNKNOWN = 0
 TYPE_STRING = 1
 class JSONDecoder(object):
-    def __init__(self, space, s):
+    def __init__(self, space, s, shape_root=None, offset=0):
         self.space = space
         self.s = s
+        self.offset = offset    # position of 's' in the whole input
+        if shape_root is None:
+            shape_root = new_shape_root()
+        self.shape_root = shape_root
         # we put our string in a raw buffer so:
         # 1) we automatically get the '\0' sentinel at the end of the string,
         #    which means that we never have to check for the "end of string"
@@ -93,7 +205,9 @@ class JSONDecoder(object):
 
     @specialize.arg(1)
     def _raise(self, msg, *args):
-        raise oefmt(self.space.w_ValueError, msg, *args)
+        # the last argument is always the position of the error in 's'
+        pos = args[-1] + self.offset
+        raise oefmt(self.space.w_ValueError, msg, *(args[:-1] + (pos,)))
 
     def decode_any(self, i):
         i = self.skip_whitespace(i)
@@ -270,10 +384,28 @@ class JSONDecoder(object):
             self.pos = i+1
             return self.space.newdict()
 
-        d = {}
+        # as long as the keys follow the shapes, the values are collected
+        # in 'values_w'; otherwise they go to the dict 'd'
+        shape = self.shape_root
+        values_w = []
+        d = None
         while True:
             # parse a key: value
-            name = self.decode_key(i)
+            i = self.skip_whitespace(i)
+            nextshape = None
+            if shape is not None:
+                nextshape = shape.first_next
+                if nextshape is not None and self._key_matches(i, nextshape):
+                    self.pos = i + len(nextshape.key_repr) + 2
+                    name = nextshape.key
+                else:
+                    name = self.decode_key(i)
+                    nextshape = shape.get_next(name)
+                    if nextshape is None:
+                        d = self._shape_to_dict(shape, values_w)
+                shape = nextshape
+            else:
+                name = self.decode_key(i)
             i = self.skip_whitespace(self.pos)
             ch = self.ll_chars[i]
             if ch != ':':
@@ -282,12 +414,19 @@ class JSONDecoder(object):
             i = self.skip_whitespace(i)
             #
             w_value = self.decode_any(i)
-            d[name] = w_value
+            if shape is not None:
+                values_w.append(w_value)
+            else:
+                assert d is not None
+                d[name] = w_value
             i = self.skip_whitespace(self.pos)
             ch = self.ll_chars[i]
             i += 1
             if ch == '}':
                 self.pos = i
+                if shape is not None:
+                    return shape.create_dict(self.space, values_w)
+                assert d is not None
                 return self._create_dict(d)
             elif ch == ',':
                 pass
@@ -297,6 +436,28 @@ class JSONDecoder(object):
                 self._raise("Unexpected '%s' when decoding object (char %d)",
                             ch, i-1)
 
+    def _key_matches(self, i, shape):
+        """ Check whether the JSON source at position 'i' contains the key
+        of 'shape', in the same unescaped form as when it was first seen. """
+        key_repr = shape.key_repr
+        if key_repr is None:
+            return False
+        ll_chars = self.ll_chars
+        if ll_chars[i] != '"':
+            return False
+        i += 1
+        for j in range(len(key_repr)):
+            if ll_chars[i + j] != key_repr[j]:
+                return False
+        return ll_chars[i + len(key_repr)] == '"'
+
+    def _shape_to_dict(self, shape, values_w):
+        d = {}
+        keys = shape.get_keys_in_order()
+        for i in range(len(keys)):
+            d[keys[i]] = values_w[i]
+        return d
+
     def _create_dict(self, d):
         from pypy.objspace.std.dictmultiobject import from_unicode_key_dict
         return from_unicode_key_dict(self.space, d)
@@ -450,13 +611,20 @@ def loads(space, w_s):
         raise oefmt(space.w_TypeError,
                     "Expected utf8-encoded str, got unicode")
     s = space.bytes_w(w_s)
-    decoder = JSONDecoder(space, s)
+    return decode_document(space, s)
+
+def decode_document(space, s, shape_root=None, offset=0):
+    """Decode the single JSON value in 's', which can be surrounded by
+    whitespace but must not be followed by any other data.  'shape_root'
+    allows to share the object shapes between several documents.  The
+    positions in the error messages are counted from 'offset'."""
+    decoder = JSONDecoder(space, s, shape_root, offset)
     try:
         w_res = decoder.decode_any(0)
         i = decoder.skip_whitespace(decoder.pos)
         if i < len(s):
-            start = i
-            end = len(s) - 1
+            start = i + offset
+            end = len(s) - 1 + offset
             raise oefmt(space.w_ValueError,
                         "Extra data: char %d - %d", start, end)
         return w_res
@@ -1,6 +1,10 @@
-from rpython.rlib.rstring import StringBuilder
-from rpython.rlib.runicode import str_decode_utf_8
+from rpython.rlib.objectmodel import compute_unique_id
+from rpython.rlib.rstring import StringBuilder, UnicodeBuilder
+from rpython.rlib.runicode import str_decode_utf_8, str_decode_ascii
+from rpython.rlib.rfloat import INFINITY
 from pypy.interpreter import unicodehelper
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import unwrap_spec
 
 
 HEX = '0123456789abcdef'
@@ -16,38 +20,18 @@ ESCAPE_BEFORE_SPACE = [ESCAPE_DICT.get(chr(_i), '\\u%04x' % _i)
                        for _i in range(32)]
 
 
-def raw_encode_basestring_ascii(space, w_string):
-    if space.isinstance_w(w_string, space.w_bytes):
-        s = space.bytes_w(w_string)
-        for i in range(len(s)):
-            c = s[i]
-            if c >= ' ' and c <= '~' and c != '"' and c != '\\':
-                pass
-            else:
-                first = i
-                break
+def _first_unsafe_char(s):
+    """Return the index of the first char of 's' that needs to be escaped
+    by the ascii-only encoder, or -1 if there is none."""
+    for i in range(len(s)):
+        c = s[i]
+        if c >= ' ' and c <= '~' and c != '"' and c != '\\':
+            pass
         else:
-            # the input is a string with only non-special ascii chars
-            return w_string
-
-        eh = unicodehelper.decode_error_handler(space)
-        u = str_decode_utf_8(
-                s, len(s), None, final=True, errorhandler=eh,
-                allow_surrogates=True)[0]
-        sb = StringBuilder(len(u))
-        sb.append_slice(s, 0, first)
-    else:
-        # We used to check if 'u' contains only safe characters, and return
-        # 'w_string' directly.  But this requires an extra pass over all
-        # characters, and the expected use case of this function, from
-        # json.encoder, will anyway re-encode a unicode result back to
-        # a string (with the ascii encoding).  This requires two passes
-        # over the characters.  So we may as well directly turn it into a
-        # string here --- only one pass.
-        u = space.unicode_w(w_string)
-        sb = StringBuilder(len(u))
-        first = 0
+            return i
+    return -1
 
+def _encode_unicode_ascii(sb, u, first):
     for i in range(first, len(u)):
         c = ord(u[i])
         if c <= ord('~'):
@@ -78,5 +62,379 @@ def raw_encode_basestring_ascii(space, w_string):
                 sb.append(HEX[(s2 >> 4) & 0x0f])
                 sb.append(HEX[s2 & 0x0f])
 
+def _encode_bytes_ascii(space, sb, s, first):
+    # 's' is utf-8 encoded, and s[:first] is known to contain only safe chars
+    eh = unicodehelper.decode_error_handler(space)
+    u = str_decode_utf_8(
+            s, len(s), None, final=True, errorhandler=eh,
+            allow_surrogates=True)[0]
+    sb.append_slice(s, 0, first)
+    _encode_unicode_ascii(sb, u, first)
+
+
+def raw_encode_basestring_ascii(space, w_string):
+    if space.isinstance_w(w_string, space.w_bytes):
+        s = space.bytes_w(w_string)
+        first = _first_unsafe_char(s)
+        if first < 0:
+            # the input is a string with only non-special ascii chars
+            return w_string
+        sb = StringBuilder(len(s))
+        _encode_bytes_ascii(space, sb, s, first)
+    else:
+        # We used to check if 'u' contains only safe characters, and return
+        # 'w_string' directly.  But this requires an extra pass over all
+        # characters, and the expected use case of this function, from
+        # json.encoder, will anyway re-encode a unicode result back to
+        # a string (with the ascii encoding).  This requires two passes
+        # over the characters.  So we may as well directly turn it into a
+        # string here --- only one pass.
+        u = space.unicode_w(w_string)
+        sb = StringBuilder(len(u))
+        _encode_unicode_ascii(sb, u, 0)
+
     res = sb.build()
     return space.newtext(res)
+
+
+def _raw_encode_bytes(s):
+    """Escape the str 's' like json.encoder.raw_encode_basestring(),
+    i.e. without touching the non-ascii chars."""
+    sb = StringBuilder(len(s))
+    for i in range(len(s)):
+        c = s[i]
+        if c == '"' or c == '\\':
+            sb.append('\\')
+            sb.append(c)
+        elif c < ' ':
+            sb.append(ESCAPE_BEFORE_SPACE[ord(c)])
+        else:
+            sb.append(c)
+    return sb.build()
+
+def _raw_encode_unicode(u):
+    sb = UnicodeBuilder(len(u))
+    for i in range(len(u)):
+        c = u[i]
+        if c == u'"' or c == u'\\':
+            sb.append(u'\\')
+            sb.append(c)
+        elif ord(c) < 0x20:
+            sb.append(unicode(ESCAPE_BEFORE_SPACE[ord(c)]))
+        else:
+            sb.append(c)
+    return sb.build()
+
+
+class JSONEncoder(object):
+    """Interp-level version of json.encoder.JSONEncoder.encode().
+
+    Containers are walked directly, and lists and dicts that use an
+    unboxed strategy are encoded without wrapping their items.  Only the
+    objects which are not natively serializable are passed to the
+    app-level 'default' callable.
+    """
+
+    def __init__(self, space, w_default, sort_keys, item_separator,
+                 key_separator, ensure_ascii, allow_nan, skipkeys,
+                 check_circular):
+        self.space = space
+        self.w_default = w_default
+        self.sort_keys = sort_keys
+        self.item_separator = item_separator
+        self.key_separator = key_separator
+        self.ensure_ascii = ensure_ascii
+        self.allow_nan = allow_nan
+        self.skipkeys = skipkeys
+        if check_circular:
+            self.markers = {}
+        else:
+            self.markers = None
+        self.builder = StringBuilder()
+        # only used if not ensure_ascii: as soon as a unicode string is
+        # encoded, the result becomes unicode (like StringOrUnicodeBuilder
+        # in json/encoder.py)
+        self.ubuilder = None
+
+    def _ascii_to_unicode(self, s):
+        eh = unicodehelper.decode_error_handler(self.space)
+        return str_decode_ascii(s, len(s), 'strict', final=True,
+                                errorhandler=eh)[0]
+
+    def append(self, s):
+        if self.ubuilder is None:
+            self.builder.append(s)
+        else:
+            self.ubuilder.append(self._ascii_to_unicode(s))
+
+    def append_unicode(self, u):
+        if self.ubuilder is None:
+            ub = UnicodeBuilder()
+            ub.append(self._ascii_to_unicode(self.builder.build()))
+            self.ubuilder = ub
+        self.ubuilder.append(u)
+
+    def build(self):
+        if self.ubuilder is not None:
+            return self.space.newunicode(self.ubuilder.build())
+        return self.space.newbytes(self.builder.build())
+
+    def mark(self, w_obj):
+        if self.markers is not None:
+            uid = compute_unique_id(w_obj)
+            if uid in self.markers:
+                raise oefmt(self.space.w_ValueError,
+                            "Circular reference detected")
+            self.markers[uid] = None
+
+    def unmark(self, w_obj):
+        if self.markers is not None:
+            del self.markers[compute_unique_id(w_obj)]
+
+    # ____________________________________________________________
+
+    def encode_bytes(self, s):
+        if self.ensure_ascii:
+            first = _first_unsafe_char(s)
+            sb = self.builder
+            sb.append('"')
+            if first < 0:
+                sb.append(s)
+            else:
+                _encode_bytes_ascii(self.space, sb, s, first)
+            sb.append('"')
+        else:
+            self.append('"')
+            self.append(_raw_encode_bytes(s))
+            self.append('"')
+
+    def encode_unicode(self, u):
+        if self.ensure_ascii:
+            sb = self.builder
+            sb.append('"')
+            _encode_unicode_ascii(sb, u, 0)
+            sb.append('"')
+        else:
+            self.append('"')
+            self.append_unicode(_raw_encode_unicode(u))
+            self.append('"')
+
+    def floatstr(self, x):
+        from pypy.objspace.std.floatobject import float2string
+        if x != x:
+            text = 'NaN'
+        elif x == INFINITY:
+            text = 'Infinity'
+        elif x == -INFINITY:
+            text = '-Infinity'
+        else:
+            return float2string(x, 'r', 0)
+        if not self.allow_nan:
+            raise oefmt(self.space.w_ValueError,
+                "Out of range float values are not JSON compliant: %s",
+                float2string(x, 'r', 0))
+        return text
+
+    def encode(self, w_obj):
+        from pypy.objspace.std.intobject import W_IntObject
+        space = self.space
+        if space.is_w(w_obj, space.w_None):
+            self.append('null')
+        elif space.is_w(w_obj, space.w_True):
+            self.append('true')
+        elif space.is_w(w_obj, space.w_False):
+            self.append('false')
+        elif type(w_obj) is W_IntObject:
+            self.append(str(w_obj.intval))
+        elif space.isinstance_w(w_obj, space.w_bytes):
+            self.encode_bytes(space.bytes_w(w_obj))
+        elif space.isinstance_w(w_obj, space.w_unicode):
+            self.encode_unicode(space.unicode_w(w_obj))
+        elif (space.isinstance_w(w_obj, space.w_int) or
+              space.isinstance_w(w_obj, space.w_long)):
+            self.append(space.text_w(space.str(w_obj)))
+        elif space.isinstance_w(w_obj, space.w_float):
+            self.append(self.floatstr(space.float_w(w_obj)))
+        elif (space.isinstance_w(w_obj, space.w_list) or
+              space.isinstance_w(w_obj, space.w_tuple)):
+            self.encode_list(w_obj)
+        elif space.isinstance_w(w_obj, space.w_dict):
+            self.encode_dict(w_obj)
+        else:
+            self.mark(w_obj)
+            w_res = space.call_function(self.w_default, w_obj)
+            self.encode(w_res)
+            self.unmark(w_obj)
+
+    def encode_list(self, w_lst):
+        space = self.space
+        # fast paths for the unboxed list strategies: no item can be a
+        # container, so there is no need for markers either
+        intlist = space.listview_int(w_lst)
+        if intlist is not None:
+            self.append('[')
+            for i in range(len(intlist)):
+                if i > 0:
+                    self.append(self.item_separator)
+                self.append(str(intlist[i]))
+            self.append(']')
+            return
+        floatlist = space.listview_float(w_lst)
+        if floatlist is not None:
+            self.append('[')
+            for i in range(len(floatlist)):
+                if i > 0:
+                    self.append(self.item_separator)
+                self.append(self.floatstr(floatlist[i]))
+            self.append(']')
+            return
+        byteslist = space.listview_bytes(w_lst)
+        if byteslist is not None:
+            self.append('[')
+            for i in range(len(byteslist)):
+                if i > 0:
+                    self.append(self.item_separator)
+                self.encode_bytes(byteslist[i])
+            self.append(']')
+            return
+        unicodelist = space.listview_unicode(w_lst)
+        if unicodelist is not None:
+            self.append('[')
+            for i in range(len(unicodelist)):
+                if i > 0:
+                    self.append(self.item_separator)
+                self.encode_unicode(unicodelist[i])
+            self.append(']')
+            return
+        items_w = space.fixedview(w_lst)
+        if not items_w:
+            self.append('[]')
+            return
+        self.mark(w_lst)
+        self.append('[')
+        for i in range(len(items_w)):
+            if i > 0:
+                self.append(self.item_separator)
+            self.encode(items_w[i])
+        self.append(']')
+        self.unmark(w_lst)
+
+    def encode_dict(self, w_dict):
+        from pypy.objspace.std.dictmultiobject import (
+            W_DictObject, BytesDictStrategy, UnicodeDictStrategy)
+        space = self.space
+        if not space.is_true(w_dict):
+            self.append('{}')
+            return
+        self.mark(w_dict)
+        self.append('{')
+        first = True
+        if self.sort_keys:
+            w_keys = space.call_method(w_dict, 'keys')
+            space.call_method(w_keys, 'sort')
+            for w_key in space.listview(w_keys):
+                w_value = space.getitem(w_dict, w_key)
+                first = self.encode_item(w_key, w_value, first)
+        elif type(w_dict) is W_DictObject:
+            strategy = w_dict.get_strategy()
+            if isinstance(strategy, UnicodeDictStrategy):
+                # take a snapshot of the items: 'default' might mutate
+                # the dict while we are encoding it
+                items = strategy.unerase(w_dict.dstorage).items()
+                for key, w_value in items:
+                    if not first:
+                        self.append(self.item_separator)
+                    first = False
+                    self.encode_unicode(key)
+                    self.append(self.key_separator)
+                    self.encode(w_value)
+            elif isinstance(strategy, BytesDictStrategy):
+                items = strategy.unerase(w_dict.dstorage).items()
+                for key, w_value in items:
+                    if not first:
+                        self.append(self.item_separator)
+                    first = False
+                    self.encode_bytes(key)
+                    self.append(self.key_separator)
+                    self.encode(w_value)
+            else:
+                iterator = w_dict.iteritems()
+                while True:
+                    w_key, w_value = iterator.next_item()
+                    if w_key is None:
+                        break
+                    first = self.encode_item(w_key, w_value, first)
+        else:
+            # a dict subclass: go through its (maybe overridden) iteritems()
+            w_iter = space.iter(space.call_method(w_dict, 'iteritems'))
+            while True:
+                try:
+                    w_item = space.next(w_iter)
+                except OperationError as e:
+                    if not e.match(space, space.w_StopIteration):
+                        raise
+                    break
+                w_key, w_value = space.fixedview(w_item, 2)
+                first = self.encode_item(w_key, w_value, first)
+        self.append('}')
+        self.unmark(w_dict)
+
+    def encode_item(self, w_key, w_value, first):
+        """Encode one 'key: value' pair of a dict.  Returns the new value
+        of the 'first' flag."""
+        space = self.space
+        if space.isinstance_w(w_key, space.w_bytes):
+            key = None
+        elif space.isinstance_w(w_key, space.w_unicode):
+            key = None
+        # JavaScript is weakly typed for these, so it makes sense to
+        # also allow them.  Many encoders seem to do something like this.
+        elif space.isinstance_w(w_key, space.w_float):
+            key = self.floatstr(space.float_w(w_key))
+        elif space.is_w(w_key, space.w_True):
+            key = 'true'
+        elif space.is_w(w_key, space.w_False):
+            key = 'false'
+        elif space.is_w(w_key, space.w_None):
+            key = 'null'
+        elif (space.isinstance_w(w_key, space.w_int) or
+              space.isinstance_w(w_key, space.w_long)):
+            key = space.text_w(space.str(w_key))
+        elif self.skipkeys:
+            return first
+        else:
+            raise oefmt(space.w_TypeError, "key %R is not a string", w_key)
+        if not first:
+            self.append(self.item_separator)
+        if key is not None:
+            self.append('"')
+            self.append(key)
+            self.append('"')
+        elif space.isinstance_w(w_key, space.w_bytes):
+            self.encode_bytes(space.bytes_w(w_key))
+        else:
+            self.encode_unicode(space.unicode_w(w_key))
+        self.append(self.key_separator)
+        self.encode(w_value)
+        return False
+
+
+@unwrap_spec(sort_keys=bool, item_separator='text', key_separator='text',
+             ensure_ascii=bool, allow_nan=bool, skipkeys=bool,
+             check_circular=bool)
+def encode(space, w_obj, w_default, sort_keys=False, item_separator=', ',
+           key_separator=': ', ensure_ascii=True, allow_nan=True,
+           skipkeys=False, check_circular=True):
+    """encode(obj, default, sort_keys=False, item_separator=', ',
+              key_separator=': ', ensure_ascii=True, allow_nan=True,
+              skipkeys=False, check_circular=True)
+
+    Return the compact (non-indented) JSON representation of 'obj', like
+    json.JSONEncoder.encode().  'default' is called for the objects that
+    are not natively serializable.
+    """
+    encoder = JSONEncoder(space, w_default, sort_keys, item_separator,
+                          key_separator, ensure_ascii, allow_nan, skipkeys,
+                          check_circular)
+    encoder.encode(w_obj)
+    return encoder.build()
@@ -0,0 +1,260 @@
+from rpython.rlib.objectmodel import specialize
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef
+from pypy.module._pypyjson.interp_decoder import (
+    is_whitespace, decode_document, new_shape_root)
+
+# states of the scanner which looks for the boundaries of the values
+STATE_BEFORE_ARRAY = 0  # items mode: before the opening '['
+STATE_ARRAY_START = 1   # items mode: just after the opening '['
+STATE_BETWEEN = 2       # before the start of the next value
+STATE_VALUE = 3         # inside a string, an array or an object
+STATE_SCALAR = 4        # inside a number or a constant
+STATE_AFTER_ITEM = 5    # items mode: after an element, expecting ',' or ']'
+STATE_DONE = 6          # items mode: after the closing ']'
+
+DEFAULT_CHUNKSIZE = 65536
+
+
+def _bytes_data_w(space, w_data):
+    if space.isinstance_w(w_data, space.w_unicode):
+        raise oefmt(space.w_TypeError,
+                    "Expected utf8-encoded str, got unicode")
+    return space.bytes_w(w_data)
+
+
+class W_StreamDecoder(W_Root):
+    """Incremental decoder: the data is either pushed with feed(), or pulled
+    from a file-like object.  Iterating over the decoder returns the
+    whitespace-separated top-level values one at a time or, in 'items'
+    mode, the elements of a single top-level array.
+
+    The data is not decoded here: a cheap scanner only looks for the end of
+    the next value, which is then decoded by the regular JSONDecoder.  The
+    data of the values which have already been returned is dropped (see
+    _compact()), so memory stays bounded by about twice the size of the
+    biggest value or chunk.  The object
+    shapes (see ObjectShape) are shared between all the values.
+    """
+
+    def __init__(self, space, items, w_file=None, chunksize=DEFAULT_CHUNKSIZE):
+        self.space = space
+        self.items = items
+        self.w_file = w_file
+        self.chunksize = chunksize
+        self.buf = ''
+        self.pos = 0            # scanning position in 'buf'
+        self.start = -1         # start of the current value in 'buf'
+        self.consumed = 0       # number of chars dropped from 'buf' so far
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.eof = False
+        # the values often have the same layout: share the object shapes
+        self.shape_root = new_shape_root()
+        if items:
+            self.state = STATE_BEFORE_ARRAY
+        else:
+            self.state = STATE_BETWEEN
+
+    @specialize.arg(1)
+    def _raise(self, msg, i):
+        raise oefmt(self.space.w_ValueError, msg, self.consumed + i)
+
+    def _start_value(self, i, ch):
+        if ch == ',' or ch == ']' or ch == '}' or ch == ':':
+            self._raise("No JSON object could be decoded: unexpected char "
+                        "at char %d", i)
+        self.start = i
+        if ch == '"':
+            self.in_string = True
+            self.escape = False
+            self.depth = 0
+            self.state = STATE_VALUE
+        elif ch == '[' or ch == '{':
+            self.depth = 1
+            self.state = STATE_VALUE
+        else:
+            self.state = STATE_SCALAR
+
+    def _end_value(self, end):
+        self.pos = end
+        if self.items:
+            self.state = STATE_AFTER_ITEM
+        else:
+            self.state = STATE_BETWEEN
+        return end
+
+    def _scan(self):
+        """Look for the end of the next value.  Returns its index in 'buf'
+        (the value then starts at 'self.start'), or -1 if more data is
+        needed."""
+        buf = self.buf
+        i = self.pos
+        n = len(buf)
+        while i < n:
+            ch = buf[i]
+            state = self.state
+            if state == STATE_VALUE:
+                i += 1
+                if self.in_string:
+                    if self.escape:
+                        self.escape = False
+                    elif ch == '\\':
+                        self.escape = True
+                    elif ch == '"':
+                        self.in_string = False
+                        if self.depth == 0:
+                            return self._end_value(i)
+                elif ch == '"':
+                    self.in_string = True
+                elif ch == '[' or ch == '{':
+                    self.depth += 1
+                elif ch == ']' or ch == '}':
+                    self.depth -= 1
+                    if self.depth == 0:
+                        return self._end_value(i)
+                continue
+            if state == STATE_SCALAR:
+                if is_whitespace(ch) or ch == ',' or ch == ']' or ch == '}':
+                    return self._end_value(i)
+                i += 1
+                continue
+            if is_whitespace(ch):
+                i += 1
+                continue
+            if state == STATE_BEFORE_ARRAY:
+                if ch != '[':
+                    self._raise("Expected '[' at char %d", i)
+                self.state = STATE_ARRAY_START
+            elif state == STATE_ARRAY_START and ch == ']':
+                self.state = STATE_DONE
+            elif state == STATE_AFTER_ITEM:
+                if ch == ',':
+                    self.state = STATE_BETWEEN
+                elif ch == ']':
+                    self.state = STATE_DONE
+                else:
+                    self._raise("Unexpected char when decoding array "
+                                "(char %d)", i)
+            elif state == STATE_DONE:
+                self._raise("Extra data: char %d", i)
+            else:
+                self._start_value(i, ch)
+            i += 1
+        self.pos = i
+        return -1
+
+    def _scan_at_eof(self):
+        state = self.state
+        if state == STATE_SCALAR:
+            return self._end_value(len(self.buf))
+        if state == STATE_VALUE:
+            self._raise("Unterminated value starting at char %d", self.start)
+        if state == STATE_ARRAY_START or state == STATE_AFTER_ITEM or (
+                self.items and state == STATE_BETWEEN):
+            self._raise("Unterminated array ending at char %d", len(self.buf))
+        return -1
+
+    def _read_more(self):
+        space = self.space
+        w_data = space.call_method(self.w_file, 'read',
+                                   space.newint(self.chunksize))
+        data = _bytes_data_w(space, w_data)
+        if not data:
+            self.eof = True
+        else:
+            self._append(data)
+
+    def _compact(self):
+        """Drop the data before the current value, or before 'pos' if not
+        inside a value.  This is only done once it is more than half of
+        'buf', to avoid copying the rest of the buffer after every value of
+        a chunk that contains many of them."""
+        start = self.start
+        if start >= 0:
+            drop = start
+        else:
+            drop = self.pos
+        if drop > 0 and drop * 2 >= len(self.buf):
+            self.buf = self.buf[drop:]
+            self.consumed += drop
+            self.pos -= drop
+            if start >= 0:
+                self.start = 0
+
+    def _append(self, data):
+        self._compact()
+        self.buf += data
+
+    def _next_value(self):
+        while True:
+            end = self._scan()
+            if end < 0 and self.eof:
+                end = self._scan_at_eof()
+                if end < 0:
+                    return None
+            if end >= 0:
+                start = self.start
+                assert start >= 0
+                s = self.buf[start:end]
+                # report the errors at their position in the whole stream
+                offset = self.consumed + start
+                self.pos = end
+                self.start = -1
+                self._compact()
+                return decode_document(self.space, s, self.shape_root,
+                                       offset)
+            if self.w_file is None:
+                return None
+            self._read_more()
+
+    @unwrap_spec(items=bool)
+    def descr__new__(space, w_subtype, items=False):
+        return W_StreamDecoder(space, items)
+
+    def descr_feed(self, space, w_data):
+        if self.eof:
+            raise oefmt(space.w_ValueError, "feed() called after close()")
+        self._append(_bytes_data_w(space, w_data))
+
+    def descr_close(self, space):
+        self.eof = True
+
+    def descr_iter(self, space):
+        return self
+
+    def descr_next(self, space):
+        w_res = self._next_value()
+        if w_res is None:
+            raise OperationError(space.w_StopIteration, space.w_None)
+        return w_res
+
+W_StreamDecoder.typedef = TypeDef("_pypyjson.StreamDecoder",
+    __doc__ = """StreamDecoder(items=False)
+
+    Incremental JSON decoder.  Push the data with feed() and iterate over
+    the decoder to get the complete values decoded so far.  With
+    items=True, the data must contain a single array, and its elements are
+    returned one at a time.  Call close() at the end of the data.""",
+    __new__ = interp2app(W_StreamDecoder.descr__new__.im_func),
+    feed = interp2app(W_StreamDecoder.descr_feed),
+    close = interp2app(W_StreamDecoder.descr_close),
+    __iter__ = interp2app(W_StreamDecoder.descr_iter),
+    next = interp2app(W_StreamDecoder.descr_next),
+)
+W_StreamDecoder.typedef.acceptable_as_base_class = False
+
+
+@unwrap_spec(items=bool, chunksize=int)
+def iterload(space, w_file, items=False, chunksize=DEFAULT_CHUNKSIZE):
+    """iterload(file, items=False, chunksize=65536)
+
+    Return an iterator over the top-level JSON values read from 'file' or,
+    with items=True, over the elements of the top-level array.  The file is
+    read 'chunksize' bytes at a time."""
+    if chunksize <= 0:
+        raise oefmt(space.w_ValueError, "chunksize must be positive")
+    return W_StreamDecoder(space, items, w_file, chunksize)
@@ -1,4 +1,5 @@
 # -*- encoding: utf-8 -*-
+from pypy.module._pypyjson import interp_decoder
 from pypy.module._pypyjson.interp_decoder import JSONDecoder
 
 def test_skip_whitespace():
@@ -23,6 +24,24 @@ def test_decode_key():
     assert y is x
     dec.close()
 
+def test_shape_limits(monkeypatch):
+    monkeypatch.setattr(interp_decoder, 'MAX_TRANSITIONS', 4)
+    monkeypatch.setattr(interp_decoder, 'MAX_SHAPES', 10)
+    root = interp_decoder.new_shape_root()
+    # objects with unique keys: the transitions from a shape are limited
+    shapes = [root.get_next(u"k%d" % i) for i in range(6)]
+    assert None not in shapes[:4]
+    assert shapes[4:] == [None, None]
+    assert root.get_next(u"k0") is shapes[0]
+    # and so is the size of the whole tree
+    shape = shapes[0]
+    for i in range(5):
+        shape = shape.get_next(u"x%d" % i)
+        assert shape is not None
+    assert root.num_shapes == 10
+    assert shape.get_next(u"y") is None
+    assert shapes[1].get_next(u"y") is None
+
 class AppTest(object):
     spaceconfig = {"objspace.usemodules._pypyjson": True}
 
@@ -248,3 +267,219 @@ class AppTest(object):
         for inputtext, errmsg in test_cases:
             exc = raises(ValueError, _pypyjson.loads, inputtext)
             assert str(exc.value) == errmsg
+
+    def test_encode_basic(self):
+        import _pypyjson
+        def default(o):
+            raise TypeError(repr(o) + " is not JSON serializable")
+        def check(obj, expected, **kwds):
+            res = _pypyjson.encode(obj, default, **kwds)
+            assert type(res) is type(expected)
+            assert res == expected
+        check(None, 'null')
+        check(True, 'true')
+        check(False, 'false')
+        check(42, '42')
+        check(-3L, '-3')
+        check(1 << 100, str(1 << 100))
+        check(1.5, '1.5')
+        check(float('inf'), 'Infinity')
+        check(float('-inf'), '-Infinity')
+        check(float('nan'), 'NaN')
+        check("abc", '"abc"')
+        check(u"\xe9\n", '"\\u00e9\\n"')
+        check("\xc3\xa9", '"\\u00e9"')
+        check([], '[]')
+        check((), '[]')
+        check({}, '{}')
+        check([1, 2, 3], '[1, 2, 3]')
+        check([1.5, 2.5], '[1.5, 2.5]')
+        check(["a", "b"], '["a", "b"]')
+        check([u"a", u"b"], '["a", "b"]')
+        check((1, "a", None), '[1, "a", null]')
+        check([[1], {"a": [2]}], '[[1], {"a": [2]}]')
+        check({u"x": 1}, '{"x": 1}')
+        check({1: 2, 1.5: True, None: False}, '{"null": false, "1": 2, '
+              '"1.5": true}', sort_keys=True)
+        check({"b": 1, "a": 2}, '{"a":2,"b":1}', sort_keys=True,
+              item_separator=',', key_separator=':')
+        raises(ValueError, _pypyjson.encode, float('nan'), default,
+               allow_nan=False)
+        raises(TypeError, _pypyjson.encode, {(1, 2): 3}, default)
+        check({(1, 2): 3, "a": 4}, '{"a": 4}', skipkeys=True)
+        raises(UnicodeDecodeError, _pypyjson.encode, "\xc0", default)
+
+    def test_encode_not_ensure_ascii(self):
+        import _pypyjson
+        def default(o):
+            raise TypeError
+        res = _pypyjson.encode(["a\n", "\xc3\xa9"], default,
+                               ensure_ascii=False)
+        assert type(res) is str
+        assert res == '["a\\n", "\xc3\xa9"]'
+        res = _pypyjson.encode(["a", u"\xe9\""], default, ensure_ascii=False)
+        assert type(res) is unicode
+        assert res == u'["a", "\xe9\\""]'
+
+    def test_encode_default(self):
+        import _pypyjson
+        class A(object):
+            pass
+        def default(o):
+            if isinstance(o, A):
+                return {"A": [1, 2]}
+            if isinstance(o, set):
+                return sorted(o)
+            raise TypeError(repr(o))
+        assert _pypyjson.encode([A(), set([3, 1])], default) == (
+            '[{"A": [1, 2]}, [1, 3]]')
+        raises(TypeError, _pypyjson.encode, [object()], default)
+
+    def test_encode_subclasses(self):
+        import _pypyjson
+        def default(o):
+            raise TypeError
+        class MyDict(dict):
+            def iteritems(self):
+                return iter([("x", 1)])
+        class MyInt(int):
+            pass
+        class MyStr(str):
+            pass
+        assert _pypyjson.encode(MyDict(a=5), default) == '{"x": 1}'
+        assert _pypyjson.encode([MyInt(7), MyStr("s")], default) == (
+            '[7, "s"]')
+
+    def test_encode_circular(self):
+        import _pypyjson
+        def default(o):
+            return o
+        l = [1]
+        l.append(l)
+        raises(ValueError, _pypyjson.encode, l, default)
+        d = {}
+        d["a"] = d
+        raises(ValueError, _pypyjson.encode, d, default)
+        raises(ValueError, _pypyjson.encode, [object()], default)
+        # the same object can appear several times, if not nested
+        x = [1]
+        assert _pypyjson.encode([x, x], default) == '[[1], [1]]'
+
+    def test_stream_decoder(self):
+        import _pypyjson
+        dec = _pypyjson.StreamDecoder()
+        assert list(dec) == []
+        dec.feed('{"a": [1, 2')
+        assert list(dec) == []
+        dec.feed(']}\n"x\\"}"  42')
+        assert list(dec) == [{u'a': [1, 2]}, u'x"}']
+        # '42' could continue in the next chunk
+        dec.feed('3 null\n')
+        assert list(dec) == [423, None]
+        dec.feed('[]')
+        dec.close()
+        assert list(dec) == [[]]
+        raises(ValueError, dec.feed, '1')
+
+    def test_stream_decoder_items(self):
+        import _pypyjson
+        dec = _pypyjson.StreamDecoder(items=True)
+        res = []
+        for c in ' [ {"a": 1} , [2, [3]],"]", 4.5,true]':
+            dec.feed(c)
+            res.extend(dec)
+        dec.close()
+        res.extend(dec)
+        assert res == [{u'a': 1}, [2, [3]], u']', 4.5, True]
+        #
+        dec = _pypyjson.StreamDecoder(items=True)
+        dec.feed('[]')
+        dec.close()
+        assert list(dec) == []
+
+    def test_stream_decoder_errors(self):
+        import _pypyjson
+        def decode(s, items=False):
+            dec = _pypyjson.StreamDecoder(items=items)
+            dec.feed(s)
+            dec.close()
+            return list(dec)
+        raises(ValueError, decode, '{"a": 1')
+        raises(ValueError, decode, '[1, 2] 3', items=True)
+        raises(ValueError, decode, '[1, 2', items=True)
+        raises(ValueError, decode, '{"a": 1}', items=True)
+        raises(ValueError, decode, '[1 2]', items=True)
+        raises(ValueError, decode, '[1, 2,]', items=True)
+        raises(ValueError, decode, '1 ] 2')
+        raises(ValueError, decode, '{"a" 1}')
+        raises(TypeError, _pypyjson.StreamDecoder().feed, u'1')
+        # the positions are counted from the start of the stream
+        dec = _pypyjson.StreamDecoder()
+        dec.feed('[1, 2]  {"a": 1}\n')
+        assert list(dec) == [[1, 2], {u'a': 1}]
+        dec.feed('  [1, 2 3]')
+        exc = raises(ValueError, list, dec)
+        assert str(exc.value) == "Unexpected '3' when decoding array (char 25)"
+
+    def test_stream_decoder_many_values(self):
+        import _pypyjson
+        dec = _pypyjson.StreamDecoder()
+        data = ' '.join(['[%d]' % i for i in range(1000)])
+        dec.feed(data[:2500])
+        res = list(dec)
+        dec.feed(data[2500:])
+        dec.close()
+        res.extend(dec)
+        assert res == [[i] for i in range(1000)]
+
+    def test_iterload(self):
+        import _pypyjson
+        from StringIO import StringIO
+        data = '\n'.join(['{"id": %d, "name": "x%d"}' % (i, i)
+                          for i in range(100)])
+        for chunksize in [1, 7, 1000]:
+            it = _pypyjson.iterload(StringIO(data), chunksize=chunksize)
+            res = list(it)
+            assert len(res) == 100
+            assert res[42] == {u'id': 42, u'name': u'x42'}
+        it = _pypyjson.iterload(StringIO('[' + data.replace('\n', ',') + ']'),
+                                items=True, chunksize=5)
+        assert [d[u'id'] for d in it] == range(100)
+        raises(ValueError, _pypyjson.iterload, StringIO(''), chunksize=0)
+
+    def test_repeated_shapes(self):
+        import _pypyjson
+        s = ('[{"a": 1, "b": [{"a": 2}]}, {"a": 3, "b": 4}, {"b": 5, "a": 6},'
+             ' {"a": 7, "b": 8, "c": 9}, {"a": 10}, {"a": 11, "b": 12}]')
+        res = _pypyjson.loads(s)
+        assert res == [{u"a": 1, u"b": [{u"a": 2}]}, {u"a": 3, u"b": 4},
+                       {u"b": 5, u"a": 6}, {u"a": 7, u"b": 8, u"c": 9},
+                       {u"a": 10}, {u"a": 11, u"b": 12}]
+        # the keys are shared
+        assert res[1].keys()[0] is res[5].keys()[0]
+
+    def test_shapes_duplicate_and_escaped_keys(self):
+        import _pypyjson
+        s = '[%s]' % ', '.join(['{"a": 1, "a": 2}'] * 4)
+        assert _pypyjson.loads(s) == [{u"a": 2}] * 4
+        s = ('[{"\\u00e9": 1, "\\"": 2}, {"\xc3\xa9": 3, "\\"": 4},'
+             ' {"\\u00e9": 5, "\\"": 6}]')
+        assert _pypyjson.loads(s) == [{u"\xe9": 1, u'"': 2},
+                                      {u"\xe9": 3, u'"': 4},
+                                      {u"\xe9": 5, u'"': 6}]
+        raises(ValueError, _pypyjson.loads, '[{"a": 1}, {"a": 2}, {"a"3}]')
+        raises(ValueError, _pypyjson.loads, '[{"a": 1}, {"a')
+
+    def test_shapes_many_keys(self):
+        import _pypyjson
+        d = dict([(u"k%d" % i, i) for i in range(200)])
+        s = '{%s}' % ', '.join(['"k%d": %d' % (i, i) for i in range(200)])
+        assert _pypyjson.loads('[%s, %s, %s]' % (s, s, s)) == [d, d, d]
+
+    def test_shapes_unique_keys(self):
+        import _pypyjson
+        dec = _pypyjson.StreamDecoder()
+        for i in range(100):
+            dec.feed('{"a": 1, "id%d": %d} ' % (i, i))
+        dec.close()
+        assert list(dec) == [{u"a": 1, u"id%d" % i: i} for i in range(100)]
@@ -20,6 +20,7 @@ class Module(MixedModule):
             self.appleveldefs.update({
                 'dump_rpy_heap': 'app_referents.dump_rpy_heap',
                 'get_stats': 'app_referents.get_stats',
+                'get_pause_stats': 'app_referents.get_pause_stats',
                 })
             self.interpleveldefs.update({
                 'get_rpy_roots': 'referents.get_rpy_roots',
@@ -30,6 +31,9 @@ class Module(MixedModule):
                 'get_referents': 'referents.get_referents',
                 'get_referrers': 'referents.get_referrers',
                 '_get_stats': 'referents.get_stats',
+                '_get_pause_histogram': 'referents.get_pause_histogram',
+                'set_param': 'interp_gc.set_param',
+                'get_param': 'interp_gc.get_param',
                 '_dump_rpy_heap': 'referents._dump_rpy_heap',
                 'get_typeids_z': 'referents.get_typeids_z',
                 'get_typeids_list': 'referents.get_typeids_list',
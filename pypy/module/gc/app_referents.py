@@ -111,3 +111,40 @@ class GcStats(object):
 
 def get_stats(memory_pressure=False):
     return GcStats(gc._get_stats(memory_pressure=memory_pressure))
+
+
+class GcPauseStats(object):
+    """The distribution of the durations of the GC pauses since the start,
+    in the same unit as the 'duration' of the gc.hooks stats.  The pauses
+    are counted in buckets whose limits are powers of two, so the values
+    returned by percentile() are upper bounds, precise to a factor 2."""
+
+    def __init__(self, counts):
+        self.counts = counts
+        self.count = sum(counts)
+        self.histogram = [(2 ** (i + 1), n) for i, n in enumerate(counts)
+                          if n]
+
+    def percentile(self, p):
+        """The duration that 'p' percent of the pauses did not exceed"""
+        if not 0 <= p <= 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if self.count == 0:
+            return 0
+        target = self.count * p / 100.0
+        seen = 0
+        for limit, n in self.histogram:
+            seen += n
+            if seen >= target:
+                return limit
+        return self.histogram[-1][0]
+
+    def __repr__(self):
+        return ("<GcPauseStats: %d pauses, 50%%: %d, 90%%: %d, 99%%: %d, "
+                "max: %d>" % (self.count, self.percentile(50),
+                              self.percentile(90), self.percentile(99),
+                              self.percentile(100)))
+
+
+def get_pause_stats():
+    return GcPauseStats(gc._get_pause_histogram())
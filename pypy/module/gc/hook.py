@@ -1,11 +1,13 @@
 from rpython.memory.gc.hook import GcHooks
 from rpython.memory.gc import incminimark 
 from rpython.rlib.nonconst import NonConstant
+from rpython.rlib import rgc
 from rpython.rlib.rarithmetic import r_uint, r_longlong, longlongmax
 from pypy.interpreter.gateway import interp2app, unwrap_spec, WrappedDefault
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.typedef import TypeDef, interp_attrproperty, GetSetProperty
 from pypy.interpreter.executioncontext import AsyncAction
+from pypy.interpreter.error import oefmt
 
 class LowLevelGcHooks(GcHooks):
     """
@@ -76,6 +78,7 @@ class W_AppLevelHooks(W_Root):
         self.gc_minor = GcMinorHookAction(space)
         self.gc_collect_step = GcCollectStepHookAction(space)
         self.gc_collect = GcCollectHookAction(space)
+        self.max_pause = 0
 
     def descr_get_on_gc_minor(self, space):
         return self.gc_minor.w_callable
@@ -101,6 +104,20 @@ class W_AppLevelHooks(W_Root):
         self.gc_collect.w_callable = w_obj
         self.gc_collect.fix_annotation()
 
+    def descr_get_max_pause(self, space):
+        return space.newint(self.max_pause)
+
+    def descr_set_max_pause(self, space, w_obj):
+        if space.is_none(w_obj):
+            duration = 0
+        else:
+            duration = space.int_w(w_obj)
+            if duration < 0:
+                raise oefmt(space.w_ValueError,
+                            "max_pause must be positive or zero")
+        self.max_pause = duration
+        rgc.set_max_pause(duration)
+
     def descr_set(self, space, w_obj):
         w_a = space.getattr(w_obj, space.newtext('on_gc_minor'))
         w_b = space.getattr(w_obj, space.newtext('on_gc_collect_step'))
@@ -297,6 +314,10 @@ W_AppLevelHooks.typedef = TypeDef(
         W_AppLevelHooks.descr_get_on_gc_collect,
         W_AppLevelHooks.descr_set_on_gc_collect),
 
+    max_pause = GetSetProperty(
+        W_AppLevelHooks.descr_get_max_pause,
+        W_AppLevelHooks.descr_set_max_pause),
+
     set = interp2app(W_AppLevelHooks.descr_set),
     reset = interp2app(W_AppLevelHooks.descr_reset),
     )
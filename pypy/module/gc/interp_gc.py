@@ -79,6 +79,51 @@ def disable_finalizers(space):
 
 # ____________________________________________________________
 
+GC_PARAMS = {
+    'nursery': rgc.GC_PARAM_NURSERY,
+    'major_collect': rgc.GC_PARAM_MAJOR_COLLECT,
+    'max': rgc.GC_PARAM_MAX,
+    'growth': rgc.GC_PARAM_GROWTH,
+    'increment_step': rgc.GC_PARAM_INCREMENT_STEP,
+}
+# the parameters which are sizes in bytes; the others are floats
+GC_SIZE_PARAMS = [rgc.GC_PARAM_NURSERY, rgc.GC_PARAM_MAX,
+                  rgc.GC_PARAM_INCREMENT_STEP]
+
+def _get_param_no(space, name):
+    try:
+        return GC_PARAMS[name]
+    except KeyError:
+        raise oefmt(space.w_ValueError, "unknown GC parameter '%s'", name)
+
+@unwrap_spec(name='text')
+def set_param(space, name, w_value):
+    """set_param(name, value)
+
+    Change a parameter of the GC while the program runs.  The names are
+    'nursery', 'major_collect', 'max', 'growth' and 'increment_step', with
+    the same meaning as the PYPY_GC_* environment variables.  The sizes
+    are given in bytes.  A new nursery size is used after the next minor
+    collection."""
+    param_no = _get_param_no(space, name)
+    value = space.float_w(w_value)
+    if not rgc.set_gc_param(param_no, value):
+        raise oefmt(space.w_ValueError,
+                    "invalid value for the GC parameter '%s'", name)
+
+@unwrap_spec(name='text')
+def get_param(space, name):
+    """get_param(name)
+
+    Return the current value of a GC parameter; see set_param()."""
+    param_no = _get_param_no(space, name)
+    value = rgc.get_gc_param(param_no)
+    if param_no in GC_SIZE_PARAMS:
+        return space.newint(int(value))
+    return space.newfloat(value)
+
+# ____________________________________________________________
+
 @unwrap_spec(filename='fsencode')
 def dump_heap_stats(space, filename):
     tb = rgc._heap_stats()
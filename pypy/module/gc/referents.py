@@ -220,3 +220,8 @@ W_GcStats.typedef = TypeDef("GcStats",
 @unwrap_spec(memory_pressure=bool)
 def get_stats(space, memory_pressure=False):
     return W_GcStats(memory_pressure)
+
+def get_pause_histogram(space):
+    list_w = [space.newint(rgc.get_stats(rgc.PAUSE_HISTOGRAM + i))
+              for i in range(rgc.PAUSE_HISTOGRAM_SIZE)]
+    return space.newlist(list_w)
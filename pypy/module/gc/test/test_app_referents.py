@@ -37,3 +37,23 @@ def test_interface_to_dump_rpy_heap_fd(space):
             gc.dump_rpy_heap(fd)""")
     except NotImplementedError:
         pass
+
+def test_get_pause_stats(space, monkeypatch):
+    from rpython.rlib import rgc
+    def get_stats(stats_no):
+        return {rgc.PAUSE_HISTOGRAM + 3: 90,
+                rgc.PAUSE_HISTOGRAM + 5: 9,
+                rgc.PAUSE_HISTOGRAM + 10: 1}.get(stats_no, 0)
+    monkeypatch.setattr(rgc, 'get_stats', get_stats)
+    space.appexec([], """():
+        import gc
+        stats = gc.get_pause_stats()
+        assert stats.count == 100
+        assert stats.histogram == [(16, 90), (64, 9), (2048, 1)]
+        assert stats.percentile(50) == 16
+        assert stats.percentile(90) == 16
+        assert stats.percentile(95) == 64
+        assert stats.percentile(100) == 2048
+        assert '100 pauses' in repr(stats)
+        raises(ValueError, stats.percentile, 101)
+    """)
@@ -118,6 +118,48 @@ class AppTestGcDumpHeap(object):
         gc.dump_heap_stats(self.fname)
 
 
+class AppTestGcParams(object):
+
+    def setup_class(cls):
+        from rpython.rlib import rgc
+        params = {rgc.GC_PARAM_NURSERY: 4194304.0,
+                  rgc.GC_PARAM_MAJOR_COLLECT: 1.82}
+
+        def set_gc_param(param_no, value):
+            if value <= 1.0:
+                return False
+            params[param_no] = value
+            return True
+
+        def get_gc_param(param_no):
+            return params.get(param_no, 0.0)
+
+        cls._saved = rgc.set_gc_param, rgc.get_gc_param
+        rgc.set_gc_param = set_gc_param
+        rgc.get_gc_param = get_gc_param
+
+    def teardown_class(cls):
+        from rpython.rlib import rgc
+        rgc.set_gc_param, rgc.get_gc_param = cls._saved
+
+    def test_get_set_param(self):
+        import gc
+        assert gc.get_param('nursery') == 4194304
+        assert type(gc.get_param('nursery')) is int
+        assert gc.get_param('major_collect') == 1.82
+        gc.set_param('nursery', 1024 * 1024)
+        assert gc.get_param('nursery') == 1024 * 1024
+        gc.set_param('growth', 1.5)
+        assert gc.get_param('growth') == 1.5
+        gc.set_param('max', 2.0 ** 32)
+        assert gc.get_param('max') == 2 ** 32
+        raises(ValueError, gc.set_param, 'growth', 0.5)
+        assert gc.get_param('growth') == 1.5
+        raises(ValueError, gc.set_param, 'foo', 12)
+        raises(ValueError, gc.get_param, 'foo')
+        raises(TypeError, gc.set_param, 'nursery', '4MB')
+
+
 class AppTestGcMethodCache(object):
 
     def test_clear_method_cache(self):
@@ -176,3 +176,13 @@ class AppTestGcHooks(object):
         assert gc.hooks.on_gc_minor is None
         assert gc.hooks.on_gc_collect_step is None
         assert gc.hooks.on_gc_collect is None
+
+    def test_max_pause(self):
+        import gc
+        assert gc.hooks.max_pause == 0
+        gc.hooks.max_pause = 50000
+        assert gc.hooks.max_pause == 50000
+        raises(ValueError, "gc.hooks.max_pause = -1")
+        assert gc.hooks.max_pause == 50000
+        gc.hooks.max_pause = None
+        assert gc.hooks.max_pause == 0
@@ -2,7 +2,7 @@
 Implementation of the interpreter-level default import logic.
 """
 
-import sys, os, stat
+import sys, os, stat, time
 
 from pypy.interpreter.module import Module
 from pypy.interpreter.gateway import interp2app, unwrap_spec
@@ -75,12 +75,112 @@ def has_so_extension(space):
     return (space.config.objspace.usemodules.cpyext or
             space.config.objspace.usemodules._cffi_backend)
 
+# __________________________________________________________________
+#
+# Cache of the listings of the directories searched for modules, to avoid
+# one stat() per candidate file and per sys.path entry.  A listing is used
+# as long as the mtime of the directory does not change; it is only
+# trusted if it was taken some time after that mtime, because a file
+# created in the same tick of a coarse filesystem clock would otherwise be
+# missed.  The mtime is checked only once per directory and per call to
+# find_module(): each call starts a new 'generation', and a listing
+# validated in the current generation is used without any stat().
+
+LISTING_MTIME_MARGIN = 2.0    # seconds
+
+class DirectoryListing(object):
+    def __init__(self, mtime, names, listed_at, validated):
+        self.mtime = mtime
+        self.names = names          # None if the directory cannot be listed
+        self.listed_at = listed_at
+        self.validated = validated  # generation of the last mtime check
+
+class ImportPathCache(object):
+    def __init__(self, space):
+        self.listings = {}
+        self.generation = 0
+
+    def new_search(self):
+        """Called at the start of find_module(): the listings must be
+        validated again against the mtime of their directory."""
+        self.generation += 1
+
+    def get_listing(self, directory):
+        """Return a dict whose keys are the names in 'directory', or None
+        if it cannot be listed."""
+        listing = self.listings.get(directory, None)
+        if listing is not None and listing.validated == self.generation:
+            return listing.names
+        try:
+            st = os.stat(directory)
+        except OSError:
+            # the directory doesn't exist: neither do its files.  The
+            # mtime -1.0 makes sure that this is checked again next time.
+            self.listings[directory] = DirectoryListing(-1.0, {}, 0.0,
+                                                        self.generation)
+            return {}
+        mtime = st.st_mtime
+        if (listing is not None and listing.names is not None and
+                listing.mtime == mtime and
+                listing.listed_at - mtime > LISTING_MTIME_MARGIN):
+            listing.validated = self.generation
+            return listing.names
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            d = None
+        else:
+            d = {}
+            for name in names:
+                d[name] = True
+        self.listings[directory] = DirectoryListing(mtime, d, time.time(),
+                                                    self.generation)
+        return d
+
+def _split_path(path):
+    index = path.rfind(os.sep)
+    if os.altsep is not None:
+        index2 = path.rfind(os.altsep)
+        index = max(index, index2)
+    if index < 0:
+        return os.curdir, path
+    return path[:index+1], path[index+1:]
+
+def _lookup_listing(space, path):
+    directory, name = _split_path(path)
+    names = space.fromcache(ImportPathCache).get_listing(directory)
+    if names is None:
+        return None, False
+    return names, name in names
+
+def cached_file_exists(space, path):
+    "Like file_exists(), but using the cached directory listings."
+    names, found = _lookup_listing(space, path)
+    if names is None:
+        return file_exists(path)
+    return found and os.path.isfile(path)
+
+def cached_path_exists(space, path):
+    "Like path_exists(), but using the cached directory listings."
+    names, found = _lookup_listing(space, path)
+    if names is None:
+        return path_exists(path)
+    return found
+
+def cached_isdir(space, path):
+    "Test whether the given path is an existing directory."
+    names, found = _lookup_listing(space, path)
+    if names is None:
+        return os.path.isdir(path) and case_ok(path)
+    return found and os.path.isdir(path)
+
 def has_init_module(space, filepart):
     "Return True if the directory filepart qualifies as a package."
     init = os.path.join(filepart, "__init__")
-    if path_exists(init + ".py"):
+    if cached_path_exists(space, init + ".py"):
         return True
-    if space.config.objspace.lonepycfiles and path_exists(init + ".pyc"):
+    if (space.config.objspace.lonepycfiles and
+            cached_path_exists(space, init + ".pyc")):
         return True
     return False
 
@@ -91,13 +191,13 @@ def find_modtype(space, filepart):
     """
     # check the .py file
     pyfile = filepart + ".py"
-    if file_exists(pyfile):
+    if cached_file_exists(space, pyfile):
         return PY_SOURCE, ".py", "U"
 
     # on Windows, also check for a .pyw file
     if _WIN32:
         pyfile = filepart + ".pyw"
-        if file_exists(pyfile):
+        if cached_file_exists(space, pyfile):
             return PY_SOURCE, ".pyw", "U"
 
     # The .py file does not exist.  By default on PyPy, lonepycfiles
@@ -108,14 +208,14 @@ def find_modtype(space, filepart):
     # check the .pyc file
     if space.config.objspace.lonepycfiles:
         pycfile = filepart + ".pyc"
-        if file_exists(pycfile):
+        if cached_file_exists(space, pycfile):
             # existing .pyc file
             return PY_COMPILED, ".pyc", "rb"
 
     if has_so_extension(space):
         so_extension = get_so_extension(space)
         pydfile = filepart + so_extension
-        if file_exists(pydfile):
+        if cached_file_exists(space, pydfile):
             return C_EXTENSION, so_extension, "rb"
 
     return SEARCH_ERROR, None, None
@@ -561,6 +661,7 @@ def find_module(space, modulename, w_modulename, partname, w_path,
     #     when w_path is null
 
     if w_path is not None:
+        space.fromcache(ImportPathCache).new_search()
         for w_pathitem in space.unpackiterable(w_path):
             # sys.path_hooks import hook
             if (w_lib_extensions is not None and
@@ -574,7 +675,7 @@ def find_module(space, modulename, w_modulename, partname, w_path,
             path = space.fsencode_w(w_pathitem)
             filepart = os.path.join(path, partname)
             log_pyverbose(space, 2, "# trying %s\n" % (filepart,))
-            if os.path.isdir(filepart) and case_ok(filepart):
+            if cached_isdir(space, filepart):
                 if has_init_module(space, filepart):
                     return FindInfo(PKG_DIRECTORY, filepart, None)
                 else:
@@ -1032,9 +1133,9 @@ def check_compiled_module(space, pycfilename, expected_mtime):
 
 def read_compiled_module(space, cpathname, strbuf):
     """ Read a code object from a file and check it for validity """
+    from pypy.module.marshal.interp_marshal import loads_from_string
 
-    w_marshal = space.getbuiltinmodule('marshal')
-    w_code = space.call_method(w_marshal, 'loads', space.newbytes(strbuf))
+    w_code = loads_from_string(space, strbuf)
     if not isinstance(w_code, Code):
         raise oefmt(space.w_ImportError, "Non-code object in %s", cpathname)
     return w_code
@@ -837,6 +837,73 @@ class TestAbi:
             assert importing.get_so_extension(space1) == '.TESTi.so'
             assert importing.get_so_extension(space2) == '.so'
 
+class TestImportPathCache:
+    def test_listing_is_cached(self):
+        import time
+        d = udir.ensure('pathcache1', dir=1)
+        d.join('a.py').write('')
+        old = time.time() - 100
+        os.utime(str(d), (old, old))
+        cache = importing.ImportPathCache(self.space)
+        names = cache.get_listing(str(d))
+        assert names == {'a.py': True}
+        cache.new_search()
+        assert cache.get_listing(str(d)) is names
+        # adding a file changes the mtime of the directory
+        d.join('b.py').write('')
+        cache.new_search()
+        names = cache.get_listing(str(d))
+        assert sorted(names) == ['a.py', 'b.py']
+
+    def test_recent_listing_not_trusted(self):
+        d = udir.ensure('pathcache2', dir=1)
+        d.join('a.py').write('')
+        cache = importing.ImportPathCache(self.space)
+        names = cache.get_listing(str(d))
+        assert names == {'a.py': True}
+        # listed only once per find_module()
+        assert cache.get_listing(str(d)) is names
+        # the mtime of the directory is too recent: listed again
+        cache.new_search()
+        assert cache.get_listing(str(d)) is not names
+
+    def test_missing_directory(self):
+        cache = importing.ImportPathCache(self.space)
+        assert cache.get_listing(str(udir.join('pathcache_missing'))) == {}
+
+    def test_stat_once_per_search(self, monkeypatch):
+        d = udir.ensure('pathcache4', dir=1)
+        d.join('a.py').write('')
+        missing = str(udir.join('pathcache_missing2'))
+        cache = importing.ImportPathCache(self.space)
+        stats = []
+        orig_stat = os.stat
+        def counting_stat(path):
+            stats.append(path)
+            return orig_stat(path)
+        monkeypatch.setattr(importing.os, 'stat', counting_stat)
+        for i in range(2):
+            cache.new_search()
+            del stats[:]
+            for j in range(5):
+                assert 'a.py' in cache.get_listing(str(d))
+                assert cache.get_listing(missing) == {}
+            assert sorted(stats) == sorted([str(d), missing])
+
+    def test_cached_exists(self):
+        space = self.space
+        d = udir.ensure('pathcache3', dir=1)
+        d.join('a.py').write('')
+        d.ensure('pkg', dir=1)
+        assert importing.cached_file_exists(space, str(d.join('a.py')))
+        assert not importing.cached_file_exists(space, str(d.join('b.py')))
+        assert not importing.cached_file_exists(space, str(d.join('pkg')))
+        assert importing.cached_path_exists(space, str(d.join('pkg')))
+        assert importing.cached_isdir(space, str(d.join('pkg')))
+        assert not importing.cached_isdir(space, str(d.join('a.py')))
+        assert not importing.cached_isdir(space,
+                                          str(udir.join('nothere', 'pkg')))
+
 def _getlong(data):
     x = marshal.dumps(data)
     return x[-4:]
@@ -53,6 +53,12 @@ ignored."""
     obj = u.load_w_obj()
     return obj
 
+def loads_from_string(space, s):
+    """Interp-level version of loads() taking an RPython string, used to
+    load .pyc files without a detour through app-level."""
+    u = StringUnmarshaller(space, None, s)
+    return u.load_w_obj()
+
 
 class AbstractReaderWriter(object):
     def __init__(self, space):
@@ -402,8 +408,11 @@ class Unmarshaller(_Base):
         return self.get(lng)
 
     def get_w_obj(self, allow_null=False):
+        return self.get_w_obj_of_type(self.get1(), allow_null)
+
+    def get_w_obj_of_type(self, tc, allow_null=False):
+        """Like get_w_obj(), when the typecode was already read."""
         space = self.space
-        tc = self.get1()
         w_ret = self._dispatch[ord(tc)](space, self, tc)
         if w_ret is None and not allow_null:
             raise oefmt(space.w_TypeError, "NULL object in marshal data")
@@ -443,9 +452,11 @@ class Unmarshaller(_Base):
 
 class StringUnmarshaller(Unmarshaller):
     # Unmarshaller with inlined buffer string
-    def __init__(self, space, w_str):
+    def __init__(self, space, w_str, bufstr=None):
         Unmarshaller.__init__(self, space, None)
-        self.bufstr = space.getarg_w('s#', w_str)
+        if bufstr is None:
+            bufstr = space.getarg_w('s#', w_str)
+        self.bufstr = bufstr
         self.bufpos = 0
         self.limit = len(self.bufstr)
 
@@ -91,3 +91,23 @@ def test_long_more(space):
         for i in range(100):
             _marshal_check(sign * ((1L << i) - 1L))
             _marshal_check(sign * (1L << i))
+
+
+def test_loads_from_string_code(space):
+    w_code = space.appexec([], """():
+        def f(spam, eggs):
+            spam.eggs = eggs
+            return spam.spam
+        return f.__code__""")
+    w_marshal = space.getbuiltinmodule('marshal')
+    w_data = space.call_method(w_marshal, 'dumps', w_code)
+    data = space.bytes_w(w_data)
+    # the names are interned once and referenced afterwards
+    assert 'R' in data
+    w_res = interp_marshal.loads_from_string(space, data)
+    assert space.eq_w(w_res, w_code)
+    for attr in ['co_names', 'co_varnames']:
+        assert space.eq_w(space.getattr(w_res, space.wrap(attr)),
+                          space.getattr(w_code, space.wrap(attr)))
+    assert space.is_w(space.getattr(w_res, space.wrap('co_name')),
+                      space.getattr(w_code, space.wrap('co_name')))
@@ -2,6 +2,9 @@ from pypy.interpreter.mixedmodule import MixedModule
 
 class Module(MixedModule):
     appleveldefs = {
+        'enable_warmup_profile': 'app_warmup.enable_warmup_profile',
+        'load_warmup_profile': 'app_warmup.load_warmup_profile',
+        'save_warmup_profile': 'app_warmup.save_warmup_profile',
     }
 
     interpleveldefs = {
@@ -12,11 +15,20 @@ class Module(MixedModule):
         'dont_trace_here': 'interp_jit.dont_trace_here',
         'trace_next_iteration': 'interp_jit.trace_next_iteration',
         'trace_next_iteration_hash': 'interp_jit.trace_next_iteration_hash',
+        'trace_when_reached': 'interp_jit.trace_when_reached',
+        'record_compiled_loops': 'interp_resop.record_compiled_loops',
+        'get_compiled_loops': 'interp_resop.get_compiled_loops',
         'set_compile_hook': 'interp_resop.set_compile_hook',
         'set_abort_hook': 'interp_resop.set_abort_hook',
         'set_trace_too_long_hook': 'interp_resop.set_trace_too_long_hook',
+        'set_bridge_chain_hook': 'interp_resop.set_bridge_chain_hook',
+        'record_guard_failures': 'interp_resop.record_guard_failures',
+        'get_guard_failures': 'interp_resop.get_guard_failures',
+        'record_code_stats': 'interp_resop.record_code_stats',
+        'get_code_stats': 'interp_resop.get_code_stats',
         'get_stats_snapshot': 'interp_resop.get_stats_snapshot',
         'get_stats_asmmemmgr': 'interp_resop.get_stats_asmmemmgr',
+        'get_stats_evicted_loops': 'interp_resop.get_stats_evicted_loops',
         # those things are disabled because they have bugs, but if
         # they're found to be useful, fix test_ztranslation_jit_stats
         # in the backend first. get_stats_snapshot still produces
@@ -0,0 +1,72 @@
+""" Warmup profiles: the loops compiled by one run of a program are saved to
+a file, and the next run of the same program starts tracing them the first
+time they are reached instead of waiting for them to become hot again.
+
+The code objects are identified across runs by their filename, name, first
+line number and the hash of their bytecode, so the entries of functions
+which were modified in the meantime are ignored.
+"""
+
+_pending = {}
+
+
+def _code_key(code):
+    return (code.co_filename, code.co_name, code.co_firstlineno,
+            hash(code.co_code))
+
+
+def _seed_code(code):
+    import pypyjit
+    for next_instr, is_being_profiled in _pending.get(_code_key(code), ()):
+        pypyjit.trace_when_reached(next_instr, is_being_profiled, code)
+
+
+def save_warmup_profile(filename):
+    """save_warmup_profile(filename)
+
+    Write the loops compiled since record_compiled_loops(True) was called
+    to the given file, together with the entries of the profile loaded by
+    load_warmup_profile(), if any."""
+    import marshal
+    import pypyjit
+    entries = {}
+    for key, loops in _pending.items():
+        entries[key] = set(loops)
+    for code, next_instr, is_being_profiled in pypyjit.get_compiled_loops():
+        loops = entries.setdefault(_code_key(code), set())
+        loops.add((next_instr, is_being_profiled))
+    data = [key + (sorted(loops),) for key, loops in entries.items()]
+    with open(filename, 'wb') as f:
+        marshal.dump(data, f)
+
+
+def load_warmup_profile(filename):
+    """load_warmup_profile(filename)
+
+    Read a profile written by save_warmup_profile().  The loops it contains
+    are traced as soon as they are reached, for the code objects created
+    from now on.  Uses __pypy__.set_code_callback()."""
+    import marshal
+    import __pypy__
+    with open(filename, 'rb') as f:
+        data = marshal.load(f)
+    for entry in data:
+        co_filename, co_name, co_firstlineno, codehash, loops = entry
+        key = (co_filename, co_name, co_firstlineno, codehash)
+        _pending[key] = [tuple(loop) for loop in loops]
+    __pypy__.set_code_callback(_seed_code)
+
+
+def enable_warmup_profile(filename):
+    """enable_warmup_profile(filename)
+
+    Load the warmup profile stored in the given file, if it exists, and
+    save the loops compiled by this run to the same file at exit.  Call
+    this as early as possible, e.g. from sitecustomize."""
+    import atexit
+    import os
+    import pypyjit
+    if os.path.exists(filename):
+        load_warmup_profile(filename)
+    pypyjit.record_compiled_loops(True)
+    atexit.register(save_warmup_profile, filename)
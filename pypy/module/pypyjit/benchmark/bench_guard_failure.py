@@ -0,0 +1,76 @@
+""" A microbenchmark of the cost of a guard failure that does not get a
+bridge, i.e. that goes through the blackhole interpreter every time.
+
+Run it with pypy-c:
+
+    pypy-c bench_guard_failure.py [iterations]
+
+The first column is the time per iteration of a loop in which a guard
+fails one time out of 'period', the second one is the same without the
+cache of the decoded resume data ('frames_cache' JIT parameter), and the
+third one is the same loop run with bridges enabled.  The difference
+with the third column is the blackhole interpreter.
+"""
+
+import sys, time
+
+try:
+    import pypyjit
+except ImportError:
+    pypyjit = None
+
+
+class Point(object):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def step(p, i, period):
+    if i % period == 0:     # <- the guard that fails
+        return p.x - p.y
+    return p.x + p.y
+
+
+def loop(n, period):
+    total = 0
+    for i in xrange(n):
+        p = Point(i, 1)     # a virtual, rebuilt by the blackhole interpreter
+        total += step(p, i, period)
+    return total
+
+
+def measure(n, period, trace_eagerness, frames_cache=1):
+    if pypyjit is not None:
+        pypyjit.set_param(trace_eagerness=trace_eagerness,
+                          frames_cache=frames_cache)
+    loop(n // 10, period)   # warm up
+    t0 = time.time()
+    loop(n, period)
+    tk = time.time()
+    return (tk - t0) / n
+
+
+PERIODS = [2, 10, 100, 1000]
+
+def main(n):
+    # a trace_eagerness of 10**9 means that the guard never gets a bridge;
+    # measure that first, because a bridge, once compiled, stays
+    t_blackhole = [measure(n, period, 10 ** 9) for period in PERIODS]
+    t_uncached = [measure(n, period, 10 ** 9, frames_cache=0)
+                  for period in PERIODS]
+    t_bridge = [measure(n, period, 200) for period in PERIODS]
+    print "%-8s %15s %15s %15s" % ("period", "no bridge (ns)",
+                                   "no cache (ns)", "bridge (ns)")
+    for i in range(len(PERIODS)):
+        print "%-8d %15.1f %15.1f %15.1f" % (PERIODS[i],
+                                             t_blackhole[i] * 1e9,
+                                             t_uncached[i] * 1e9,
+                                             t_bridge[i] * 1e9)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(10000000)
@@ -4,7 +4,10 @@ from rpython.rlib.jit import JitHookInterface, Counters
 
 from pypy.interpreter.error import OperationError
 from pypy.module.pypyjit.interp_resop import (Cache, wrap_greenkey,
-    WrappedOp, W_JitLoopInfo, wrap_oplist)
+    WrappedOp, W_JitLoopInfo, wrap_oplist, record_guards, records_guards,
+    record_guard_failure, get_bridge_depth,
+    record_code_stats_of_loop, record_blackhole_time, get_code_stats_of,
+    greenkey_to_pycode, record_compiled_loop)
 
 class PyPyJitIface(JitHookInterface):
     def are_hooks_enabled(self):
@@ -12,12 +15,19 @@ class PyPyJitIface(JitHookInterface):
         cache = space.fromcache(Cache)
         return (cache.w_compile_hook is not None or
                 cache.w_abort_hook is not None or
-                cache.w_trace_too_long_hook is not None)
+                cache.w_trace_too_long_hook is not None or
+                cache.w_bridge_chain_hook is not None or
+                cache.record_loops or cache.record_guards or
+                cache.record_code_stats)
 
 
     def on_abort(self, reason, jitdriver, greenkey, greenkey_repr, logops, operations):
         space = self.space
         cache = space.fromcache(Cache)
+        if (cache.record_code_stats and greenkey is not None and
+                jitdriver.name == 'pypyjit'):
+            stats = get_code_stats_of(space, greenkey_to_pycode(greenkey))
+            stats.record_abort(reason)
         if cache.in_recursion:
             return
         if cache.w_abort_hook is not None:
@@ -58,6 +68,7 @@ class PyPyJitIface(JitHookInterface):
 
     def after_compile_bridge(self, debug_info):
         self._compile_hook(debug_info, is_bridge=True)
+        self._bridge_chain_hook(debug_info)
 
     def before_compile(self, debug_info):
         pass
@@ -68,6 +79,14 @@ class PyPyJitIface(JitHookInterface):
     def _compile_hook(self, debug_info, is_bridge):
         space = self.space
         cache = space.fromcache(Cache)
+        if cache.record_loops and not is_bridge:
+            jitdriver = debug_info.get_jitdriver()
+            if jitdriver.name == 'pypyjit':
+                record_compiled_loop(space, debug_info.greenkey)
+        if records_guards(cache):
+            record_guards(space, debug_info, is_bridge)
+        if cache.record_code_stats:
+            record_code_stats_of_loop(space, debug_info, is_bridge)
         if cache.in_recursion:
             return
         if cache.w_compile_hook is not None:
@@ -83,4 +102,32 @@ class PyPyJitIface(JitHookInterface):
             finally:
                 cache.in_recursion = False
 
+    def _bridge_chain_hook(self, debug_info):
+        space = self.space
+        cache = space.fromcache(Cache)
+        if cache.in_recursion:
+            return
+        if cache.w_bridge_chain_hook is not None:
+            depth = get_bridge_depth(space, debug_info.fail_descr)
+            if depth < cache.bridge_chain_limit:
+                return
+            w_debug_info = W_JitLoopInfo(space, debug_info, is_bridge=True)
+            cache.in_recursion = True
+            try:
+                try:
+                    space.call_function(cache.w_bridge_chain_hook,
+                                        w_debug_info)
+                except OperationError as e:
+                    e.write_unraisable(space, "jit hook ",
+                                       cache.w_bridge_chain_hook)
+            finally:
+                cache.in_recursion = False
+
+    def on_blackhole(self, fail_descr, duration):
+        cache = self.space.fromcache(Cache)
+        if cache.record_code_stats:
+            record_blackhole_time(self.space, fail_descr, duration)
+        if cache.record_guards:
+            record_guard_failure(self.space, fail_descr)
+
 pypy_hooks = PyPyJitIface()
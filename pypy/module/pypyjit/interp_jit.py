@@ -232,6 +232,19 @@ def trace_next_iteration(space, next_instr, is_being_profiled, w_pycode):
         'pypyjit', r_uint(next_instr), int(is_being_profiled), ll_pycode)
     return space.w_None
 
+@unwrap_spec(next_instr=int, is_being_profiled=bool, w_pycode=PyCode)
+@dont_look_inside
+def trace_when_reached(space, next_instr, is_being_profiled, w_pycode):
+    """ trace_when_reached(next_instr, is_being_profiled, code)
+
+    Start tracing the next time the loop at 'next_instr' in 'code' is
+    reached, instead of waiting for it to become hot.
+    """
+    ll_pycode = cast_instance_to_gcref(w_pycode)
+    jit_hooks.trace_when_reached(
+        'pypyjit', r_uint(next_instr), int(is_being_profiled), ll_pycode)
+    return space.w_None
+
 @unwrap_spec(hash=r_uint)
 @dont_look_inside
 def trace_next_iteration_hash(space, hash):
@@ -1,4 +1,5 @@
 
+import weakref
 from pypy.interpreter.typedef import (TypeDef, GetSetProperty,
      interp_attrproperty, interp_attrproperty_w)
 from pypy.interpreter.baseobjspace import W_Root
@@ -25,11 +26,28 @@ class Cache(object):
         self.w_abort_hook = None
         self.w_trace_too_long_hook = None
         self.compile_hook_with_ops = False
+        self.record_loops = False
+        self.recorded_loops = {}
+        self.recorded_loops_limit = 1000
+        self.w_bridge_chain_hook = None
+        self.bridge_chain_limit = 0
+        self.record_guards = False
+        self.recorded_guards = {}
+        self.recorded_guards_limit = 1000
+        self.record_code_stats = False
+        self.code_stats = {}
+        self.guard_code_stats = {}
+        self.guard_code_stats_limit = 1000
 
     def getno(self):
         self.no += 1
         return self.no - 1
 
+def greenkey_to_pycode(greenkey):
+    ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
+                                     greenkey[2].getref_base())
+    return cast_base_ptr_to_instance(PyCode, ll_code)
+
 def wrap_greenkey(space, jitdriver, greenkey, greenkey_repr):
     if greenkey is None:
         return space.w_None
@@ -37,9 +55,7 @@ def wrap_greenkey(space, jitdriver, greenkey, greenkey_repr):
     if jitdriver_name == 'pypyjit':
         next_instr = greenkey[0].getint()
         is_being_profiled = greenkey[1].getint()
-        ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
-                                         greenkey[2].getref_base())
-        pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+        pycode = greenkey_to_pycode(greenkey)
         return space.newtuple([pycode, space.newint(next_instr),
                                space.newbool(bool(is_being_profiled))])
     else:
@@ -65,6 +81,341 @@ def set_compile_hook(space, w_hook, operations=True):
     cache.compile_hook_with_ops = operations
     cache.in_recursion = NonConstant(False)
 
+@unwrap_spec(enable=bool)
+def record_compiled_loops(space, enable):
+    """ record_compiled_loops(enable)
+
+    Start or stop recording the greenkeys of the loops compiled by the JIT.
+    The greenkeys recorded so far are returned by get_compiled_loops().
+    """
+    cache = space.fromcache(Cache)
+    cache.record_loops = enable
+
+def get_compiled_loops(space):
+    """ get_compiled_loops() -> list of (code, next_instr, is_being_profiled)
+
+    Return the greenkeys of the loops compiled since record_compiled_loops()
+    was called, for the code objects that are still alive.  A greenkey
+    appears only once, even if its loop was compiled several times.
+    """
+    cache = space.fromcache(Cache)
+    _free_recorded_loops(cache)
+    result_w = []
+    for record in cache.recorded_loops.values():
+        pycode = record.code_wref()
+        if pycode is not None:
+            result_w.append(space.newtuple([pycode,
+                space.newint(record.next_instr),
+                space.newbool(record.is_being_profiled)]))
+    return space.newlist(result_w)
+
+class LoopRecord(object):
+    def __init__(self, pycode, next_instr, is_being_profiled):
+        self.code_wref = weakref.ref(pycode)
+        self.next_instr = next_instr
+        self.is_being_profiled = is_being_profiled
+
+def record_compiled_loop(space, greenkey):
+    # this function is called from the JIT, for the loops of 'pypyjit'.
+    # The code objects are not kept alive, and a loop compiled again
+    # is recorded only once.
+    cache = space.fromcache(Cache)
+    pycode = greenkey_to_pycode(greenkey)
+    next_instr = greenkey[0].getint()
+    is_being_profiled = bool(greenkey[1].getint())
+    key = (compute_unique_id(pycode), next_instr, is_being_profiled)
+    record = cache.recorded_loops.get(key, None)
+    if record is not None and record.code_wref() is pycode:
+        return
+    cache.recorded_loops[key] = LoopRecord(pycode, next_instr,
+                                           is_being_profiled)
+    if len(cache.recorded_loops) > cache.recorded_loops_limit:
+        _free_recorded_loops(cache)
+
+def _free_recorded_loops(cache):
+    # forget the loops of the code objects that died
+    alive = {}
+    for key, record in cache.recorded_loops.items():
+        if record.code_wref() is not None:
+            alive[key] = record
+    cache.recorded_loops = alive
+    cache.recorded_loops_limit = max(1000, 2 * len(alive))
+
+@unwrap_spec(limit=int)
+def set_bridge_chain_hook(space, w_hook, limit=8):
+    """ set_bridge_chain_hook(hook, limit=8)
+
+    Set a hook (callable) that will be called each time a bridge is
+    compiled at the end of a chain of at least 'limit' bridges, i.e. from
+    a guard of a bridge attached to a guard of a bridge ... attached to a
+    loop.  Such chains are typical of megamorphic call sites.
+
+    The hook will be called with the pypyjit.JitLoopInfo object of the new
+    bridge.  Its bridge_depth attribute is the length of the chain, and
+    its DebugMergePoint operations give the source location.
+    """
+    cache = space.fromcache(Cache)
+    if space.is_w(w_hook, space.w_None):
+        w_hook = None
+    cache.w_bridge_chain_hook = w_hook
+    cache.bridge_chain_limit = limit
+    cache.in_recursion = NonConstant(False)
+    _maybe_forget_recorded_guards(cache)
+
+# The failures and the depth in the chain of bridges of the guards are
+# only known for the guards of the loops and bridges compiled while
+# record_guard_failures() or set_bridge_chain_hook() is active.  They are
+# kept here rather than on the fail descrs, which are the most numerous
+# objects of the JIT.
+
+class GuardRecord(object):
+    def __init__(self, descr, w_location, bridge_depth):
+        self.descr_wref = weakref.ref(descr)
+        self.w_location = w_location
+        self.bridge_depth = bridge_depth
+        self.failures = 0
+
+def records_guards(cache):
+    return cache.record_guards or cache.w_bridge_chain_hook is not None
+
+def _maybe_forget_recorded_guards(cache):
+    if not records_guards(cache):
+        cache.recorded_guards = {}
+        cache.recorded_guards_limit = 1000
+
+def _get_guard_record(cache, descr):
+    record = cache.recorded_guards.get(compute_unique_id(descr), None)
+    if record is not None and record.descr_wref() is descr:
+        return record
+    return None
+
+def get_bridge_depth(space, fail_descr):
+    """ The number of bridges between the loop and a bridge attached to
+    'fail_descr', included; 1 if the guard was not recorded. """
+    record = _get_guard_record(space.fromcache(Cache), fail_descr)
+    if record is None:
+        return 1
+    return record.bridge_depth + 1
+
+def record_guards(space, debug_info, is_bridge):
+    # this function is called from the JIT
+    from rpython.jit.metainterp.resoperation import rop
+
+    cache = space.fromcache(Cache)
+    jitdrivers_sd = debug_info.logger.metainterp_sd.jitdrivers_sd
+    bridge_depth = 0
+    if is_bridge:
+        bridge_depth = get_bridge_depth(space, debug_info.fail_descr)
+    last_dmp = None
+    w_location = space.w_None
+    for op in debug_info.operations:
+        if op.getopnum() == rop.DEBUG_MERGE_POINT:
+            last_dmp = op
+        elif op.is_guard():
+            descr = op.getdescr()
+            if descr is None:
+                continue
+            if last_dmp is not None:
+                jd_sd = jitdrivers_sd[last_dmp.getarg(0).getint()]
+                greenkey = last_dmp.getarglist()[3:]
+                repr = jd_sd.warmstate.get_location_str(greenkey)
+                w_location = wrap_greenkey(space, jd_sd.jitdriver, greenkey,
+                                           repr)
+                last_dmp = None
+            cache.recorded_guards[compute_unique_id(descr)] = (
+                GuardRecord(descr, w_location, bridge_depth))
+    if len(cache.recorded_guards) > cache.recorded_guards_limit:
+        _free_recorded_guards(cache)
+
+def record_guard_failure(space, fail_descr):
+    # this function is called from the JIT
+    record = _get_guard_record(space.fromcache(Cache), fail_descr)
+    if record is not None:
+        record.failures += 1
+
+def _free_recorded_guards(cache):
+    # forget the guards of the loops that were freed
+    alive = {}
+    for key, record in cache.recorded_guards.items():
+        if record.descr_wref() is not None:
+            alive[key] = record
+    cache.recorded_guards = alive
+    cache.recorded_guards_limit = max(1000, 2 * len(alive))
+
+class CodeStats(object):
+    """ The JIT statistics of one code object, see get_code_stats()
+    """
+    def __init__(self, pycode):
+        self.code_wref = weakref.ref(pycode)
+        self.traces = 0
+        self.loops = 0
+        self.bridges = 0
+        self.compile_time = 0.0
+        self.blackhole_time = 0.0
+        self.aborts = {}
+
+    def record_abort(self, reason):
+        self.traces += 1
+        name = Counters.counter_names[reason]
+        self.aborts[name] = self.aborts.get(name, 0) + 1
+
+class GuardCodeStats(object):
+    def __init__(self, descr, stats):
+        self.descr_wref = weakref.ref(descr)
+        self.stats = stats
+
+def get_code_stats_of(space, pycode):
+    cache = space.fromcache(Cache)
+    key = compute_unique_id(pycode)
+    stats = cache.code_stats.get(key, None)
+    if stats is None or stats.code_wref() is not pycode:
+        stats = CodeStats(pycode)
+        cache.code_stats[key] = stats
+    return stats
+
+def record_code_stats_of_loop(space, debug_info, is_bridge):
+    # this function is called from the JIT.  A loop is accounted to the
+    # code object of its greenkey, a bridge to the one of its first
+    # DebugMergePoint, and a guard to the one of the last DebugMergePoint
+    # before it.
+    from rpython.jit.metainterp.resoperation import rop
+
+    cache = space.fromcache(Cache)
+    jitdrivers_sd = debug_info.logger.metainterp_sd.jitdrivers_sd
+    stats = None
+    if not is_bridge and debug_info.get_jitdriver().name == 'pypyjit':
+        stats = get_code_stats_of(space,
+                                  greenkey_to_pycode(debug_info.greenkey))
+    current = stats
+    for op in debug_info.operations:
+        if op.getopnum() == rop.DEBUG_MERGE_POINT:
+            jd_sd = jitdrivers_sd[op.getarg(0).getint()]
+            if jd_sd.jitdriver.name == 'pypyjit':
+                greenkey = op.getarglist()[3:]
+                current = get_code_stats_of(space, greenkey_to_pycode(greenkey))
+                if stats is None:
+                    stats = current
+        elif op.is_guard() and current is not None:
+            descr = op.getdescr()
+            if descr is not None:
+                cache.guard_code_stats[compute_unique_id(descr)] = (
+                    GuardCodeStats(descr, current))
+    if len(cache.guard_code_stats) > cache.guard_code_stats_limit:
+        _free_guard_code_stats(cache)
+    if stats is None:
+        return
+    stats.traces += 1
+    if is_bridge:
+        stats.bridges += 1
+    else:
+        stats.loops += 1
+    stats.compile_time += debug_info.tracing_time + debug_info.backend_time
+
+def record_blackhole_time(space, fail_descr, duration):
+    # this function is called from the JIT
+    cache = space.fromcache(Cache)
+    record = cache.guard_code_stats.get(compute_unique_id(fail_descr), None)
+    if record is not None and record.descr_wref() is fail_descr:
+        record.stats.blackhole_time += duration
+
+def _free_guard_code_stats(cache):
+    # forget the guards of the loops that were freed
+    alive = {}
+    for key, record in cache.guard_code_stats.items():
+        if record.descr_wref() is not None:
+            alive[key] = record
+    cache.guard_code_stats = alive
+    cache.guard_code_stats_limit = max(1000, 2 * len(alive))
+
+@unwrap_spec(enable=bool)
+def record_code_stats(space, enable):
+    """ record_code_stats(enable)
+
+    Start or stop recording, for each code object, the loops and bridges
+    compiled by the JIT, the aborted traces and the time spent in the
+    blackhole interpreter.  The statistics are returned by
+    get_code_stats().
+    """
+    cache = space.fromcache(Cache)
+    cache.record_code_stats = enable
+
+def get_code_stats(space):
+    """ get_code_stats() -> {code: stats}
+
+    Return the statistics recorded since record_code_stats() was called,
+    for the code objects that are still alive.  'stats' is a dict with the
+    keys 'traces' (compiled or aborted), 'loops', 'bridges', 'aborts' (a
+    dict counting the aborted traces by reason), 'compile_time' (seconds
+    spent tracing, optimizing and compiling the loops and bridges) and
+    'blackhole_time' (seconds from the failure of a guard without a bridge
+    until the interpreter resumes, including the calls done meanwhile, even
+    recursive ones).  Like get_stats_snapshot(), this is eager: call it
+    again to get new statistics.
+    """
+    cache = space.fromcache(Cache)
+    alive = {}
+    w_result = space.newdict()
+    for key, stats in cache.code_stats.items():
+        pycode = stats.code_wref()
+        if pycode is None:
+            continue
+        alive[key] = stats
+        space.setitem(w_result, pycode, wrap_code_stats(space, stats))
+    cache.code_stats = alive
+    return w_result
+
+def wrap_code_stats(space, stats):
+    w_aborts = space.newdict()
+    for name, count in stats.aborts.items():
+        space.setitem_str(w_aborts, name, space.newint(count))
+    w_stats = space.newdict()
+    space.setitem_str(w_stats, 'traces', space.newint(stats.traces))
+    space.setitem_str(w_stats, 'loops', space.newint(stats.loops))
+    space.setitem_str(w_stats, 'bridges', space.newint(stats.bridges))
+    space.setitem_str(w_stats, 'aborts', w_aborts)
+    space.setitem_str(w_stats, 'compile_time',
+                      space.newfloat(stats.compile_time))
+    space.setitem_str(w_stats, 'blackhole_time',
+                      space.newfloat(stats.blackhole_time))
+    return w_stats
+
+@unwrap_spec(enable=bool)
+def record_guard_failures(space, enable):
+    """ record_guard_failures(enable)
+
+    Start or stop recording the guards of the loops and bridges compiled
+    by the JIT.  Their failures are returned by get_guard_failures().
+    Stopping forgets the guards recorded so far.
+    """
+    cache = space.fromcache(Cache)
+    cache.record_guards = enable
+    _maybe_forget_recorded_guards(cache)
+
+def get_guard_failures(space):
+    """ get_guard_failures() -> list of
+                            (greenkey, guard_no, failures, bridge_depth)
+
+    Return the guards recorded since record_guard_failures(True) was called
+    whose loop was not freed yet.  'greenkey' is the one of the last
+    DebugMergePoint before the guard.  'failures' counts the failures
+    handled by the blackhole interpreter, i.e. that did not go to a bridge;
+    a bridge compiled from this guard has guard_no as its bridge_no.
+    'bridge_depth' is 0 for the guards of a loop and n for the guards of a
+    bridge at the end of a chain of n bridges.
+    """
+    cache = space.fromcache(Cache)
+    result_w = []
+    if not cache.record_guards:
+        return space.newlist(result_w)
+    _free_recorded_guards(cache)
+    for key, record in cache.recorded_guards.items():
+        result_w.append(space.newtuple([
+            record.w_location,
+            space.newint(key),
+            space.newint(record.failures),
+            space.newint(record.bridge_depth)]))
+    return space.newlist(result_w)
+
 def set_abort_hook(space, w_hook):
     """ set_abort_hook(hook)
 
@@ -251,6 +602,7 @@ class W_JitLoopInfo(W_Root):
 
     w_green_key = None
     bridge_no   = 0
+    bridge_depth = 0
     asmaddr     = 0
     asmlen      = 0
 
@@ -271,6 +623,7 @@ class W_JitLoopInfo(W_Root):
         self.type = debug_info.type
         if is_bridge:
             self.bridge_no = compute_unique_id(debug_info.fail_descr)
+            self.bridge_depth = get_bridge_depth(space, debug_info.fail_descr)
             #self.bridge_no = debug_info.fail_descr_no
             self.w_green_key = space.w_None
         else:
@@ -333,6 +686,10 @@ W_JitLoopInfo.typedef = TypeDef(
                                   wrapfn="newint"),
     bridge_no = GetSetProperty(W_JitLoopInfo.descr_get_bridge_no,
                                doc="bridge number (if a bridge)"),
+    bridge_depth = interp_attrproperty('bridge_depth', cls=W_JitLoopInfo,
+                       doc="Number of bridges between the loop and this "
+                           "bridge, included (0 for loops)",
+                       wrapfn="newint"),
     type = interp_attrproperty('type', cls=W_JitLoopInfo,
                                doc="Loop type",
                                wrapfn="newtext"),
@@ -388,6 +745,13 @@ def get_stats_snapshot(space):
     space.setitem_str(w_counter_times, 'TRACING', space.newfloat(tr_time))
     b_time = jit_hooks.stats_get_times_value(None, Counters.BACKEND)
     space.setitem_str(w_counter_times, 'BACKEND', space.newfloat(b_time))
+    # the longest single events, i.e. the longest pauses caused by the JIT
+    tr_max = jit_hooks.stats_get_max_times_value(None, Counters.TRACING)
+    space.setitem_str(w_counter_times, 'LONGEST_TRACING',
+                      space.newfloat(tr_max))
+    b_max = jit_hooks.stats_get_max_times_value(None, Counters.BACKEND)
+    space.setitem_str(w_counter_times, 'LONGEST_BACKEND',
+                      space.newfloat(b_max))
     return W_JitInfoSnapshot(space, w_times, w_counters, w_counter_times)
 
 def get_stats_asmmemmgr(space):
@@ -397,6 +761,11 @@ def get_stats_asmmemmgr(space):
     m2 = jit_hooks.stats_asmmemmgr_used(None)
     return space.newtuple([space.newint(m1), space.newint(m2)])
 
+def get_stats_evicted_loops(space):
+    """Returns the number of loops freed so far because the machine code
+    exceeded the 'max_code_size' JIT parameter."""
+    return space.newint(jit_hooks.stats_memmgr_evicted_loops(None))
+
 def enable_debug(space):
     """ Set the jit debugging - completely necessary for some stats to work,
     most notably assembler counters.
@@ -15,6 +15,7 @@ from pypy.module.pypyjit.hooks import pypy_hooks
 from rpython.jit.tool.oparser import parse
 from rpython.jit.metainterp.typesystem import llhelper
 from rpython.rlib.jit import JitDebugInfo, AsmInfo, Counters
+from rpython.tool.udir import udir
 
 
 class MockJitDriverSD(object):
@@ -36,6 +37,21 @@ class MockSD(object):
     jitdrivers_sd = [MockJitDriverSD]
 
 
+def test_free_recorded_guards():
+    import gc
+    from pypy.module.pypyjit.interp_resop import (Cache, GuardRecord,
+                                                  _free_recorded_guards)
+    cache = Cache(None)
+    descrs = [BasicFailDescr() for i in range(1500)]
+    for i, descr in enumerate(descrs):
+        cache.recorded_guards[i] = GuardRecord(descr, None, 0)
+    del descrs[100:], descr
+    gc.collect()
+    _free_recorded_guards(cache)
+    assert sorted(cache.recorded_guards) == range(100)
+    assert cache.recorded_guards_limit == 1000
+
+
 class AppTestJitHook(object):
     spaceconfig = dict(usemodules=('pypyjit',))
 
@@ -91,6 +107,8 @@ class AppTestJitHook(object):
         di_loop_optimize = JitDebugInfo(MockJitDriverSD, logger, JitCellToken(),
                                         oplist, 'loop', greenkey)
         di_loop.asminfo = AsmInfo(offset, 0x42, 12)
+        di_loop.tracing_time = 1.0
+        di_loop.backend_time = 0.25
         di_bridge = JitDebugInfo(MockJitDriverSD, logger, JitCellToken(),
                                  oplist, 'bridge', fail_descr=FailDescr())
         di_bridge.asminfo = AsmInfo(offset, 0, 0)
@@ -109,6 +127,10 @@ class AppTestJitHook(object):
                 di_loop_optimize.oplist = cls.oplist
                 pypy_hooks.before_compile(di_loop_optimize)
 
+        def interp_on_blackhole():
+            if pypy_hooks.are_hooks_enabled():
+                pypy_hooks.on_blackhole(oplist[-1].getdescr(), 0.5)
+
         def interp_on_abort():
             if pypy_hooks.are_hooks_enabled():
                 pypy_hooks.on_abort(Counters.ABORT_TOO_LONG, pypyjitdriver,
@@ -119,12 +141,14 @@ class AppTestJitHook(object):
         cls.w_on_compile = space.wrap(interp2app(interp_on_compile))
         cls.w_on_compile_bridge = space.wrap(interp2app(interp_on_compile_bridge))
         cls.w_on_abort = space.wrap(interp2app(interp_on_abort))
+        cls.w_on_blackhole = space.wrap(interp2app(interp_on_blackhole))
         cls.w_int_add_num = space.wrap(rop.INT_ADD)
         cls.w_dmp_num = space.wrap(rop.DEBUG_MERGE_POINT)
         cls.w_on_optimize = space.wrap(interp2app(interp_on_optimize))
         cls.orig_oplist = oplist
         cls.orig_oplist_no_descrs = oplist_no_descrs
         cls.w_sorted_keys = space.wrap(sorted(Counters.counter_names))
+        cls.w_profile_file = space.wrap(str(udir.join('warmup.profile')))
 
     def setup_method(self, meth):
         self.__class__.oplist = self.orig_oplist[:]
@@ -172,6 +196,105 @@ class AppTestJitHook(object):
         self.on_compile()
         assert len(all) == 2
 
+    def test_record_compiled_loops(self):
+        import pypyjit
+        pypyjit.record_compiled_loops(True)
+        try:
+            self.on_compile()
+            self.on_compile_bridge()
+            self.on_compile()
+        finally:
+            pypyjit.record_compiled_loops(False)
+        self.on_compile()
+        key = (self.f.func_code, 0, False)
+        # recorded once, even if it was compiled twice
+        assert pypyjit.get_compiled_loops() == [key]
+
+    def test_bridge_chain_hook(self):
+        import pypyjit
+        all = []
+
+        def hook(info):
+            all.append(info)
+
+        pypyjit.set_bridge_chain_hook(hook, limit=2)
+        self.on_compile_bridge()
+        assert all == []
+        pypyjit.set_bridge_chain_hook(hook, limit=1)
+        self.on_compile_bridge()
+        pypyjit.set_bridge_chain_hook(None)
+        self.on_compile_bridge()
+        assert len(all) == 1
+        assert all[0].type == 'bridge'
+        assert all[0].bridge_depth == 1
+
+    def test_record_guard_failures(self):
+        import pypyjit
+        pypyjit.record_guard_failures(True)
+        try:
+            self.on_compile()
+            self.on_blackhole()
+            self.on_blackhole()
+            guards = pypyjit.get_guard_failures()
+        finally:
+            pypyjit.record_guard_failures(False)
+        assert len(guards) == 2
+        for greenkey, guard_no, failures, bridge_depth in guards:
+            assert greenkey == (self.f.func_code, 0, False)
+            assert bridge_depth == 0
+        assert guards[0][1] != guards[1][1]
+        assert sorted([failures for _, _, failures, _ in guards]) == [0, 2]
+        self.on_compile()
+        assert pypyjit.get_guard_failures() == []
+
+    def test_code_stats(self):
+        import pypyjit
+        pypyjit.record_code_stats(True)
+        try:
+            self.on_compile()
+            self.on_compile_bridge()
+            self.on_abort()
+            self.on_blackhole()
+        finally:
+            pypyjit.record_code_stats(False)
+        self.on_compile()
+        stats = pypyjit.get_code_stats()
+        assert list(stats) == [self.f.func_code]
+        assert stats[self.f.func_code] == {
+            'traces': 3, 'loops': 1, 'bridges': 1,
+            'aborts': {'ABORT_TOO_LONG': 1},
+            'compile_time': 1.25, 'blackhole_time': 0.5}
+
+    def test_warmup_profile(self):
+        import pypyjit, __pypy__
+        pypyjit.record_compiled_loops(True)
+        try:
+            self.on_compile()
+            pypyjit.save_warmup_profile(self.profile_file)
+        finally:
+            pypyjit.record_compiled_loops(False)
+        seeded = []
+        def trace_when_reached(next_instr, is_being_profiled, code):
+            seeded.append((code, next_instr, is_being_profiled))
+        orig_trace_when_reached = pypyjit.trace_when_reached
+        pypyjit.trace_when_reached = trace_when_reached
+        try:
+            pypyjit.load_warmup_profile(self.profile_file)
+            code = self.f.func_code
+            def same_code(co_code):
+                return type(code)(code.co_argcount, code.co_nlocals,
+                    code.co_stacksize, code.co_flags, co_code,
+                    code.co_consts, code.co_names, code.co_varnames,
+                    code.co_filename, code.co_name, code.co_firstlineno,
+                    code.co_lnotab)
+            code2 = same_code(code.co_code)
+            same_code(code.co_code + 'S')    # modified: not seeded
+            compile('def function(): pass', '?', 'exec')
+        finally:
+            pypyjit.trace_when_reached = orig_trace_when_reached
+            __pypy__.set_code_callback(None)
+        assert seeded == [(code2, 0, False)]
+
     def test_on_compile_exception(self):
         import pypyjit, sys, cStringIO
 
@@ -279,3 +402,23 @@ class AppTestJitHook(object):
         assert isinstance(stats.w_counters, dict)
         assert sorted(stats.w_counters.keys()) == self.sorted_keys
 
+
+
+class AppTestJitStats(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("Can't run this test with -A")
+        # the jit_hooks helpers only work translated
+        from rpython.rlib import jit_hooks
+        cls.orig_evicted_loops = jit_hooks.stats_memmgr_evicted_loops
+        jit_hooks.stats_memmgr_evicted_loops = lambda warmrunnerdesc: 3
+
+    def teardown_class(cls):
+        from rpython.rlib import jit_hooks
+        jit_hooks.stats_memmgr_evicted_loops = cls.orig_evicted_loops
+
+    def test_get_stats_evicted_loops(self):
+        import pypyjit
+        assert pypyjit.get_stats_evicted_loops() == 3
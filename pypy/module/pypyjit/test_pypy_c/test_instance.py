@@ -54,6 +54,59 @@ class TestInstance(BaseTestPyPyC):
             jump(..., descr=...)
         """)
 
+    def test_load_attr_monomorphic(self):
+        src = """
+            class A(object):
+                pass
+            objs = [A() for i in range(8)]
+            for a in objs:
+                a.x = 1
+            def main(n):
+                i = 0
+                while i < n:
+                    a = objs[i % 8]
+                    i = i + a.x     # ID: getattr
+                return i
+        """
+        log = self.run(src, [3000])
+        assert log.result == 3000
+        loop, = log.loops_by_filename(self.filepath)
+        # the usual map check: nothing about megamorphic sites
+        assert loop.match_by_id('getattr', """
+            guard_class(p1, ..., descr=...)
+            p2 = getfield_gc_r(p1, descr=<FieldP .+inst_map \d+>)
+            guard_value(p2, ConstPtr(ptr3), descr=...)
+            p4 = getfield_gc_r(p1, descr=<FieldP .+inst__value0 \d+>)
+            guard_nonnull_class(p4, ConstClass(W_IntObject), descr=...)
+        """, opcode='LOAD_ATTR', include_guard_not_invalidated=False)
+
+    def test_load_attr_megamorphic(self):
+        src = """
+            def make(n):
+                class A(object):
+                    pass
+                a = A()
+                for j in range(n):
+                    setattr(a, 'y%d' % j, j)
+                a.x = 1
+                return a
+            objs = [make(n) for n in range(8)]
+            def main(n):
+                i = 0
+                while i < n:
+                    a = objs[i % 8]
+                    i = i + a.x     # ID: getattr
+                return i
+        """
+        log = self.run(src, [3000])
+        assert log.result == 3000
+        loop, = log.loops_by_filename(self.filepath)
+        opnames = log.opnames(loop.ops_by_id('getattr', opcode='LOAD_ATTR'))
+        # a single residual call instead of one bridge per map
+        assert 'guard_value' not in opnames
+        assert 'guard_class' not in opnames
+        assert [name for name in opnames if name.startswith('call')]
+
     def test_getattr_with_dynamic_attribute(self):
         src = """
         class A(object):
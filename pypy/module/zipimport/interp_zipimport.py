@@ -57,9 +57,10 @@ class W_ZipCache(W_Root):
         for key, info in w_zipimporter.zip_file.NameToInfo.iteritems():
             if ZIPSEP != os.path.sep:
                 key = key.replace(ZIPSEP, os.path.sep)
+            # like CPython, give the offset of the local file header
             space.setitem(w_d, space.newtext(key), space.newtuple([
                 space.newtext(info.filename), space.newint(info.compress_type), space.newint(info.compress_size),
-                space.newint(info.file_size), space.newint(info.file_offset), space.newint(info.dostime),
+                space.newint(info.file_size), space.newint(info.header_offset), space.newint(info.dostime),
                 space.newint(info.dosdate), space.newint(info.CRC)]))
         return w_d
 
@@ -115,12 +116,17 @@ W_ZipCache.typedef = TypeDef(
 zip_cache = W_ZipCache()
 
 class W_ZipImporter(W_Root):
-    def __init__(self, space, name, filename, zip_file, prefix):
+    def __init__(self, space, name, filename, zip_file, prefix,
+                 archive_mtime=0.0, archive_size=0):
         self.space = space
         self.name = name
         self.filename = filename
         self.zip_file = zip_file
         self.prefix = prefix
+        # to know if another zipimporter of the same archive can share
+        # 'zip_file'
+        self.archive_mtime = archive_mtime
+        self.archive_size = archive_size
 
     def getprefix(self, space):
         if ZIPSEP == os.path.sep:
@@ -364,6 +370,8 @@ def descr_new_zipimporter(space, w_type, name):
                     if name[i] == os.path.sep or name[i] == ZIPSEP]
     parts_ends.append(len(name))
     filename = "" # make annotator happy
+    archive_mtime = 0.0
+    archive_size = 0
     for i in parts_ends:
         filename = name[:i]
         if not filename:
@@ -373,11 +381,14 @@ def descr_new_zipimporter(space, w_type, name):
         except OSError:
             raise oefmt(get_error(space), "Cannot find name %s", filename)
         if not stat.S_ISDIR(s.st_mode):
+            archive_mtime = s.st_mtime
+            archive_size = s.st_size
             ok = True
             break
     if not ok:
         raise oefmt(get_error(space), "Did not find %s to be a valid zippath",
                     name)
+    zip_file = None
     try:
         w_result = zip_cache.get(filename)
         if w_result is None:
@@ -386,21 +397,31 @@ def descr_new_zipimporter(space, w_type, name):
                         "already tried and failed", name)
     except KeyError:
         zip_cache.cache[filename] = None
-    try:
-        zip_file = RZipFile(filename, 'r')
-    except (BadZipfile, OSError):
-        raise oefmt(get_error(space), "%s seems not to be a zipfile", filename)
-    except RZlibError as e:
-        # in this case, CPython raises the direct exception coming
-        # from the zlib module: let's do the same
-        raise zlib_error(space, e.msg)
+    else:
+        # another zipimporter of the same, unmodified archive: share its
+        # directory instead of reading it again
+        assert isinstance(w_result, W_ZipImporter)
+        if (w_result.archive_mtime == archive_mtime and
+                w_result.archive_size == archive_size):
+            zip_file = w_result.zip_file
+    if zip_file is None:
+        try:
+            zip_file = RZipFile(filename, 'r', use_mmap=True)
+        except (BadZipfile, OSError):
+            raise oefmt(get_error(space), "%s seems not to be a zipfile",
+                        filename)
+        except RZlibError as e:
+            # in this case, CPython raises the direct exception coming
+            # from the zlib module: let's do the same
+            raise zlib_error(space, e.msg)
 
     prefix = name[len(filename):]
     if prefix.startswith(os.path.sep) or prefix.startswith(ZIPSEP):
         prefix = prefix[1:]
     if prefix and not prefix.endswith(ZIPSEP) and not prefix.endswith(os.path.sep):
         prefix += ZIPSEP
-    w_result = W_ZipImporter(space, name, filename, zip_file, prefix)
+    w_result = W_ZipImporter(space, name, filename, zip_file, prefix,
+                             archive_mtime, archive_size)
     zip_cache.set(filename, w_result)
     return w_result
 
@@ -138,6 +138,20 @@ class AppTestZipimport:
         assert main_importer.prefix == ""
         assert sub_importer.prefix == "sub" + os.path.sep
 
+    def test_cache_modified_archive(self):
+        self.writefile('x.py', 'y')
+        from zipimport import zipimporter
+        importer1 = zipimporter(self.zipfile)
+        importer2 = zipimporter(self.zipfile)
+        assert importer2.find_module('x') is importer2
+        assert importer2.get_data('x.py') == 'y'
+        # the archive changes: the next zipimporter reads it again
+        self.writefile('z.py', 'zz')
+        importer3 = zipimporter(self.zipfile)
+        assert importer3.find_module('z') is importer3
+        assert importer3.get_data('z.py') == 'zz'
+        assert importer1.find_module('z') is None
+
     def test_good_bad_arguments(self):
         from zipimport import zipimporter
         import os
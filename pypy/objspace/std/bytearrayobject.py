@@ -405,11 +405,20 @@ class W_BytearrayObject(W_Root):
             sequence2 = makebytearraydata_w(space, w_other)
             oldsize = self._len()
             start, stop, step, slicelength = w_index.indices4(space, oldsize)
-            if start == 0 and step == 1 and len(sequence2) <= slicelength:
-                self._delete_from_start(slicelength - len(sequence2))
-                slicelength = len(sequence2)
-                if slicelength == 0:
-                    return
+            if start == 0 and step == 1:
+                delta = slicelength - len(sequence2)
+                if delta >= 0:
+                    self._delete_from_start(delta)
+                    slicelength = len(sequence2)
+                    if slicelength == 0:
+                        return
+                elif -delta <= self._offset:
+                    # the new prefix fits in the unused part before
+                    # '_offset': grow the bytearray to the left
+                    offset = self._offset + delta
+                    assert offset >= 0
+                    self._offset = offset
+                    slicelength = len(sequence2)
             data = self._data
             start += self._offset
             _setitem_slice_helper(space, data, start, step,
@@ -454,9 +463,16 @@ class W_BytearrayObject(W_Root):
 
     def descr_insert(self, space, w_idx, w_other):
         where = space.int_w(w_idx)
+        val = space.byte_w(w_other)
+        if self._offset > 0 and get_positive_index(where, self._len()) == 0:
+            # fast path for x.insert(0, c): reuse the space before '_offset'
+            offset = self._offset - 1
+            assert offset >= 0
+            self._offset = offset
+            self._data[offset] = val
+            return
         data = self.getdata()
         index = get_positive_index(where, len(data))
-        val = space.byte_w(w_other)
         data.insert(index, val)
 
     @unwrap_spec(w_idx=WrappedDefault(-1))
@@ -465,7 +481,11 @@ class W_BytearrayObject(W_Root):
         if self._len() == 0:
             raise oefmt(space.w_IndexError, "pop from empty bytearray")
         index = self._fixindex(space, index, "pop index out of range")
-        result = self._data.pop(index)
+        if index == self._offset:    # fast path for x.pop(0)
+            result = self._data[index]
+            self._delete_from_start(1)
+        else:
+            result = self._data.pop(index)
         return space.newint(ord(result))
 
     def descr_remove(self, space, w_char):
@@ -473,7 +493,10 @@ class W_BytearrayObject(W_Root):
         _data = self._data
         for index in range(self._offset, len(_data)):
             if ord(_data[index]) == char:
-                del _data[index]
+                if index == self._offset:
+                    self._delete_from_start(1)
+                else:
+                    del _data[index]
                 return
         raise oefmt(space.w_ValueError, "value not found in bytearray")
 
@@ -645,6 +645,8 @@ class EmptyDictStrategy(DictStrategy):
         w_type = self.space.type(w_key)
         if self.space.is_w(w_type, self.space.w_int):
             self.switch_to_int_strategy(w_dict)
+        elif self.space.is_w(w_type, self.space.w_tuple):
+            self.switch_to_tuple_strategy(w_dict, w_key)
         elif w_type.compares_by_identity():
             self.switch_to_identity_strategy(w_dict)
         else:
@@ -668,6 +670,16 @@ class EmptyDictStrategy(DictStrategy):
         w_dict.set_strategy(strategy)
         w_dict.dstorage = storage
 
+    def switch_to_tuple_strategy(self, w_dict, w_key):
+        from pypy.objspace.std.tupledict import get_pair_strategy
+        strategy = get_pair_strategy(self.space, w_key)
+        if strategy is None:
+            self.switch_to_object_strategy(w_dict)
+            return
+        storage = strategy.get_empty_storage()
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = storage
+
     def switch_to_identity_strategy(self, w_dict):
         from pypy.objspace.std.identitydict import IdentityDictStrategy
         strategy = self.space.fromcache(IdentityDictStrategy)
@@ -0,0 +1,138 @@
+"""dict implementation specialized for objects created by the JSON decoder.
+
+Many JSON documents contain lots of objects with the same keys in the same
+order.  The decoder tracks these layouts as "shapes"; a dict using this
+strategy only stores its values in a list, and the keys are shared with the
+other dicts of the same shape.  The shape must provide get_index(key) and
+get_keys_in_order().  Any change to the set of keys switches the dict to
+the UnicodeDictStrategy.
+"""
+
+from rpython.rlib import rerased
+
+from pypy.objspace.std.dictmultiobject import (
+    DictStrategy, UnicodeDictStrategy, W_DictObject, _never_equal_to_string,
+    create_iterator_classes)
+from pypy.objspace.std.kwargsdict import ZipItemsWithHash
+
+
+def from_values_and_shape(space, values_w, shape):
+    strategy = shape.get_dict_strategy(space)
+    storage = strategy.erase(values_w)
+    return W_DictObject(space, strategy, storage)
+
+
+class JsonDictStrategy(DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("jsondict")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    _immutable_fields_ = ['shape']
+
+    def __init__(self, space, shape):
+        DictStrategy.__init__(self, space)
+        self.shape = shape
+
+    def wrap(self, key):
+        return self.space.newunicode(key)
+
+    def wrapkey(space, key):
+        return space.newunicode(key)
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return space.is_w(space.type(w_obj), space.w_unicode)
+
+    def _never_equal_to(self, w_lookup_type):
+        return _never_equal_to_string(self.space, w_lookup_type)
+
+    def length(self, w_dict):
+        return len(self.unerase(w_dict.dstorage))
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        if self.is_correct_type(w_key):
+            return self.getitem_unicode(w_dict, space.unicode_w(w_key))
+        elif self._never_equal_to(space.type(w_key)):
+            return None
+        else:
+            self.switch_to_unicode_strategy(w_dict)
+            return w_dict.getitem(w_key)
+
+    def getitem_unicode(self, w_dict, key):
+        index = self.shape.get_index(key)
+        if index < 0:
+            return None
+        return self.unerase(w_dict.dstorage)[index]
+
+    def getitem_str(self, w_dict, key):
+        self.switch_to_unicode_strategy(w_dict)
+        return w_dict.getitem_str(key)
+
+    def setitem(self, w_dict, w_key, w_value):
+        if self.is_correct_type(w_key):
+            index = self.shape.get_index(self.space.unicode_w(w_key))
+            if index >= 0:
+                self.unerase(w_dict.dstorage)[index] = w_value
+                return
+        self.switch_to_unicode_strategy(w_dict)
+        w_dict.setitem(w_key, w_value)
+
+    def setitem_str(self, w_dict, key, w_value):
+        self.switch_to_unicode_strategy(w_dict)
+        w_dict.setitem_str(key, w_value)
+
+    def setdefault(self, w_dict, w_key, w_default):
+        if self.is_correct_type(w_key):
+            w_result = self.getitem_unicode(w_dict, self.space.unicode_w(w_key))
+            if w_result is not None:
+                return w_result
+        self.switch_to_unicode_strategy(w_dict)
+        return w_dict.setdefault(w_key, w_default)
+
+    def delitem(self, w_dict, w_key):
+        self.switch_to_unicode_strategy(w_dict)
+        return w_dict.delitem(w_key)
+
+    def popitem(self, w_dict):
+        self.switch_to_unicode_strategy(w_dict)
+        return w_dict.get_strategy().popitem(w_dict)
+
+    def switch_to_unicode_strategy(self, w_dict):
+        strategy = self.space.fromcache(UnicodeDictStrategy)
+        values_w = self.unerase(w_dict.dstorage)
+        storage = strategy.get_empty_storage()
+        d_new = strategy.unerase(storage)
+        keys = self.shape.get_keys_in_order()
+        for i in range(len(keys)):
+            d_new[keys[i]] = values_w[i]
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = storage
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_unicode(self.listview_unicode(w_dict))
+
+    def listview_unicode(self, w_dict):
+        return self.shape.get_keys_in_order()[:]
+
+    def values(self, w_dict):
+        return self.unerase(w_dict.dstorage)[:]
+
+    def items(self, w_dict):
+        space = self.space
+        values_w = self.unerase(w_dict.dstorage)
+        keys = self.shape.get_keys_in_order()
+        return [space.newtuple([self.wrap(keys[i]), values_w[i]])
+                for i in range(len(keys))]
+
+    def getiterkeys(self, w_dict):
+        return iter(self.shape.get_keys_in_order())
+
+    def getitervalues(self, w_dict):
+        return iter(self.unerase(w_dict.dstorage))
+
+    def getiteritems_with_hash(self, w_dict):
+        keys = self.shape.get_keys_in_order()
+        return ZipItemsWithHash(keys, self.unerase(w_dict.dstorage))
+
+create_iterator_classes(JsonDictStrategy)
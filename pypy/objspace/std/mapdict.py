@@ -959,12 +959,34 @@ class MapDictIteratorItems(BaseItemIterator):
 # ____________________________________________________________
 # Magic caching
 
+# A LOAD_ATTR that sees many different maps is "megamorphic": in the JIT,
+# promoting the map would give one bridge per map, chained one after the
+# other.  For these sites the CacheEntry also keeps a small polymorphic
+# cache, and the JIT emits a single residual call that looks in it.
+#
+# Which sites are megamorphic is recorded in pycode._mapdict_megamorphic,
+# a quasi-immutable field holding an immutable list of flags, or None
+# when no site of the code is megamorphic.  The code object is a constant
+# in the traces, so the flag is constant-folded and a monomorphic
+# LOAD_ATTR traces exactly as before.  The list is replaced when a site
+# becomes megamorphic, which invalidates the loops of that code.
+
+POLYMORPHIC_CACHE_SIZE = 16
+MEGAMORPHIC_THRESHOLD = 5     # distinct maps seen before going megamorphic
+
 class CacheEntry(object):
     version_tag = None
     storageindex = 0
     w_method = None # for callmethod
     success_counter = 0
     failure_counter = 0
+    # polymorphic cache, allocated when a second map shows up and grown
+    # with the number of maps seen, up to POLYMORPHIC_CACHE_SIZE
+    poly_map_wrefs = None
+    poly_version_tags = None
+    poly_storageindexes = None
+    poly_count = 0
+    megamorphic = False
 
     def is_valid_for_obj(self, w_obj):
         map = w_obj._get_mapdict_map()
@@ -983,15 +1005,74 @@ class CacheEntry(object):
                 return True
         return False
 
+    def add_polymorphic(self, map, version_tag, storageindex):
+        # called before the entry is overwritten with 'map'
+        if self.poly_map_wrefs is None:
+            oldmap = self.map_wref()
+            if oldmap is map:
+                return      # still monomorphic
+            self.poly_map_wrefs = []
+            self.poly_version_tags = []
+            self.poly_storageindexes = []
+            if oldmap is not None and self.w_method is None:
+                self._add_polymorphic(oldmap, self.version_tag,
+                                      self.storageindex)
+        self._add_polymorphic(map, version_tag, storageindex)
+
+    def _add_polymorphic(self, map, version_tag, storageindex):
+        num_used = len(self.poly_map_wrefs)
+        i = 0
+        while i < num_used:
+            if self.poly_map_wrefs[i]() is map:
+                break
+            i += 1
+        else:
+            # a new map: add it, then overwrite the slots round-robin
+            i = self.poly_count % POLYMORPHIC_CACHE_SIZE
+            self.poly_count += 1
+            if self.poly_count >= MEGAMORPHIC_THRESHOLD:
+                self.megamorphic = True
+            if num_used < POLYMORPHIC_CACHE_SIZE:
+                self.poly_map_wrefs.append(weakref.ref(map))
+                self.poly_version_tags.append(version_tag)
+                self.poly_storageindexes.append(storageindex)
+                return
+        self.poly_map_wrefs[i] = weakref.ref(map)
+        self.poly_version_tags[i] = version_tag
+        self.poly_storageindexes[i] = storageindex
+
+    def lookup_polymorphic(self, map):
+        # returns the storageindex for 'map', or -1
+        if self.poly_map_wrefs is not None:
+            for i in range(len(self.poly_map_wrefs)):
+                if self.poly_map_wrefs[i]() is map:
+                    version_tag = map.terminator.w_cls.version_tag()
+                    if version_tag is self.poly_version_tags[i]:
+                        return self.poly_storageindexes[i]
+                    break
+        return -1
+
 _invalid_cache_entry_map = objectmodel.instantiate(AbstractAttribute)
 _invalid_cache_entry_map.terminator = None
+_invalid_map_wref = weakref.ref(_invalid_cache_entry_map)
 INVALID_CACHE_ENTRY = CacheEntry()
-INVALID_CACHE_ENTRY.map_wref = weakref.ref(_invalid_cache_entry_map)
+INVALID_CACHE_ENTRY.map_wref = _invalid_map_wref
                                  # different from any real map ^^^
 
 def init_mapdict_cache(pycode):
     num_entries = len(pycode.co_names_w)
     pycode._mapdict_caches = [INVALID_CACHE_ENTRY] * num_entries
+    pycode._mapdict_megamorphic = None
+
+def _mark_megamorphic(pycode, nameindex):
+    # the list is immutable: build a new one
+    flags = pycode._mapdict_megamorphic
+    num_entries = len(pycode._mapdict_caches)
+    if flags is None:
+        flags = [i == nameindex for i in range(num_entries)]
+    else:
+        flags = [flags[i] or i == nameindex for i in range(num_entries)]
+    pycode._mapdict_megamorphic = flags
 
 @jit.dont_look_inside
 def _fill_cache(pycode, nameindex, map, version_tag, storageindex, w_method=None):
@@ -1001,6 +1082,11 @@ def _fill_cache(pycode, nameindex, map, version_tag, storageindex, w_method=None
     if entry is INVALID_CACHE_ENTRY:
         entry = CacheEntry()
         pycode._mapdict_caches[nameindex] = entry
+    elif w_method is None:
+        was_megamorphic = entry.megamorphic
+        entry.add_polymorphic(map, version_tag, storageindex)
+        if entry.megamorphic and not was_megamorphic:
+            _mark_megamorphic(pycode, nameindex)
     entry.map_wref = weakref.ref(map)
     entry.version_tag = version_tag
     entry.storageindex = storageindex
@@ -1019,6 +1105,24 @@ def LOAD_ATTR_caching(pycode, w_obj, nameindex):
     return LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map)
 LOAD_ATTR_caching._always_inline_ = True
 
+def LOAD_ATTR_is_megamorphic(pycode, nameindex):
+    # constant-folded in the traces, see _mark_megamorphic()
+    flags = pycode._mapdict_megamorphic
+    return flags is not None and flags[nameindex]
+
+@jit.dont_look_inside
+def LOAD_ATTR_megamorphic(pycode, w_obj, nameindex):
+    # used by the JIT instead of space.getattr() for the megamorphic sites
+    entry = pycode._mapdict_caches[nameindex]
+    map = w_obj._get_mapdict_map()
+    if entry.is_valid_for_map(map) and entry.w_method is None:
+        return w_obj._mapdict_read_storage(entry.storageindex)
+    if map is not None:
+        storageindex = entry.lookup_polymorphic(map)
+        if storageindex >= 0:
+            return w_obj._mapdict_read_storage(storageindex)
+    return LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map)
+
 def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
     space = pycode.space
     w_name = pycode.co_names_w[nameindex]
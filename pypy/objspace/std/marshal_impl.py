@@ -360,7 +360,19 @@ def marshal_pycode(space, w_pycode, m):
 # into rpython-level lists of strings.  Only for code objects.
 
 def unmarshal_str(u):
-    w_obj = u.get_w_obj()
+    # fast path for the strings that make up code objects: plain strings,
+    # like co_code and co_lnotab, are returned without building a wrapped
+    # object, and interned ones are only wrapped once, for the table of
+    # references
+    space = u.space
+    tc = u.get1()
+    if tc == TYPE_STRING:
+        return u.get_str()
+    if tc == TYPE_INTERNED:
+        s = u.get_str()
+        u.stringtable_w.append(space.new_interned_str(s))
+        return s
+    w_obj = u.get_w_obj_of_type(tc)
     try:
         return u.space.bytes_w(w_obj)
     except OperationError as e:
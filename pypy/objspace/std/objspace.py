@@ -524,8 +524,8 @@ class StdObjSpace(ObjSpace):
     def listview_float(self, w_obj):
         if type(w_obj) is W_ListObject:
             return w_obj.getitems_float()
-        # dict and set don't have FloatStrategy, so we can just ignore them
-        # for now
+        # dict doesn't have FloatStrategy, and the FloatSetStrategy doesn't
+        # implement listview_float(), so we can just ignore them for now
         if isinstance(w_obj, W_ListObject) and self._uses_list_iter(w_obj):
             return w_obj.getitems_float()
         return None
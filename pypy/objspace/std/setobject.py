@@ -1,9 +1,12 @@
+import math
+
 from pypy.interpreter import gateway
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.typedef import TypeDef
 from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.floatobject import W_FloatObject, _hash_float
 from pypy.objspace.std.intobject import W_IntObject
 from pypy.objspace.std.unicodeobject import W_UnicodeObject
 from pypy.objspace.std.util import IDTAG_SPECIAL, IDTAG_SHIFT
@@ -11,8 +14,8 @@ from pypy.objspace.std.util import IDTAG_SPECIAL, IDTAG_SHIFT
 from rpython.rlib.objectmodel import r_dict
 from rpython.rlib.objectmodel import iterkeys_with_hash, contains_with_hash
 from rpython.rlib.objectmodel import setitem_with_hash, delitem_with_hash
-from rpython.rlib.rarithmetic import intmask, r_uint
-from rpython.rlib import rerased, jit
+from rpython.rlib.rarithmetic import intmask, r_uint, ovfcheck_float_to_int
+from rpython.rlib import rerased, jit, longlong2float
 
 
 UNROLL_CUTOFF = 5
@@ -793,6 +796,8 @@ class EmptySetStrategy(SetStrategy):
     def add(self, w_set, w_key):
         if type(w_key) is W_IntObject:
             strategy = self.space.fromcache(IntegerSetStrategy)
+        elif is_plain_float(w_key):
+            strategy = self.space.fromcache(FloatSetStrategy)
         elif type(w_key) is W_BytesObject:
             strategy = self.space.fromcache(BytesSetStrategy)
         elif type(w_key) is W_UnicodeObject:
@@ -912,9 +917,13 @@ class AbstractUnwrappedSetStrategy(object):
             d = self.unerase(w_set.sstorage)
             d[self.unwrap(w_key)] = None
         else:
-            w_set.switch_to_object_strategy(self.space)
+            self.generalize(w_set, w_key)
             w_set.add(w_key)
 
+    def generalize(self, w_set, w_key):
+        """ Switches to a strategy which can also store 'w_key'. """
+        w_set.switch_to_object_strategy(self.space)
+
     def remove(self, w_set, w_item):
         d = self.unerase(w_set.sstorage)
         if not self.is_correct_type(w_item):
@@ -1242,6 +1251,10 @@ class BytesSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IntOrFloatSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1281,6 +1294,10 @@ class UnicodeSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IntOrFloatSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1337,6 +1354,154 @@ class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def iter(self, w_set):
         return IntegerIteratorImplementation(self.space, self, w_set)
 
+    def generalize(self, w_set, w_key):
+        if is_plain_float(w_key):
+            strategy = self.space.fromcache(IntOrFloatSetStrategy)
+            d = self.unerase(w_set.sstorage)
+            if strategy.can_store_ints(d):
+                w_set.strategy = strategy
+                w_set.sstorage = strategy.get_storage_from_ints(d)
+                return
+        w_set.switch_to_object_strategy(self.space)
+
+
+class FloatSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
+    """ Set of floats, without NaNs: they are only equal to themselves, which
+    a dict of RPython floats cannot express. """
+    erase, unerase = rerased.new_erasing_pair("float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(float).intersect')
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def get_empty_dict(self):
+        return {}
+
+    def is_correct_type(self, w_key):
+        return is_plain_float(w_key)
+
+    def may_contain_equal_elements(self, strategy):
+        if strategy is self.space.fromcache(BytesSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(UnicodeSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(EmptySetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IdentitySetStrategy):
+            return False
+        return True
+
+    def unwrap(self, w_item):
+        return self.space.float_w(w_item)
+
+    def wrap(self, item):
+        return self.space.newfloat(item)
+
+    def iter(self, w_set):
+        return FloatIteratorImplementation(self.space, self, w_set)
+
+    def has_key(self, w_set, w_key):
+        if type(w_key) is W_IntObject:
+            # an int is equal to a float only if the conversion is exact
+            intval = self.space.int_w(w_key)
+            floatval = float(intval)
+            try:
+                if ovfcheck_float_to_int(floatval) != intval:
+                    return False
+            except OverflowError:
+                return False
+            return floatval in self.unerase(w_set.sstorage)
+        if not self.is_correct_type(w_key):
+            w_set.switch_to_object_strategy(self.space)
+            return w_set.has_key(w_key)
+        return self.unwrap(w_key) in self.unerase(w_set.sstorage)
+
+    def generalize(self, w_set, w_key):
+        if (type(w_key) is W_IntObject and
+                longlong2float.can_encode_int32(self.space.int_w(w_key))):
+            strategy = self.space.fromcache(IntOrFloatSetStrategy)
+            d = self.unerase(w_set.sstorage)
+            w_set.strategy = strategy
+            w_set.sstorage = strategy.get_storage_from_floats(d)
+            return
+        w_set.switch_to_object_strategy(self.space)
+
+
+class IntOrFloatSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
+    """ Set of ints and floats, encoded as longlongs like in the
+    IntOrFloatListStrategy.  The keys are compared and hashed by their
+    numeric value, so that 1 and 1.0 are the same element. """
+    erase, unerase = rerased.new_erasing_pair("intorfloat")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(intorfloat).intersect')
+
+    def get_empty_storage(self):
+        return self.erase(self.get_empty_dict())
+
+    def get_empty_dict(self):
+        return r_dict(_intorfloat_eq, self._intorfloat_hash,
+                      force_non_null=True)
+
+    def _intorfloat_hash(self, llval):
+        floatval = longlong2float.maybe_decode_longlong_as_float(llval)
+        return _hash_float(self.space, floatval)
+
+    def can_store_ints(self, d):
+        for intval in d:
+            if not longlong2float.can_encode_int32(intval):
+                return False
+        return True
+
+    def get_storage_from_ints(self, d):
+        d_new = self.get_empty_dict()
+        for intval in d:
+            d_new[longlong2float.encode_int32_into_longlong_nan(intval)] = None
+        return self.erase(d_new)
+
+    def get_storage_from_floats(self, d):
+        d_new = self.get_empty_dict()
+        for floatval in d:
+            d_new[longlong2float.float2longlong(floatval)] = None
+        return self.erase(d_new)
+
+    def is_correct_type(self, w_key):
+        if type(w_key) is W_IntObject:
+            intval = self.space.int_w(w_key)
+            return longlong2float.can_encode_int32(intval)
+        return is_plain_float(w_key)
+
+    def may_contain_equal_elements(self, strategy):
+        if strategy is self.space.fromcache(BytesSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(UnicodeSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(EmptySetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IdentitySetStrategy):
+            return False
+        return True
+
+    def unwrap(self, w_item):
+        if type(w_item) is W_IntObject:
+            intval = self.space.int_w(w_item)
+            return longlong2float.encode_int32_into_longlong_nan(intval)
+        else:
+            floatval = self.space.float_w(w_item)
+            return longlong2float.float2longlong(floatval)
+
+    def wrap(self, llval):
+        return _wrap_intorfloat(self.space, llval)
+
+    def iter(self, w_set):
+        return IntOrFloatIteratorImplementation(self.space, self, w_set)
+
 
 class ObjectSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     erase, unerase = rerased.new_erasing_pair("object")
@@ -1409,6 +1574,10 @@ class IdentitySetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
             return False
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        if strategy is self.space.fromcache(FloatSetStrategy):
+            return False
+        if strategy is self.space.fromcache(IntOrFloatSetStrategy):
+            return False
         if strategy is self.space.fromcache(BytesSetStrategy):
             return False
         if strategy is self.space.fromcache(UnicodeSetStrategy):
@@ -1514,6 +1683,30 @@ class IntegerIteratorImplementation(IteratorImplementation):
         else:
             return None
 
+class FloatIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        d = strategy.unerase(w_set.sstorage)
+        self.iterator = d.iterkeys()
+
+    def next_entry(self):
+        for key in self.iterator:
+            return self.space.newfloat(key)
+        else:
+            return None
+
+class IntOrFloatIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        d = strategy.unerase(w_set.sstorage)
+        self.iterator = d.iterkeys()
+
+    def next_entry(self):
+        for key in self.iterator:
+            return _wrap_intorfloat(self.space, key)
+        else:
+            return None
+
 class IdentityIteratorImplementation(IteratorImplementation):
     def __init__(self, space, strategy, w_set):
         IteratorImplementation.__init__(self, space, strategy, w_set)
@@ -1573,6 +1766,32 @@ setiter_typedef = W_SetIterObject.typedef
 def newset(space):
     return r_dict(space.eq_w, space.hash_w, force_non_null=True)
 
+def is_plain_float(w_obj):
+    return type(w_obj) is W_FloatObject and not math.isnan(w_obj.floatval)
+
+def _intorfloat_eq(llval1, llval2):
+    if llval1 == llval2:
+        return True
+    # compare the numeric values: 1 == 1.0 and 0.0 == -0.0
+    return (longlong2float.maybe_decode_longlong_as_float(llval1) ==
+            longlong2float.maybe_decode_longlong_as_float(llval2))
+
+def _wrap_intorfloat(space, llval):
+    if longlong2float.is_int32_from_longlong_nan(llval):
+        intval = longlong2float.decode_int32_from_longlong_nan(llval)
+        return space.newint(intval)
+    else:
+        floatval = longlong2float.longlong2float(llval)
+        return space.newfloat(floatval)
+
+@jit.look_inside_iff(lambda floatlist:
+        jit.loop_unrolling_heuristic(floatlist, len(floatlist), UNROLL_CUTOFF))
+def _contains_nan(floatlist):
+    for floatval in floatlist:
+        if math.isnan(floatval):
+            return True
+    return False
+
 def set_strategy_and_setdata(space, w_set, w_iterable):
     if w_iterable is None :
         w_set.strategy = strategy = space.fromcache(EmptySetStrategy)
@@ -1605,6 +1824,13 @@ def set_strategy_and_setdata(space, w_set, w_iterable):
         w_set.sstorage = strategy.get_storage_from_unwrapped_list(intlist)
         return
 
+    floatlist = space.listview_float(w_iterable)
+    if floatlist is not None and not _contains_nan(floatlist):
+        strategy = space.fromcache(FloatSetStrategy)
+        w_set.strategy = strategy
+        w_set.sstorage = strategy.get_storage_from_unwrapped_list(floatlist)
+        return
+
     length_hint = space.length_hint(w_iterable, 0)
 
     if jit.isconstant(length_hint):
@@ -1626,6 +1852,15 @@ def _pick_correct_strategy_unroll(space, w_set, w_iterable):
         w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
         return
 
+    # check for floats
+    for w_item in iterable_w:
+        if not is_plain_float(w_item):
+            break
+    else:
+        w_set.strategy = space.fromcache(FloatSetStrategy)
+        w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
+        return
+
     # check for strings
     for w_item in iterable_w:
         if type(w_item) is not W_BytesObject:
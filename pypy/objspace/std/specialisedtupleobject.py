@@ -1,6 +1,12 @@
 from pypy.interpreter.error import oefmt
-from pypy.objspace.std.tupleobject import W_AbstractTupleObject
+from pypy.objspace.std.floatobject import W_FloatObject
+from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.tupleobject import (
+    W_AbstractTupleObject, UNROLL_CUTOFF, _unroll_condition,
+    _unroll_condition_cmp)
 from pypy.objspace.std.util import negate
+from rpython.rlib import jit
+from rpython.rlib.debug import make_sure_not_resized
 from rpython.rlib.objectmodel import specialize
 from rpython.rlib.rarithmetic import intmask
 from rpython.rlib.unroll import unrolling_iterable
@@ -144,9 +150,132 @@ Cls_ii = make_specialised_class((int, int))
 Cls_oo = make_specialised_class((object, object))
 Cls_ff = make_specialised_class((float, float))
 
+# ---------- tuples of any length of unboxed ints or floats ----------
+
+def make_unboxed_tuple_class(typ):
+    if typ == int:
+        wrap = lambda space, x: space.newint(x)
+        def hash_value(space, x):
+            # hash for int which is different from the hash
+            # given by rpython
+            from pypy.objspace.std.intobject import _hash_int
+            return _hash_int(x)
+    elif typ == float:
+        wrap = lambda space, x: space.newfloat(x)
+        def hash_value(space, x):
+            from pypy.objspace.std.floatobject import _hash_float
+            return _hash_float(space, x)
+    else:
+        assert 0
+
+    class cls(W_AbstractTupleObject):
+        _immutable_fields_ = ['values[*]']
+
+        def __init__(self, space, values):
+            self.space = space
+            make_sure_not_resized(values)
+            self.values = values
+
+        def length(self):
+            return len(self.values)
+
+        @jit.look_inside_iff(lambda self: _unroll_condition(self))
+        def tolist(self):
+            values = self.values
+            list_w = [None] * len(values)
+            for i in range(len(values)):
+                list_w[i] = wrap(self.space, values[i])
+            return list_w
+
+        def getitems_copy(self):
+            return self.tolist()[:]   # returns a resizable list
+
+        @jit.look_inside_iff(lambda self, space: _unroll_condition(self))
+        def descr_hash(self, space):
+            # same algorithm as W_TupleObject.descr_hash(), but the hashes
+            # of the items are computed directly from the unboxed values
+            mult = 1000003
+            x = 0x345678
+            z = len(self.values)
+            for value in self.values:
+                y = hash_value(space, value)
+                x = (x ^ y) * mult
+                z -= 1
+                mult += 82520 + z + z
+            x += 97531
+            return space.newint(intmask(x))
+
+        def descr_eq(self, space, w_other):
+            if not isinstance(w_other, W_AbstractTupleObject):
+                return space.w_NotImplemented
+            if not isinstance(w_other, cls):
+                return self._descr_eq_generic(space, w_other)
+            return space.newbool(self._eq_values(w_other.values))
+
+        @jit.look_inside_iff(lambda self, other: _unroll_condition(self))
+        def _eq_values(self, other):
+            values = self.values
+            if len(values) != len(other):
+                return False
+            for i in range(len(values)):
+                if values[i] != other[i]:
+                    if typ == float:
+                        # issue with NaNs, which should be equal here
+                        if float2longlong(values[i]) == float2longlong(other[i]):
+                            continue
+                    return False
+            return True
+
+        @jit.look_inside_iff(_unroll_condition_cmp)
+        def _descr_eq_generic(self, space, w_other):
+            values = self.values
+            if len(values) != w_other.length():
+                return space.w_False
+            items_w = w_other.tolist()
+            for i in range(len(values)):
+                if not space.eq_w(wrap(space, values[i]), items_w[i]):
+                    return space.w_False
+            return space.w_True
+
+        descr_ne = negate(descr_eq)
+
+        def getitem(self, space, index):
+            try:
+                value = self.values[index]
+            except IndexError:
+                raise oefmt(space.w_IndexError, "tuple index out of range")
+            return wrap(space, value)
+
+    cls.__name__ = 'W_Unboxed%sTupleObject' % (typ.__name__.capitalize(),)
+    return cls
+
+W_UnboxedIntTupleObject = make_unboxed_tuple_class(int)
+W_UnboxedFloatTupleObject = make_unboxed_tuple_class(float)
+
+def _unroll_condition_list(list_w):
+    return jit.loop_unrolling_heuristic(list_w, len(list_w), UNROLL_CUTOFF)
+
+@jit.look_inside_iff(_unroll_condition_list)
+def _unbox_ints(list_w):
+    values = [0] * len(list_w)
+    for i in range(len(list_w)):
+        w_item = list_w[i]
+        if type(w_item) is not W_IntObject:
+            return None
+        values[i] = w_item.intval
+    return values
+
+@jit.look_inside_iff(_unroll_condition_list)
+def _unbox_floats(list_w):
+    values = [0.0] * len(list_w)
+    for i in range(len(list_w)):
+        w_item = list_w[i]
+        if type(w_item) is not W_FloatObject:
+            return None
+        values[i] = w_item.floatval
+    return values
+
 def makespecialisedtuple(space, list_w):
-    from pypy.objspace.std.intobject import W_IntObject
-    from pypy.objspace.std.floatobject import W_FloatObject
     if len(list_w) == 2:
         w_arg1, w_arg2 = list_w
         if type(w_arg1) is W_IntObject:
@@ -156,8 +285,17 @@ def makespecialisedtuple(space, list_w):
             if type(w_arg2) is W_FloatObject:
                 return Cls_ff(space, space.float_w(w_arg1), space.float_w(w_arg2))
         return Cls_oo(space, w_arg1, w_arg2)
-    else:
-        raise NotSpecialised
+    elif len(list_w) > 2 and space.config.objspace.std.withunboxedtuple:
+        w_arg1 = list_w[0]
+        if type(w_arg1) is W_IntObject:
+            values = _unbox_ints(list_w)
+            if values is not None:
+                return W_UnboxedIntTupleObject(space, values)
+        elif type(w_arg1) is W_FloatObject:
+            floatvalues = _unbox_floats(list_w)
+            if floatvalues is not None:
+                return W_UnboxedFloatTupleObject(space, floatvalues)
+    raise NotSpecialised
 
 # --------------------------------------------------
 # Special code based on list strategies to implement zip(),
@@ -641,3 +641,45 @@ class AppTestBytesArray:
         assert x.find(b'fe') == -1
         assert x.index(b'f', 2, 11) == 5
         assert x.__alloc__() == 14
+
+    def test_reuse_offset(self):
+        def make(x=b'abcdefghij', shift=3):
+            b = bytearray(b'?'*shift + x)
+            b + b''                       # force 'b'
+            del b[:shift]                 # add shift to b._offset
+            return b
+        x = make(shift=3)
+        assert x.pop(0) == ord('a')
+        x.remove(ord('b'))
+        x.insert(0, b'B')
+        x.insert(-100, ord('A'))
+        assert x.__alloc__() == 14
+        assert x == bytearray(b'ABcdefghij')
+        #
+        x = make(shift=3)
+        x[:2] = b'AB'
+        x[:0] = b'?'
+        x[:1] = b'<>'
+        assert x.__alloc__() == 14
+        assert x == bytearray(b'<>ABcdefghij')
+        x = make(shift=3)
+        x[:0] = b'0123'                   # too big, forces now
+        assert x == bytearray(b'0123abcdefghij')
+        #
+        x = make(shift=0)
+        x.insert(0, b'!')
+        x[:0] = b'12'
+        assert x.pop(0) == ord('1')
+        assert x == bytearray(b'2!abcdefghij')
+
+    def test_consume_from_front(self):
+        b = bytearray()
+        for i in range(200):
+            b += b'chunk%03d' % i
+            del b[:4]
+            if i % 10 == 9:
+                b.pop(0)
+        assert len(b) == 200 * 4 - 20
+        assert b.__alloc__() < 2 * len(b) + 16
+        m = memoryview(b)
+        assert m[:4].tobytes() == b[:4]
@@ -0,0 +1,74 @@
+
+class AppTest(object):
+    spaceconfig = {"objspace.usemodules._pypyjson": True}
+
+    def w_loads(self, s):
+        # the first objects of a shape are created as regular dicts
+        import _pypyjson
+        return _pypyjson.loads('[%s, %s, %s]' % (s, s, s))[-1]
+
+    def test_check_strategy(self):
+        import __pypy__
+        import _pypyjson
+        l = _pypyjson.loads('[{"a": 1}, {"a": 2}, {"a": 3}, {"b": 4}]')
+        assert __pypy__.strategy(l[0]) == "UnicodeDictStrategy"
+        assert __pypy__.strategy(l[2]) == "JsonDictStrategy"
+        assert __pypy__.strategy(l[3]) == "UnicodeDictStrategy"
+
+    def test_simple(self):
+        import __pypy__
+        d = self.loads('{"a": 1, "b": "x"}')
+        assert __pypy__.strategy(d) == "JsonDictStrategy"
+        assert len(d) == 2
+        assert d[u"a"] == 1
+        assert d["b"] == u"x"
+        assert d.get(u"c") is None
+        assert d.get(5) is None
+        assert d.keys() == [u"a", u"b"]
+        assert d.values() == [1, u"x"]
+        assert d.items() == [(u"a", 1), (u"b", u"x")]
+        assert list(d.iteritems()) == [(u"a", 1), (u"b", u"x")]
+        assert d == {u"a": 1, u"b": u"x"}
+        assert d.copy() == d
+        assert u"a" in d
+        assert u"c" not in d
+
+    def test_setitem_existing(self):
+        import __pypy__
+        d = self.loads('{"a": 1, "b": 2}')
+        d[u"a"] = 5
+        assert __pypy__.strategy(d) == "JsonDictStrategy"
+        assert d == {u"a": 5, u"b": 2}
+        assert d.setdefault(u"b", 7) == 2
+        assert __pypy__.strategy(d) == "JsonDictStrategy"
+
+    def test_switch_strategy(self):
+        import __pypy__
+        d = self.loads('{"a": 1, "b": 2}')
+        d[u"c"] = 3
+        assert __pypy__.strategy(d) == "UnicodeDictStrategy"
+        assert d == {u"a": 1, u"b": 2, u"c": 3}
+        #
+        d = self.loads('{"a": 1, "b": 2}')
+        del d[u"a"]
+        assert d == {u"b": 2}
+        #
+        d = self.loads('{"a": 1, "b": 2}')
+        d[5] = 3
+        assert d == {u"a": 1, u"b": 2, 5: 3}
+        #
+        d = self.loads('{"a": 1, "b": 2}')
+        assert d.pop(u"b") == 2
+        assert d.popitem() == (u"a", 1)
+        assert d == {}
+        #
+        d = self.loads('{"a": 1, "b": 2}')
+        d.clear()
+        assert d == {}
+        #
+        # the other dicts with the same shape are not affected
+        import _pypyjson
+        l = _pypyjson.loads('[{"a": 1}, {"a": 2}, {"a": 3}, {"a": 4}]')
+        l[2][u"b"] = 5
+        assert l[3] == {u"a": 4}
+        assert __pypy__.strategy(l[3]) == "JsonDictStrategy"
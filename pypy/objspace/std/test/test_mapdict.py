@@ -624,6 +624,42 @@ def test_setdict():
 # check specialized classes
 
 
+def test_polymorphic_cache_grows():
+    import weakref
+    terminator = Terminator(space, "class")
+    maps = [PlainAttribute("a%d" % i, DICT, terminator) for i in range(20)]
+    entry = CacheEntry()
+    entry.map_wref = weakref.ref(maps[0])
+    entry.add_polymorphic(maps[0], None, 0)
+    assert entry.poly_map_wrefs is None     # still monomorphic
+    entry.map_wref = weakref.ref(maps[0])
+    entry.add_polymorphic(maps[1], None, 1)
+    assert [wref() for wref in entry.poly_map_wrefs] == maps[:2]
+    assert entry.poly_storageindexes == [0, 1]
+    assert not entry.megamorphic
+    for i in range(2, 20):
+        entry.add_polymorphic(maps[i], None, i)
+    assert entry.megamorphic
+    assert entry.poly_count == 20
+    assert len(entry.poly_map_wrefs) == POLYMORPHIC_CACHE_SIZE
+    assert [wref() for wref in entry.poly_map_wrefs] == (
+        maps[16:] + maps[4:16])
+    assert entry.poly_storageindexes == range(16, 20) + range(4, 16)
+
+def test_mark_megamorphic():
+    from pypy.objspace.std.mapdict import _mark_megamorphic
+    class FakePyCode(object):
+        _mapdict_caches = [INVALID_CACHE_ENTRY] * 4
+        _mapdict_megamorphic = None
+    pycode = FakePyCode()
+    _mark_megamorphic(pycode, 2)
+    flags = pycode._mapdict_megamorphic
+    assert flags == [False, False, True, False]
+    # a new list, as the field is quasi-immutable
+    _mark_megamorphic(pycode, 0)
+    assert pycode._mapdict_megamorphic == [True, False, True, False]
+    assert flags == [False, False, True, False]
+
 def test_specialized_class():
     from pypy.objspace.std.mapdict import _make_storage_mixin_size_n
     from pypy.objspace.std.objectobject import W_ObjectObject
@@ -1291,6 +1327,68 @@ class AppTestWithMapDictAndCounters(object):
 
 
 
+class AppTestMegamorphicCache(object):
+
+    def setup_class(cls):
+        from pypy.interpreter import gateway
+        #
+        def megamorphic(space, w_func, name, w_obj):
+            w_code = space.getattr(w_func, space.wrap('func_code'))
+            nameindex = map(space.str_w, w_code.co_names_w).index(name)
+            if not LOAD_ATTR_is_megamorphic(w_code, nameindex):
+                return space.w_None
+            return LOAD_ATTR_megamorphic(w_code, w_obj, nameindex)
+        megamorphic.unwrap_spec = [gateway.ObjSpace, gateway.W_Root, 'text',
+                                   gateway.W_Root]
+        cls.w_megamorphic = cls.space.wrap(gateway.interp2app(megamorphic))
+
+    def test_megamorphic(self):
+        classes = []
+        for i in range(8):
+            class A(object):
+                pass
+            classes.append(A)
+        objs = []
+        for i, cls in enumerate(classes):
+            a = cls()
+            for j in range(i):
+                setattr(a, 'y%d' % j, j)    # different maps
+            a.x = i
+            objs.append(a)
+        def f(a):
+            return a.x
+        #
+        for a in objs[:3]:
+            assert f(a) == a.x
+        assert self.megamorphic(f, 'x', objs[0]) is None
+        for a in objs:
+            assert f(a) == a.x
+        for a in objs:
+            assert self.megamorphic(f, 'x', a) == a.x
+        # the class changes: the entries are not valid any more
+        classes[2].x = 42
+        assert self.megamorphic(f, 'x', objs[2]) == 2
+        del objs[3].x
+        raises(AttributeError, self.megamorphic, f, 'x', objs[3])
+        # a new object with an existing map
+        b = classes[5]()
+        for j in range(5):
+            setattr(b, 'y%d' % j, -j)
+        b.x = 'b'
+        assert self.megamorphic(f, 'x', b) == 'b'
+
+    def test_monomorphic(self):
+        class A(object):
+            pass
+        def f(a):
+            return a.x
+        for i in range(10):
+            a = A()
+            a.x = i
+            assert f(a) == i
+        assert self.megamorphic(f, 'x', a) is None
+
+
 class AppTestGlobalCaching(AppTestWithMapDict):
     spaceconfig = {"objspace.std.withmethodcachecounter": True}
 
@@ -80,7 +80,7 @@ class TestW_SetObject:
 
     def test_create_set_from_list(self):
         from pypy.interpreter.baseobjspace import W_Root
-        from pypy.objspace.std.setobject import BytesSetStrategy, ObjectSetStrategy, UnicodeSetStrategy
+        from pypy.objspace.std.setobject import BytesSetStrategy, ObjectSetStrategy, UnicodeSetStrategy, FloatSetStrategy
         from pypy.objspace.std.floatobject import W_FloatObject
 
         w = self.space.wrap
@@ -118,6 +118,12 @@ class TestW_SetObject:
         w_list = W_ListObject(self.space, [w(1.0), w(2.0), w(3.0)])
         w_set = W_SetObject(self.space)
         _initialize_set(self.space, w_set, w_list)
+        assert w_set.strategy is self.space.fromcache(FloatSetStrategy)
+        assert w_set.strategy.unerase(w_set.sstorage) == {1.0:None, 2.0:None, 3.0:None}
+
+        w_list = W_ListObject(self.space, [w(1.0), w(float('nan'))])
+        w_set = W_SetObject(self.space)
+        _initialize_set(self.space, w_set, w_list)
         assert w_set.strategy is self.space.fromcache(ObjectSetStrategy)
         for item in w_set.strategy.unerase(w_set.sstorage):
             assert isinstance(item, W_FloatObject)
@@ -1037,3 +1043,36 @@ class AppTestAppSetTest:
            raise ValueError
            yield 1
         raises(ValueError, set, f())
+
+    def test_float_strategies(self):
+        from __pypy__ import strategy
+        s = set([1.5, 2.5, -0.0, 0.0])
+        assert strategy(s) == "FloatSetStrategy"
+        assert len(s) == 3
+        assert 0 in s and 0.0 in s and 1.5 in s and 2 not in s
+        assert 2**63 not in s
+        assert s == set([1.5, 2.5, 0])
+        assert frozenset(s) == frozenset([2.5, 1.5, 0.0])
+        assert hash(frozenset(s)) == hash(frozenset([2.5, 1.5, 0]))
+        assert s & set([1.5, 3]) == set([1.5])
+        assert s - set([1.5, 0.0]) == set([2.5])
+        assert s | set([1]) == set([1.5, 2.5, 0.0, 1.0])
+        assert set([1.5]).issubset(s)
+        nan = float('nan')
+        s.add(nan)
+        assert strategy(s) == "ObjectSetStrategy"
+        assert nan in s
+        #
+        s = set([1, 2, 3])
+        s.add(1.0)
+        assert strategy(s) == "IntOrFloatSetStrategy"
+        assert len(s) == 3
+        s.add(4.5)
+        assert s == set([1, 2, 3, 4.5])
+        assert s == set([1.0, 2.0, 3.0, 4.5])
+        assert sorted(s) == [1, 2, 3, 4.5]
+        assert set([1, 2.0]) <= s
+        assert s.pop() in (1, 2, 3, 4.5)
+        s.discard(4.5)
+        s.add('x')
+        assert strategy(s) == "ObjectSetStrategy"
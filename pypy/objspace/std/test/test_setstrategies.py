@@ -1,7 +1,9 @@
 from pypy.objspace.std.setobject import W_SetObject
 from pypy.objspace.std.setobject import (
     BytesIteratorImplementation, BytesSetStrategy, EmptySetStrategy,
-    IntegerIteratorImplementation, IntegerSetStrategy, ObjectSetStrategy,
+    FloatIteratorImplementation, FloatSetStrategy,
+    IntegerIteratorImplementation, IntegerSetStrategy,
+    IntOrFloatIteratorImplementation, IntOrFloatSetStrategy, ObjectSetStrategy,
     UnicodeIteratorImplementation, UnicodeSetStrategy)
 from pypy.objspace.std.listobject import W_ListObject
 
@@ -39,6 +41,50 @@ class TestW_SetStrategies:
         s1.update(s2)
         assert s1.strategy is self.space.fromcache(ObjectSetStrategy)
 
+    def test_float(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([1.5, 2.5, -0.0]))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        assert s.has_key(space.wrap(0.0))
+        assert s.has_key(space.wrap(0))
+        assert not s.has_key(space.wrap(1))
+        assert not s.has_key(space.wrap(2**62 + 1))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        s.add(space.wrap(0.0))
+        assert s.length() == 3
+        s.add(space.wrap(float('nan')))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+        assert s.length() == 4
+
+    def test_switch_to_int_or_float(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([1, 2, 3]))
+        s.add(space.wrap(2.5))
+        assert s.strategy is space.fromcache(IntOrFloatSetStrategy)
+        s.add(space.wrap(2.0))
+        s.add(space.wrap(-0.0))
+        assert s.length() == 5
+        s.add(space.wrap(0))
+        assert s.length() == 5
+        assert s.has_key(space.wrap(1.0))
+        assert s.has_key(space.wrap(2))
+        assert not s.has_key(space.wrap(2.25))
+        assert s.strategy is space.fromcache(IntOrFloatSetStrategy)
+        #
+        s = W_SetObject(space, self.wrapped([1.5, 2.0]))
+        s.add(space.wrap(2))
+        assert s.strategy is space.fromcache(IntOrFloatSetStrategy)
+        assert s.length() == 2
+        s.add(space.wrap(7))
+        assert sorted(space.unwrap(w_x) for w_x in s.getkeys()) == [
+            1.5, 2.0, 7]
+        assert type(space.unwrap(s.getkeys()[1])) is float
+        assert type(space.unwrap(s.getkeys()[2])) is int
+        #
+        s = W_SetObject(space, self.wrapped([1, 2]))
+        s.add(space.wrap(float('nan')))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+
     def test_switch_to_unicode(self):
         s = W_SetObject(self.space, self.wrapped([]))
         s.add(self.space.wrap(u"six"))
@@ -133,6 +179,18 @@ class TestW_SetStrategies:
         assert isinstance(it, UnicodeIteratorImplementation)
         assert space.unwrap(it.next()) == u"a"
         assert space.unwrap(it.next()) == u"b"
+        #
+        s = W_SetObject(space, self.wrapped([1.5, 2.5]))
+        it = s.iter()
+        assert isinstance(it, FloatIteratorImplementation)
+        assert space.unwrap(it.next()) == 1.5
+        assert space.unwrap(it.next()) == 2.5
+        #
+        s = W_SetObject(space, self.wrapped([1.5, 2]))
+        it = s.iter()
+        assert isinstance(it, IntOrFloatIteratorImplementation)
+        assert space.unwrap(it.next()) == 1.5
+        assert space.unwrap(it.next()) == 2
 
     def test_listview(self):
         space = self.space
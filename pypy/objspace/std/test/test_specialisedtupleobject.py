@@ -1,4 +1,5 @@
-from pypy.objspace.std.specialisedtupleobject import _specialisations
+from pypy.objspace.std.specialisedtupleobject import (
+    _specialisations, W_UnboxedIntTupleObject, W_UnboxedFloatTupleObject)
 from pypy.objspace.std.test import test_tupleobject
 from pypy.objspace.std.tupleobject import W_TupleObject
 from pypy.tool.pytest.objspace import gettestobjspace
@@ -9,7 +10,8 @@ for cls in _specialisations:
 
 
 class TestW_SpecialisedTupleObject():
-    spaceconfig = {"objspace.std.withspecialisedtuple": True}
+    spaceconfig = {"objspace.std.withspecialisedtuple": True,
+                   "objspace.std.withunboxedtuple": True}
 
     def test_isspecialisedtupleobjectintint(self):
         w_tuple = self.space.newtuple([self.space.wrap(1), self.space.wrap(2)])
@@ -52,6 +54,34 @@ class TestW_SpecialisedTupleObject():
         hash_test([1, 2, 3], must_be_specialized=False)
         hash_test([1 << 62, 0])
 
+    def test_unboxed_tuples(self):
+        space = self.space
+        w_tuple = space.newtuple([space.wrap(i) for i in range(5)])
+        assert isinstance(w_tuple, W_UnboxedIntTupleObject)
+        assert w_tuple.values == [0, 1, 2, 3, 4]
+        w_tuple = space.newtuple([space.wrap(i + 0.5) for i in range(3)])
+        assert isinstance(w_tuple, W_UnboxedFloatTupleObject)
+        w_tuple = space.newtuple([space.wrap(1), space.wrap(2.5),
+                                  space.wrap(3)])
+        assert type(w_tuple) is W_TupleObject
+        # only with their own option
+        space = gettestobjspace(**{"objspace.std.withspecialisedtuple": True})
+        w_tuple = space.newtuple([space.wrap(i) for i in range(5)])
+        assert type(w_tuple) is W_TupleObject
+
+    def test_hash_unboxed_against_normal_tuple(self):
+        for values in [[1, 2, 3], [-1, -1, -1, -1], [1 << 62, 0, -5],
+                       [1.5, 2.8, -0.0], [1.0, 2.0, 3.0],
+                       [float('inf'), 1e300, -1e-300, 4.0]]:
+            values_w = [self.space.wrap(value) for value in values]
+            N_w_tuple = W_TupleObject(values_w)
+            U_w_tuple = self.space.newtuple(values_w)
+            assert 'Unboxed' in type(U_w_tuple).__name__
+            assert self.space.eq_w(N_w_tuple, U_w_tuple)
+            assert self.space.eq_w(U_w_tuple, N_w_tuple)
+            assert self.space.eq_w(self.space.hash(N_w_tuple),
+                                   self.space.hash(U_w_tuple))
+
     try:
         from hypothesis import given, strategies
     except ImportError:
@@ -67,7 +97,8 @@ class TestW_SpecialisedTupleObject():
 
 
 class AppTestW_SpecialisedTupleObject:
-    spaceconfig = {"objspace.std.withspecialisedtuple": True}
+    spaceconfig = {"objspace.std.withspecialisedtuple": True,
+                   "objspace.std.withunboxedtuple": True}
 
     def w_isspecialised(self, obj, expected=''):
         import __pypy__
@@ -252,5 +283,43 @@ class AppTestW_SpecialisedTupleObject:
         assert (0.0, 0.0) == (-0.0, -0.0)
 
 
+    def test_unboxed_tuples(self):
+        t = (1, 2, 3, 4, 5)
+        assert not self.isspecialised(t)
+        import __pypy__
+        assert 'UnboxedIntTuple' in __pypy__.internal_repr(t)
+        assert len(t) == 5
+        assert t[0] == 1 and t[-1] == 5 and t[1:3] == (2, 3)
+        raises(IndexError, "t[5]")
+        raises(IndexError, "t[-6]")
+        assert list(t) == [1, 2, 3, 4, 5]
+        assert t == (1, 2, 3) + (4, 5)
+        assert t == (1, 2, 3, 4, 5.0)
+        assert t != (1, 2, 3, 4, 6)
+        assert t != (1, 2, 3, 4)
+        assert t < (1, 2, 3, 5)
+        assert hash(t) == hash((1, 2, 3, 4, 5.0)) == hash((1, 2, 3, 4, 5L))
+        assert t.index(4) == 3
+        assert 3 in t
+        d = {t: 'x'}
+        assert d[(1L, 2, 3, 4, 5)] == 'x'
+        #
+        f = (1.5, 2.5, -0.0)
+        assert 'UnboxedFloatTuple' in __pypy__.internal_repr(f)
+        assert f == (1.5, 2.5, 0.0)
+        assert hash(f) == hash((1.5, 2.5, 0))
+        assert f[2] == 0.0
+        N = float('nan')
+        T = (N, N, N)
+        assert N in T
+        assert T == (N, N, N)
+        #
+        class I(int): pass
+        t = (I(42), I(43), I(44))
+        assert type(t[0]) is I
+        assert 'Unboxed' not in __pypy__.internal_repr(t)
+
+
 class AppTestAll(test_tupleobject.AppTestW_TupleObject):
-    spaceconfig = {"objspace.std.withspecialisedtuple": True}
+    spaceconfig = {"objspace.std.withspecialisedtuple": True,
+                   "objspace.std.withunboxedtuple": True}
@@ -0,0 +1,105 @@
+import py
+
+
+class AppTestPairDict(object):
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__repr__ doesn't work on appdirect")
+
+    def w_get_strategy(self, obj):
+        import __pypy__
+        r = __pypy__.internal_repr(obj)
+        return r[r.find("(") + 1: r.find(")")]
+
+    def test_int_pair(self):
+        d = {}
+        d[1, 2] = 'a'
+        assert "IntPairDictStrategy" in self.get_strategy(d)
+        d[(3, -4)] = 'b'
+        d[tuple([1, 2])] = 'c'
+        assert "IntPairDictStrategy" in self.get_strategy(d)
+        assert d == {(1, 2): 'c', (3, -4): 'b'}
+        assert d[1, 2] == 'c'
+        assert d.get((5, 6)) is None
+        assert d.get(None) is None
+        assert (3, -4) in d
+        assert "IntPairDictStrategy" in self.get_strategy(d)
+        assert d.keys() == [(1, 2), (3, -4)]
+        assert d.items() == [((1, 2), 'c'), ((3, -4), 'b')]
+        assert list(d) == [(1, 2), (3, -4)]
+        assert d.setdefault((3, -4), 'x') == 'b'
+        assert d.pop((1, 2)) == 'c'
+        del d[3, -4]
+        assert d == {}
+        assert "IntPairDictStrategy" in self.get_strategy(d)
+
+    def test_bytes_int_pair(self):
+        d = {('a', 1): 1}
+        assert "BytesIntPairDictStrategy" in self.get_strategy(d)
+        for name in ['a', 'b', 'c', 'a', 'b', 'a']:
+            key = (name, len(name))
+            d[key] = d.get(key, 0) + 1
+        assert d == {('a', 1): 4, ('b', 1): 2, ('c', 1): 1}
+        assert "BytesIntPairDictStrategy" in self.get_strategy(d)
+        assert type(d.keys()[0][0]) is str
+
+    def test_equal_keys_of_other_types(self):
+        d = {(1, 2): 'a'}
+        assert d[1L, 2] == 'a'
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        d = {(1, 2): 'a'}
+        assert d[1.0, 2.0] == 'a'
+        d = {(1, 2): 'a'}
+        assert d[True, 2] == 'a'
+        d = {('a', 2): 'a'}
+        assert d[u'a', 2] == 'a'
+
+    def test_switch_to_object_strategy(self):
+        d = {(1, 2): 'a'}
+        d['x'] = 'b'
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d == {(1, 2): 'a', 'x': 'b'}
+        d = {(1, 2): 'a'}
+        d['a', 2] = 'b'
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d[1, 2] == 'a'
+        assert d['a', 2] == 'b'
+        d = {('a', 2): 'a'}
+        d[1, 2] = 'b'
+        assert d == {(1, 2): 'b', ('a', 2): 'a'}
+
+    def test_not_pairs(self):
+        for key in [(), (1,), (1, 2, 3), (1, 'a'), ('a', 'b'), (2.5, 1),
+                    (1, (2, 3))]:
+            d = {key: 1}
+            assert "Pair" not in self.get_strategy(d)
+            assert d[key] == 1
+
+    def test_subclasses(self):
+        class T(tuple):
+            pass
+        class I(int):
+            pass
+        d = {T((1, 2)): 'a'}
+        assert "Pair" not in self.get_strategy(d)
+        d = {(I(1), 2): 'a'}
+        assert "Pair" not in self.get_strategy(d)
+        d = {(1, 2): 'a'}
+        assert d[T((1, 2))] == 'a'
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert type(d.keys()[0]) is tuple
+
+    def test_copy_and_update(self):
+        d = {(1, 2): 'a', (3, 4): 'b'}
+        d2 = d.copy()
+        assert "IntPairDictStrategy" in self.get_strategy(d2)
+        assert d2 == d
+        d3 = {(5, 6): 'c'}
+        d3.update(d)
+        assert d3 == {(1, 2): 'a', (3, 4): 'b', (5, 6): 'c'}
+        assert hash(d3.keys()[0]) == hash((5, 6))
+
+
+class AppTestPairDictSpecialisedTuple(AppTestPairDict):
+    spaceconfig = {"objspace.std.withspecialisedtuple": True}
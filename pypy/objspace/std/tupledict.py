@@ -0,0 +1,121 @@
+## ----------------------------------------------------------------------------
+## dict strategies for keys which are pairs (see dictmultiobject.py)
+
+from rpython.rlib import rerased
+from pypy.objspace.std.dictmultiobject import (AbstractTypedStrategy,
+                                               DictStrategy,
+                                               create_iterator_classes)
+from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.specialisedtupleobject import Cls_ii, Cls_oo
+from pypy.objspace.std.tupleobject import W_TupleObject
+
+
+def _pair_items(w_obj):
+    """ Returns the two items of 'w_obj' if it is an exact tuple of length
+    2 storing its items as wrapped objects, or (None, None) """
+    if type(w_obj) is W_TupleObject:
+        items_w = w_obj.wrappeditems
+        if len(items_w) == 2:
+            return items_w[0], items_w[1]
+    elif type(w_obj) is Cls_oo:
+        return w_obj.value0, w_obj.value1
+    return None, None
+
+
+def get_pair_strategy(space, w_key):
+    """ Returns the strategy to use for a dict whose first key is the
+    exact tuple 'w_key', or None """
+    if type(w_key) is Cls_ii:
+        return space.fromcache(IntPairDictStrategy)
+    w_first, w_second = _pair_items(w_key)
+    if type(w_second) is W_IntObject:
+        if type(w_first) is W_IntObject:
+            return space.fromcache(IntPairDictStrategy)
+        if type(w_first) is space.StringObjectCls:
+            return space.fromcache(BytesIntPairDictStrategy)
+    return None
+
+
+class AbstractPairDictStrategy(AbstractTypedStrategy):
+    """ The keys are pairs whose second item is an int.  They are stored as
+    RPython tuples in a regular RPython dict, so that hashing and comparing
+    the keys does not need to call the space.  This is good for keys like
+    (x, y) coordinates or (name, id), e.g. when grouping values. """
+    _mixin_ = True
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def _never_equal_to(self, w_lookup_type):
+        space = self.space
+        # XXX there are many more types
+        return (space.is_w(w_lookup_type, space.w_NoneType) or
+                space.is_w(w_lookup_type, space.w_int) or
+                space.is_w(w_lookup_type, space.w_bytes) or
+                space.is_w(w_lookup_type, space.w_unicode)
+                )
+
+    def w_keys(self, w_dict):
+        space = self.space
+        return space.newlist([self.wrap(key)
+                for key in self.unerase(w_dict.dstorage).iterkeys()])
+
+
+class IntPairDictStrategy(AbstractPairDictStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("intpair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, unwrapped):
+        space = self.space
+        x, y = unwrapped
+        return space.newtuple([space.newint(x), space.newint(y)])
+
+    def unwrap(self, wrapped):
+        if type(wrapped) is Cls_ii:
+            return (wrapped.value0, wrapped.value1)
+        w_first, w_second = _pair_items(wrapped)
+        assert isinstance(w_first, W_IntObject)
+        assert isinstance(w_second, W_IntObject)
+        return (w_first.intval, w_second.intval)
+
+    def is_correct_type(self, w_obj):
+        if type(w_obj) is Cls_ii:
+            return True
+        w_first, w_second = _pair_items(w_obj)
+        return (type(w_first) is W_IntObject and
+                type(w_second) is W_IntObject)
+
+    def wrapkey(space, key):
+        x, y = key
+        return space.newtuple([space.newint(x), space.newint(y)])
+
+create_iterator_classes(IntPairDictStrategy)
+
+
+class BytesIntPairDictStrategy(AbstractPairDictStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("bytesintpair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, unwrapped):
+        space = self.space
+        s, y = unwrapped
+        return space.newtuple([space.newbytes(s), space.newint(y)])
+
+    def unwrap(self, wrapped):
+        space = self.space
+        w_first, w_second = _pair_items(wrapped)
+        assert isinstance(w_second, W_IntObject)
+        return (space.bytes_w(w_first), w_second.intval)
+
+    def is_correct_type(self, w_obj):
+        w_first, w_second = _pair_items(w_obj)
+        return (type(w_first) is self.space.StringObjectCls and
+                type(w_second) is W_IntObject)
+
+    def wrapkey(space, key):
+        s, y = key
+        return space.newtuple([space.newbytes(s), space.newint(y)])
+
+create_iterator_classes(BytesIntPairDictStrategy)
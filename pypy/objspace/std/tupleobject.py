@@ -226,8 +226,9 @@ class W_AbstractTupleObject(W_Root):
         """
         length = self.length()
         start, stop = unwrap_start_stop(space, length, w_start, w_stop)
+        items = self.tolist()
         for i in range(start, min(stop, length)):
-            w_item = self.tolist()[i]
+            w_item = items[i]
             if space.eq_w(w_item, w_obj):
                 return space.newint(i)
         raise oefmt(space.w_ValueError, "tuple.index(x): x not in tuple")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+""" Benchmark of marshal.loads() on the code objects of the whole standard
+library, i.e. of the main part of the work done when importing from .pyc
+files.  Run it with the interpreters to compare:
+
+    path/to/pypy-c marshal_stdlib.py [-n runs] [lib-python/2.7]
+
+The modules are compiled and dumped by the interpreter running the
+benchmark, so the numbers of two different interpreters are only
+comparable if they use the same bytecode format.
+"""
+
+import sys, os, time, marshal, optparse
+
+
+def collect(libdir):
+    result = []
+    for dirpath, dirnames, filenames in os.walk(libdir):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if not name.endswith('.py'):
+                continue
+            filename = os.path.join(dirpath, name)
+            with open(filename, 'U') as f:
+                source = f.read()
+            try:
+                code = compile(source, filename, 'exec', 0, True)
+            except (SyntaxError, ValueError, TypeError):
+                continue      # test files with bad syntax on purpose
+            result.append(marshal.dumps(code))
+    return result
+
+
+def measure(datas, runs):
+    times = []
+    for i in range(runs):
+        t0 = time.time()
+        for data in datas:
+            marshal.loads(data)
+        times.append(time.time() - t0)
+    return times
+
+
+def main(argv):
+    default_lib = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               os.pardir, os.pardir, os.pardir,
+                               'lib-python', '2.7')
+    parser = optparse.OptionParser(usage='%prog [-n runs] [libdir]')
+    parser.add_option('-n', '--runs', type='int', default=10,
+                      help='number of loads of the whole library '
+                           '(default: 10)')
+    options, args = parser.parse_args(argv)
+    libdir = os.path.normpath(args[0] if args else default_lib)
+    datas = collect(libdir)
+    total = sum(map(len, datas))
+    times = measure(datas, options.runs)
+    print '%d modules, %.1f MB of marshal data' % (len(datas),
+                                                  total / 1048576.0)
+    print 'min %8.2f ms   avg %8.2f ms   (%.1f MB/s)' % (
+        min(times) * 1000.0, sum(times) * 1000.0 / len(times),
+        total / min(times) / 1048576.0)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
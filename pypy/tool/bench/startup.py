@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+""" Startup time benchmark: measures the time needed by a pypy-c to start,
+import some modules and exit, with and without a startup image (see
+__pypy__.save_startup_image()).
+
+Usage:
+
+    python startup.py [-n runs] path/to/pypy-c [module ...]
+
+The default modules are the ones imported by 'site' only.
+"""
+
+import sys, os, time, tempfile, subprocess, optparse
+
+
+def run(executable, modules, runs, env):
+    command = [executable, '-c', 'import %s' % (', '.join(modules) or 'sys')]
+    times = []
+    for i in range(runs):
+        t0 = time.time()
+        subprocess.check_call(command, env=env)
+        times.append(time.time() - t0)
+    return times
+
+
+def make_image(executable, modules, filename):
+    code = ('import __pypy__; __pypy__.save_startup_image(%r, %r)'
+            % (filename, modules))
+    subprocess.check_call([executable, '-c', code])
+
+
+def report(label, times):
+    print '%-20s min %8.2f ms   avg %8.2f ms' % (
+        label, min(times) * 1000.0, sum(times) * 1000.0 / len(times))
+
+
+def main(argv):
+    parser = optparse.OptionParser(
+        usage='%prog [-n runs] path/to/pypy-c [module ...]')
+    parser.add_option('-n', '--runs', type='int', default=20,
+                      help='number of runs of each variant (default: 20)')
+    options, args = parser.parse_args(argv)
+    if not args:
+        parser.error('missing the path to pypy-c')
+    executable, modules = args[0], args[1:]
+    env = os.environ.copy()
+    env.pop('PYPYSTARTUPIMAGE', None)
+    fd, image = tempfile.mkstemp(suffix='.image')
+    os.close(fd)
+    try:
+        make_image(executable, modules, image)
+        baseline = run(executable, modules, options.runs, env)
+        env['PYPYSTARTUPIMAGE'] = image
+        with_image = run(executable, modules, options.runs, env)
+    finally:
+        os.unlink(image)
+    report('no image', baseline)
+    report('startup image', with_image)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
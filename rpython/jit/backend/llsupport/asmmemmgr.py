@@ -24,6 +24,11 @@ class AsmMemoryManager(object):
         self.free_blocks = {}      # map {start: stop}
         self.free_blocks_end = {}  # map {stop: start}
         self.blocks_by_size = [[] for i in range(self.num_indices)]
+        self.large_blocks = {}     # map {start: stop} of the mmap()ed blocks
+        self.large_blocks_end = {} # map {stop: start}
+        # bytes used by the loops that the metainterp's MemoryManager
+        # evicted, but that the GC did not free yet
+        self.pending_free = 0
 
     def get_stats(self):
         """Returns stats for rlib.jit.jit_hooks.stats_asmmemmgr_*()."""
@@ -84,8 +89,36 @@ class AsmMemoryManager(object):
                 rmmap.hint.pos += 0x80000000 - size
         self.total_memory_allocated += r_uint(size)
         data = rffi.cast(lltype.Signed, data)
+        self.large_blocks[data] = data + size
+        self.large_blocks_end[data + size] = data
         return self._add_free_block(data, data + size)
 
+    def release_free_memory(self):
+        """Give back to the OS the large blocks that are entirely free.
+        Returns the number of bytes released."""
+        released = 0
+        for start, stop in self.large_blocks.items():
+            if self.free_blocks.get(start, 0) == stop:
+                self._del_free_block(start, stop)
+                del self.large_blocks[start]
+                del self.large_blocks_end[stop]
+                size = stop - start
+                data = rffi.cast(rmmap.PTR, start)
+                if not we_are_translated():
+                    for entry in self._allocated:
+                        if rffi.cast(lltype.Signed, entry[0]) == start:
+                            data = entry[0]
+                            self._allocated.remove(entry)
+                            break
+                rmmap.free(data, size)
+                self.total_memory_allocated -= r_uint(size)
+                released += size
+        if released > 0:
+            debug_start("jit-backend-release")
+            debug_print("released", released, "bytes of machine code memory")
+            debug_stop("jit-backend-release")
+        return released
+
     def _get_index(self, length):
         i = 0
         while length > self.min_fragment:
@@ -96,13 +129,14 @@ class AsmMemoryManager(object):
         return i
 
     def _add_free_block(self, start, stop):
-        # Merge with the block on the left
-        if start in self.free_blocks_end:
+        # Merge with the block on the left, but never across the boundary
+        # of two large blocks, which could then not be released separately
+        if start in self.free_blocks_end and start not in self.large_blocks:
             left_start = self.free_blocks_end[start]
             self._del_free_block(left_start, start)
             start = left_start
         # Merge with the block on the right
-        if stop in self.free_blocks:
+        if stop in self.free_blocks and stop not in self.large_blocks_end:
             right_stop = self.free_blocks[stop]
             self._del_free_block(stop, right_stop)
             stop = right_stop
@@ -254,6 +254,8 @@ class AbstractLLCPU(AbstractCPU):
         blocks = compiled_loop_token.asmmemmgr_blocks
         if blocks is not None:
             compiled_loop_token.asmmemmgr_blocks = None
+            self.asmmemmgr.pending_free -= compiled_loop_token.evicted_size
+            compiled_loop_token.evicted_size = 0
             for rawstart, rawstop in blocks:
                 self.gc_ll_descr.freeing_block(rawstart, rawstop)
                 self.asmmemmgr.free(rawstart, rawstop)
@@ -114,6 +114,21 @@ class TestAsmMemoryManager:
             self.teardown_method(None)
             self.setup_method(None)
 
+    def test_release_free_memory(self):
+        got = []
+        while self.asmmemmgr.total_memory_allocated < 3 * 8192:
+            got.append(self.asmmemmgr.malloc(1000, 1000))
+        assert self.asmmemmgr.release_free_memory() == 0
+        for start, stop in got[1:]:
+            self.asmmemmgr.free(start, stop)
+        # only the first large block is still in use
+        assert self.asmmemmgr.release_free_memory() == 2 * 8192
+        assert self.asmmemmgr.total_memory_allocated == 8192
+        self.asmmemmgr.free(*got[0])
+        assert self.asmmemmgr.release_free_memory() == 8192
+        assert self.asmmemmgr.total_memory_allocated == 0
+        assert self.asmmemmgr.free_blocks == {}
+
     def test_random(self):
         got = []
         real_use = 0
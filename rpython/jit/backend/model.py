@@ -284,6 +284,7 @@ class AbstractCPU(object):
 class CompiledLoopToken(object):
     asmmemmgr_blocks = None
     asmmemmgr_gcreftracers = None
+    evicted_size = 0      # see MemoryManager._evict_loops_now()
 
     def __init__(self, cpu, number):
         cpu.tracker.total_compiled_loops += 1
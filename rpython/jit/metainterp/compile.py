@@ -1,3 +1,4 @@
+import time
 import weakref
 from rpython.rtyper.lltypesystem import lltype, llmemory
 from rpython.rtyper.annlowlevel import cast_instance_to_gcref
@@ -558,6 +559,7 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type,
             hooks = None
     operations = get_deep_immutable_oplist(loop.operations)
     metainterp_sd.profiler.start_backend()
+    backend_start = time.time()
     debug_start("jit-backend")
     log = have_debug_prints() or jl.jitlog_enabled()
     try:
@@ -574,6 +576,8 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type,
     metainterp_sd.profiler.end_backend()
     if hooks is not None:
         debug_info.asminfo = asminfo
+        debug_info.tracing_time = backend_start - metainterp_sd.tracing_start
+        debug_info.backend_time = time.time() - backend_start
         hooks.after_compile(debug_info)
     metainterp_sd.stats.add_new_loop(loop)
     if not we_are_translated():
@@ -612,6 +616,7 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
             hooks = None
     operations = get_deep_immutable_oplist(operations)
     metainterp_sd.profiler.start_backend()
+    backend_start = time.time()
     debug_start("jit-backend")
     log = have_debug_prints() or jl.jitlog_enabled()
     try:
@@ -624,6 +629,8 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
     metainterp_sd.profiler.end_backend()
     if hooks is not None:
         debug_info.asminfo = asminfo
+        debug_info.tracing_time = backend_start - metainterp_sd.tracing_start
+        debug_info.backend_time = time.time() - backend_start
         hooks.after_compile_bridge(debug_info)
     if not we_are_translated():
         metainterp_sd.stats.compiled()
@@ -728,14 +735,29 @@ class AbstractResumeGuardDescr(ResumeDescr):
             finally:
                 self.done_compiling()
         else:
-            from rpython.jit.metainterp.blackhole import resume_in_blackhole
-            if isinstance(self, ResumeGuardCopiedDescr):
-                resume_in_blackhole(metainterp_sd, jitdriver_sd, self.prev, deadframe)    
+            hooks = metainterp_sd.warmrunnerdesc.hooks
+            if hooks.are_hooks_enabled():
+                # the time until the regular interpreter resumes, including
+                # the residual and recursive portal calls done meanwhile
+                start = time.time()
+                try:
+                    self._resume_in_blackhole(deadframe, metainterp_sd,
+                                              jitdriver_sd)
+                finally:
+                    hooks.on_blackhole(self, time.time() - start)
             else:
-                assert isinstance(self, ResumeGuardDescr)
-                resume_in_blackhole(metainterp_sd, jitdriver_sd, self, deadframe)
+                self._resume_in_blackhole(deadframe, metainterp_sd,
+                                          jitdriver_sd)
         assert 0, "unreachable"
 
+    def _resume_in_blackhole(self, deadframe, metainterp_sd, jitdriver_sd):
+        from rpython.jit.metainterp.blackhole import resume_in_blackhole
+        if isinstance(self, ResumeGuardCopiedDescr):
+            resume_in_blackhole(metainterp_sd, jitdriver_sd, self.prev, deadframe)
+        else:
+            assert isinstance(self, ResumeGuardDescr)
+            resume_in_blackhole(metainterp_sd, jitdriver_sd, self, deadframe)
+
     def _trace_and_compile_from_bridge(self, deadframe, metainterp_sd,
                                        jitdriver_sd):
         # 'jitdriver_sd' corresponds to the outermost one, i.e. the one
@@ -819,6 +841,10 @@ class AbstractResumeGuardDescr(ResumeDescr):
             self._debug_subinputargs = new_loop.inputargs
             self._debug_suboperations = new_loop.operations
         propagate_original_jitcell_token(new_loop)
+        if isinstance(self, ResumeGuardDescr):
+            # the failures now go to the bridge; the copies of this guard,
+            # if any, decode the frames again if needed
+            self.rd_frames_cache = None
         send_bridge_to_backend(metainterp.jitdriver_sd, metainterp.staticdata,
                                self, inputargs, new_loop.operations,
                                new_loop.original_jitcell_token,
@@ -866,11 +892,12 @@ class ResumeGuardCopiedDescr(AbstractResumeGuardDescr):
 
 class ResumeGuardDescr(AbstractResumeGuardDescr):
     _attrs_ = ('rd_numb', 'rd_consts', 'rd_virtuals',
-               'rd_pendingfields', 'status')
+               'rd_pendingfields', 'rd_frames_cache', 'status')
     rd_numb = lltype.nullptr(NUMBERING)
     rd_consts = None
     rd_virtuals = None
     rd_pendingfields = lltype.nullptr(PENDINGFIELDSP.TO)
+    rd_frames_cache = None    # see resume.FramesCache
 
     def copy_all_attributes_from(self, other):
         other = other.get_resumestorage()
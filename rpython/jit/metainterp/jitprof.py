@@ -9,8 +9,8 @@ from rpython.jit.metainterp.jitexc import JitException
 from rpython.rlib.jit import Counters
 
 
-JITPROF_LINES = Counters.ncounters + 1 + 1
-# one for TOTAL, 1 for calls, update if needed
+JITPROF_LINES = Counters.ncounters + 1 + 1 + 2
+# one for TOTAL, 1 for calls, 2 for the longest events, update if needed
 _CPU_LINES = 4       # the last 4 lines are stored on the cpu
 
 class BaseProfiler(object):
@@ -49,12 +49,16 @@ class EmptyProfiler(BaseProfiler):
     def get_times(self, num):
         return 0.0
 
+    def get_max_time(self, num):
+        return 0.0
+
 class Profiler(BaseProfiler):
     initialized = False
     timer = staticmethod(time.time)
     starttime = 0
     t1 = 0
     times = None
+    max_times = None
     counters = None
     calls = 0
     current = None
@@ -64,9 +68,13 @@ class Profiler(BaseProfiler):
         self.starttime = self.timer()
         self.t1 = self.starttime
         self.times = [0, 0]
+        # the longest single TRACING and BACKEND events, including the
+        # nested events: this is the longest pause caused by the JIT
+        self.max_times = [0.0, 0.0]
         self.counters = [0] * (Counters.ncounters - _CPU_LINES)
         self.calls = 0
         self.current = []
+        self.current_starts = []
 
     def finish(self):
         self.tk = self.timer()
@@ -79,6 +87,7 @@ class Profiler(BaseProfiler):
             self.times[self.current[-1]] += self.t1 - t0
         self.counters[event] += 1
         self.current.append(event)
+        self.current_starts.append(self.t1)
 
     def _end(self, event):
         t0 = self.t1
@@ -87,10 +96,13 @@ class Profiler(BaseProfiler):
             debug_print("BROKEN PROFILER DATA!")
             return
         ev1 = self.current.pop()
+        start = self.current_starts.pop()
         if ev1 != event:
             debug_print("BROKEN PROFILER DATA!")
             return
         self.times[ev1] += self.t1 - t0
+        if self.t1 - start > self.max_times[ev1]:
+            self.max_times[ev1] = self.t1 - start
 
     def start_tracing(self):   self._start(Counters.TRACING)
     def end_tracing(self):     self._end  (Counters.TRACING)
@@ -115,6 +127,9 @@ class Profiler(BaseProfiler):
     def get_times(self, num):
         return self.times[num]
 
+    def get_max_time(self, num):
+        return self.max_times[num]
+
     def count_ops(self, opnum, kind=Counters.OPS):
         from rpython.jit.metainterp.resoperation import OpHelpers
         self.counters[kind] += 1
@@ -135,6 +150,10 @@ class Profiler(BaseProfiler):
                               tim[Counters.TRACING])
         self._print_line_time("Backend", cnt[Counters.BACKEND],
                               tim[Counters.BACKEND])
+        debug_print("Longest tracing:\t%f" %
+                    (self.max_times[Counters.TRACING],))
+        debug_print("Longest backend:\t%f" %
+                    (self.max_times[Counters.BACKEND],))
         line = "TOTAL:      \t\t%f" % (self.tk - self.starttime, )
         debug_print(line)
         self._print_intline("ops", cnt[Counters.OPS])
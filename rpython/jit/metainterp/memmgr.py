@@ -1,5 +1,5 @@
 import math
-from rpython.rlib.rarithmetic import r_int64
+from rpython.rlib.rarithmetic import r_int64, intmask
 from rpython.rlib.debug import debug_start, debug_print, debug_stop
 from rpython.rlib.objectmodel import we_are_translated
 
@@ -19,6 +19,16 @@ from rpython.rlib.objectmodel import we_are_translated
 # 'generation' field is much smaller than the current generation, and
 # removed from the set.
 #
+# Independently, if 'max_code_size' is set, the machine code is kept
+# below that many bytes: when the backend's AsmMemoryManager uses more,
+# the least recently entered loops (together with their bridges) are
+# removed from 'alive_loops' until enough of them are gone.  This uses
+# the same 'generation' field, which keep_loop_alive() updates every
+# time a loop is entered from the interpreter.  The code of the evicted
+# loops is only freed when the GC collects them: until then, its size
+# is counted in the 'pending_free' of the AsmMemoryManager, and not
+# counted again against the limit.
+#
 
 class MemoryManager(object):
 
@@ -38,6 +48,9 @@ class MemoryManager(object):
         self.current_generation = r_int64(1)
         self.next_check = r_int64(-1)
         self.alive_loops = {}
+        self.max_code_size = 0
+        self.asmmemmgr = None      # set by warmspot, if the backend has one
+        self.evicted_loops = 0
 
     def set_max_age(self, max_age, check_frequency=0):
         if max_age <= 0:
@@ -49,16 +62,26 @@ class MemoryManager(object):
             self.check_frequency = check_frequency
             self.next_check = self.current_generation + 1
 
+    def set_max_code_size(self, max_code_size):
+        self.max_code_size = max_code_size
+
     def next_generation(self):
         self.current_generation += 1
         if self.current_generation == self.next_check:
             self._kill_old_loops_now()
             self.next_check = self.current_generation + self.check_frequency
+        if self.max_code_size > 0 and self.asmmemmgr is not None:
+            self._check_code_size()
 
     def keep_loop_alive(self, looptoken):
         if looptoken.generation != self.current_generation:
             looptoken.generation = self.current_generation
             self.alive_loops[looptoken] = None
+            clt = looptoken.compiled_loop_token
+            if clt is not None and clt.evicted_size > 0:
+                # an evicted loop that was entered again before being freed
+                self.asmmemmgr.pending_free -= clt.evicted_size
+                clt.evicted_size = 0
 
     def _kill_old_loops_now(self):
         debug_start("jit-mem-collect")
@@ -81,3 +104,66 @@ class MemoryManager(object):
             # a single one is not enough for all tests :-(
             rgc.collect(); rgc.collect(); rgc.collect()
         debug_stop("jit-mem-collect")
+
+    def _check_code_size(self):
+        used = intmask(self.asmmemmgr.get_stats()[1])
+        # don't count the loops that were already evicted, even if
+        # the GC did not free them yet
+        used -= self.asmmemmgr.pending_free
+        if used > self.max_code_size:
+            # give back to the OS the memory of the loops freed so far;
+            # this walks all the large blocks, so it is not done below
+            # the limit
+            self.asmmemmgr.release_free_memory()
+            self._evict_loops_now(used - self.max_code_size)
+
+    def _evict_loops_now(self, excess):
+        debug_start("jit-mem-evict")
+        # total size of the machine code of the loops, grouped by the
+        # generation in which they were last entered
+        sizes = {}
+        for looptoken in self.alive_loops:
+            size = get_code_size(looptoken)
+            sizes[looptoken.generation] = sizes.get(looptoken.generation,
+                                                    0) + size
+        generations = sizes.keys()
+        generations.sort()
+        # evict the oldest generations until we free 'excess' bytes, but
+        # never the loops entered or compiled in the current generation
+        max_generation = r_int64(-1)
+        freed = 0
+        for generation in generations:
+            if freed >= excess or generation >= self.current_generation - 1:
+                break
+            freed += sizes[generation]
+            max_generation = generation
+        oldtotal = len(self.alive_loops)
+        debug_print("Current generation:", self.current_generation)
+        debug_print("Bytes over the limit:", excess)
+        for looptoken in self.alive_loops.keys():
+            if (0 <= looptoken.generation <= max_generation or
+                looptoken.invalidated):
+                del self.alive_loops[looptoken]
+                clt = looptoken.compiled_loop_token
+                if clt is not None and clt.evicted_size == 0:
+                    clt.evicted_size = get_code_size(looptoken)
+                    self.asmmemmgr.pending_free += clt.evicted_size
+        newtotal = len(self.alive_loops)
+        self.evicted_loops += oldtotal - newtotal
+        debug_print("Loop tokens evicted:", oldtotal - newtotal)
+        debug_print("Bytes of code evicted:", freed)
+        if not we_are_translated() and oldtotal != newtotal:
+            looptoken = None
+            from rpython.rlib import rgc
+            rgc.collect(); rgc.collect(); rgc.collect()
+        debug_stop("jit-mem-evict")
+
+
+def get_code_size(looptoken):
+    """Size of the machine code and data of a loop and its bridges."""
+    size = 0
+    clt = looptoken.compiled_loop_token
+    if clt is not None and clt.asmmemmgr_blocks is not None:
+        for rawstart, rawstop in clt.asmmemmgr_blocks:
+            size += rawstop - rawstart
+    return size
@@ -1,4 +1,5 @@
 import sys
+import time
 
 import py
 
@@ -1824,6 +1825,7 @@ class MIFrame(object):
 class MetaInterpStaticData(object):
     logger_noopt = None
     logger_ops = None
+    tracing_start = 0.0    # time.time() when the current tracing started
 
     def __init__(self, cpu, options,
                  ProfilerClass=EmptyProfiler, warmrunnerdesc=None):
@@ -1840,6 +1842,7 @@ class MetaInterpStaticData(object):
         self.profiler = ProfilerClass()
         self.profiler.cpu = cpu
         self.warmrunnerdesc = warmrunnerdesc
+        self.frames_cache = False   # see resume.FramesCache
         if warmrunnerdesc:
             self.config = warmrunnerdesc.translator.config
         else:
@@ -2432,6 +2435,7 @@ class MetaInterp(object):
         debug_start('jit-tracing')
         self.staticdata._setup_once()
         self.staticdata.profiler.start_tracing()
+        self.staticdata.tracing_start = time.time()
         assert jitdriver_sd is self.jitdriver_sd
         self.staticdata.try_to_free_some_loops()
         try:
@@ -2460,6 +2464,7 @@ class MetaInterp(object):
     def handle_guard_failure(self, resumedescr, deadframe):
         debug_start('jit-tracing')
         self.staticdata.profiler.start_tracing()
+        self.staticdata.tracing_start = time.time()
         key = resumedescr.get_resumestorage()
         assert isinstance(key, compile.ResumeGuardDescr)
         # store the resumekey.wref_original_loop_token() on 'self' to make
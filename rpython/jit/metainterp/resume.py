@@ -1331,6 +1331,19 @@ def blackhole_from_resumedata(blackholeinterpbuilder, jitcodes,
     finally:
         rstack._stack_criticalcode_stop()
     #
+    # The frames are decoded only once for the guards that are resumed
+    # more than once in the blackhole interpreter, see FramesCache.
+    if blackholeinterpbuilder.metainterp_sd.frames_cache:
+        frames = storage.rd_frames_cache
+        if frames is None:
+            storage.rd_frames_cache = FRAMES_NOT_CACHED
+        elif frames is FRAMES_NOT_CACHED:
+            frames = resumereader.decode_frames(jitcodes)
+            storage.rd_frames_cache = frames
+        if frames is not None and frames is not FRAMES_NOT_CACHED:
+            return frames.fill_blackhole_interps(blackholeinterpbuilder,
+                                                 resumereader)
+    #
     # First get a chain of blackhole interpreters whose length is given
     # by the positions in the numbering.  The first one we get must be
     # the bottom one, i.e. the last one in the chain, in order to make
@@ -1347,6 +1360,50 @@ def blackhole_from_resumedata(blackholeinterpbuilder, jitcodes,
         curbh.handle_rvmprof_enter()
     return curbh
 
+class FramesCache(object):
+    """The frames of the resume data of a guard, decoded: the jitcode and
+    pc of each frame, and for each live register its index and its tagged
+    value.  This avoids decoding the numbering and looking up the liveness
+    of the frames again every time the guard fails without a bridge.  The
+    virtuals, which depend on the deadframe, are still built on demand.
+    """
+    def __init__(self):
+        self.jitcodes = []
+        self.pcs = []
+        self.ends = []       # for each frame, the ends of its i, r and f
+        self.indexes = []    # the register indexes of all frames
+        self.tagged = []     # the tagged values, in the same order
+
+    def fill_blackhole_interps(self, blackholeinterpbuilder, resumereader):
+        # same as the loop in blackhole_from_resumedata()
+        curbh = None
+        k = 0
+        for n in range(len(self.jitcodes)):
+            nextbh = blackholeinterpbuilder.acquire_interp()
+            nextbh.nextblackholeinterp = curbh
+            curbh = nextbh
+            curbh.setposition(self.jitcodes[n], self.pcs[n])
+            end = self.ends[n * 3]
+            while k < end:
+                curbh.setarg_i(self.indexes[k],
+                               resumereader.decode_int(self.tagged[k]))
+                k += 1
+            end = self.ends[n * 3 + 1]
+            while k < end:
+                curbh.setarg_r(self.indexes[k],
+                               resumereader.decode_ref(self.tagged[k]))
+                k += 1
+            end = self.ends[n * 3 + 2]
+            while k < end:
+                curbh.setarg_f(self.indexes[k],
+                               resumereader.decode_float(self.tagged[k]))
+                k += 1
+            curbh.handle_rvmprof_enter()
+        return curbh
+
+# marks a guard that was resumed once in the blackhole interpreter
+FRAMES_NOT_CACHED = FramesCache()
+
 def force_from_resumedata(metainterp_sd, storage, deadframe, vinfo, ginfo):
     resumereader = ResumeDataDirectReader(metainterp_sd, storage, deadframe)
     resumereader.handling_async_forcing()
@@ -1382,6 +1439,29 @@ class ResumeDataDirectReader(AbstractResumeDataReader):
     def handling_async_forcing(self):
         self.resume_after_guard_not_forced = 1
 
+    def decode_frames(self, jitcodes):
+        frames = FramesCache()
+        reader = self.resumecodereader
+        while not self.done_reading():
+            jitcode_pos, pc = self.read_jitcode_pos_pc()
+            jitcode = jitcodes[jitcode_pos]
+            frames.jitcodes.append(jitcode)
+            frames.pcs.append(pc)
+            info = jitcode.get_live_vars_info(pc)
+            for i in range(info.get_register_count_i()):
+                frames.indexes.append(info.get_register_index_i(i))
+                frames.tagged.append(reader.next_item())
+            frames.ends.append(len(frames.indexes))
+            for i in range(info.get_register_count_r()):
+                frames.indexes.append(info.get_register_index_r(i))
+                frames.tagged.append(reader.next_item())
+            frames.ends.append(len(frames.indexes))
+            for i in range(info.get_register_count_f()):
+                frames.indexes.append(info.get_register_index_f(i))
+                frames.tagged.append(reader.next_item())
+            frames.ends.append(len(frames.indexes))
+        return frames
+
     def consume_one_section(self, blackholeinterp):
         self.blackholeinterp = blackholeinterp
         info = blackholeinterp.get_current_position_info()
@@ -1,5 +1,5 @@
 import py
-from rpython.rlib.jit import JitDriver
+from rpython.rlib.jit import JitDriver, set_param
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.jit.metainterp.blackhole import BlackholeInterpBuilder
 from rpython.jit.metainterp.blackhole import BlackholeInterpreter
@@ -217,6 +217,88 @@ class TestBlackhole(LLJitMixin):
         builder = pyjitpl._warmrunnerdesc.metainterp_sd.blackholeinterpbuilder
         assert builder.num_interpreters == 2
 
+    def _make_guard_failing_often(self, trace_eagerness, frames_cache=1):
+        myjitdriver = JitDriver(greens = [], reds = ['n', 'total'])
+        class A(object):
+            def __init__(self, value):
+                self.value = value
+        def g(a, n):
+            if n % 3 == 0:      # <- fails often
+                return a.value * 2
+            return a.value
+        def f(n):
+            set_param(myjitdriver, 'trace_eagerness', trace_eagerness)
+            set_param(myjitdriver, 'frames_cache', frames_cache)
+            total = 0
+            while n > 0:
+                myjitdriver.jit_merge_point(n=n, total=total)
+                a = A(n + 1)
+                total += g(a, n)
+                n -= 1
+            return total
+        return f
+
+    def test_frames_cache(self):
+        from rpython.jit.metainterp import resume
+        f = self._make_guard_failing_often(10000)   # never gets a bridge
+        decoded = []
+        def my_decode_frames(self, jitcodes):
+            frames = org_decode_frames(self, jitcodes)
+            decoded.append(frames)
+            return frames
+        org_decode_frames = resume.ResumeDataDirectReader.decode_frames
+        resume.ResumeDataDirectReader.decode_frames = my_decode_frames
+        try:
+            res = self.meta_interp(f, [100])
+        finally:
+            resume.ResumeDataDirectReader.decode_frames = org_decode_frames
+        #
+        assert res == f(100)
+        assert len(decoded) == 1
+        [frames] = decoded
+        assert len(frames.jitcodes) == 2     # f() and g()
+        assert len(frames.indexes) == len(frames.tagged) == frames.ends[-1]
+
+    def test_frames_cache_disabled(self):
+        from rpython.jit.metainterp import resume
+        f = self._make_guard_failing_often(10000, frames_cache=0)
+        decoded = []
+        def my_decode_frames(self, jitcodes):
+            decoded.append(self)
+            return org_decode_frames(self, jitcodes)
+        org_decode_frames = resume.ResumeDataDirectReader.decode_frames
+        resume.ResumeDataDirectReader.decode_frames = my_decode_frames
+        try:
+            res = self.meta_interp(f, [100])
+        finally:
+            resume.ResumeDataDirectReader.decode_frames = org_decode_frames
+        assert res == f(100)
+        assert decoded == []
+
+    def test_frames_cache_freed_with_bridge(self):
+        from rpython.jit.metainterp import compile, resume
+        f = self._make_guard_failing_often(5)
+        attached = []
+        def my_compile_and_attach(self, *args):
+            cache = self.rd_frames_cache
+            org_compile_and_attach(self, *args)
+            attached.append((cache, self.rd_frames_cache))
+        org_compile_and_attach = compile.ResumeGuardDescr.compile_and_attach
+        compile.ResumeGuardDescr.compile_and_attach = my_compile_and_attach
+        try:
+            res = self.meta_interp(f, [100])
+        finally:
+            compile.ResumeGuardDescr.compile_and_attach = (
+                org_compile_and_attach)
+        assert res == f(100)
+        assert attached
+        # the cache was built before the bridge, and released then
+        assert [cache for cache, _ in attached
+                if cache is not None and
+                   cache is not resume.FRAMES_NOT_CACHED]
+        for _, cache_after in attached:
+            assert cache_after is None
+
 def test_bad_shift():
     py.test.raises(ValueError, BlackholeInterpreter.bhimpl_int_lshift.im_func, 7, 100)
     py.test.raises(ValueError, BlackholeInterpreter.bhimpl_int_rshift.im_func, 7, 100)
@@ -1,6 +1,7 @@
 
 import py
-from rpython.rlib.jit import JitDriver, JitHookInterface, Counters, dont_look_inside
+from rpython.rlib.jit import (JitDriver, JitHookInterface, Counters,
+    dont_look_inside, set_param)
 from rpython.rlib import jit_hooks
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.jit.codewriter.policy import JitPolicy
@@ -141,6 +142,10 @@ class JitHookInterfaceTests(object):
             assert jit_hooks.stats_get_counter_value(None,
                                                      Counters.TRACING) == 2
             assert jit_hooks.stats_get_times_value(None, Counters.TRACING) >= 0
+            tracing = jit_hooks.stats_get_times_value(None, Counters.TRACING)
+            longest = jit_hooks.stats_get_max_times_value(None,
+                                                          Counters.TRACING)
+            assert 0 < longest <= tracing
 
         self.meta_interp(main, [], ProfilerClass=Profiler)
 
@@ -155,6 +160,8 @@ class JitHookInterfaceTests(object):
             assert jit_hooks.stats_get_counter_value(None,
                                            Counters.TOTAL_COMPILED_LOOPS) == 0
             assert jit_hooks.stats_get_times_value(None, Counters.TRACING) == 0
+            assert jit_hooks.stats_get_max_times_value(None,
+                                                       Counters.TRACING) == 0
         self.meta_interp(main, [], ProfilerClass=EmptyProfiler)
 
     def test_get_jitcell_at_key(self):
@@ -202,6 +209,23 @@ class JitHookInterfaceTests(object):
         self.meta_interp(main, [5])
         self.check_jitcell_token_count(2)
 
+    def test_trace_when_reached(self):
+        driver = JitDriver(greens = ['s'], reds = ['i'], name='jit')
+
+        def loop(i, s):
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                i -= 1
+
+        def main(s):
+            set_param(driver, 'threshold', 1000)
+            jit_hooks.trace_when_reached("jit", s)
+            loop(3, s + 1)     # not traced, the threshold is not reached
+            loop(3, s)         # traced and compiled immediately
+
+        self.meta_interp(main, [5])
+        self.check_jitcell_token_count(1)
+
     def test_dont_trace_here(self):
         driver = JitDriver(greens = ['s'], reds = ['i', 'k'], name='jit')
 
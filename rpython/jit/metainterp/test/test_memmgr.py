@@ -21,6 +21,36 @@ from rpython.rlib import rgc
 class FakeLoopToken:
     generation = 0
     invalidated = False
+    compiled_loop_token = None
+
+class FakeCompiledLoopToken:
+    evicted_size = 0
+    def __init__(self, size):
+        self.asmmemmgr_blocks = [(1000, 1000 + size)]
+
+class FakeAsmMemoryManager:
+    # the code of the evicted loops is only freed by free(), like
+    # cpu.free_loop_and_bridges() when the GC collects the loop token
+    pending_free = 0
+    def __init__(self, memmgr):
+        self.memmgr = memmgr
+        self.tokens = []
+        self.released = 0
+    def release_free_memory(self):
+        self.released += 1
+        return 0
+    def get_stats(self):
+        used = 0
+        for token in self.tokens:
+            clt = token.compiled_loop_token
+            if clt.asmmemmgr_blocks is not None:
+                used += clt.asmmemmgr_blocks[0][1] - 1000
+        return (65536, used)
+    def free(self, token):
+        clt = token.compiled_loop_token
+        clt.asmmemmgr_blocks = None
+        self.pending_free -= clt.evicted_size
+        clt.evicted_size = 0
 
 
 class _TestMemoryManager:
@@ -60,6 +90,69 @@ class _TestMemoryManager:
             else:
                 assert memmgr.alive_loops == {}
 
+    def test_max_code_size(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(0)
+        memmgr.set_max_code_size(450)
+        asmmemmgr = FakeAsmMemoryManager(memmgr)
+        memmgr.asmmemmgr = asmmemmgr
+        tokens = [FakeLoopToken() for i in range(10)]
+        for token in tokens:
+            token.compiled_loop_token = FakeCompiledLoopToken(100)
+            asmmemmgr.tokens.append(token)
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+            # the GC frees the evicted loops immediately
+            for evicted in asmmemmgr.tokens:
+                if evicted not in memmgr.alive_loops:
+                    asmmemmgr.free(evicted)
+            # keep the first loop alive by entering it again
+            memmgr.keep_loop_alive(tokens[0])
+        assert memmgr.alive_loops == dict.fromkeys([tokens[0]] + tokens[7:])
+        assert memmgr.evicted_loops == 6
+
+    def test_max_code_size_release_only_above(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(0)
+        memmgr.set_max_code_size(450)
+        asmmemmgr = FakeAsmMemoryManager(memmgr)
+        memmgr.asmmemmgr = asmmemmgr
+        tokens = [FakeLoopToken() for i in range(5)]
+        for token in tokens:
+            token.compiled_loop_token = FakeCompiledLoopToken(100)
+            asmmemmgr.tokens.append(token)
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+            memmgr.next_generation()
+        assert asmmemmgr.released == 1
+
+    def test_max_code_size_not_freed_yet(self):
+        # the evicted loops are not freed immediately: they must not be
+        # counted again at the next check, evicting more loops
+        memmgr = MemoryManager()
+        memmgr.set_max_age(0)
+        memmgr.set_max_code_size(450)
+        asmmemmgr = FakeAsmMemoryManager(memmgr)
+        memmgr.asmmemmgr = asmmemmgr
+        tokens = [FakeLoopToken() for i in range(10)]
+        for token in tokens:
+            token.compiled_loop_token = FakeCompiledLoopToken(100)
+            asmmemmgr.tokens.append(token)
+            memmgr.keep_loop_alive(token)
+            memmgr.next_generation()
+            memmgr.keep_loop_alive(tokens[0])
+        assert memmgr.alive_loops == dict.fromkeys([tokens[0]] + tokens[7:])
+        assert memmgr.evicted_loops == 6
+        assert asmmemmgr.pending_free == 600
+        # the GC frees some of them
+        for token in tokens[1:4]:
+            asmmemmgr.free(token)
+        assert asmmemmgr.pending_free == 300
+        # an evicted loop entered again before it is freed counts again
+        memmgr.keep_loop_alive(tokens[5])
+        assert asmmemmgr.pending_free == 200
+        assert tokens[5] in memmgr.alive_loops
+
     def test_basic_3(self):
         memmgr = MemoryManager()
         memmgr.set_max_age(4, 1)
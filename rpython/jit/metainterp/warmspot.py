@@ -494,6 +494,7 @@ class WarmRunnerDesc(object):
         if not supports_singlefloats:
             cpu.supports_singlefloats = False
         self.cpu = cpu
+        self.memory_manager.asmmemmgr = getattr(cpu, 'asmmemmgr', None)
 
     def build_meta_interp(self, ProfilerClass, opencoder_model):
         from rpython.jit.metainterp.opencoder import Model, BigModel
@@ -691,7 +692,8 @@ class WarmRunnerDesc(object):
                 jitdrivers_by_name[name] = jd
         m = _find_jit_markers(self.translator.graphs,
                               ('get_jitcell_at_key', 'trace_next_iteration',
-                               'dont_trace_here', 'trace_next_iteration_hash'))
+                               'dont_trace_here', 'trace_next_iteration_hash',
+                               'trace_when_reached'))
         accessors = {}
 
         def get_accessor(name, jitdriver_name, function, ARGS, green_arg_spec):
@@ -743,6 +745,8 @@ class WarmRunnerDesc(object):
                 func = JitCell.get_jitcell
             elif op.args[0].value == 'dont_trace_here':
                 func = JitCell.dont_trace_here
+            elif op.args[0].value == 'trace_when_reached':
+                func = JitCell.trace_when_reached
             elif op.args[0].value == 'trace_next_iteration_hash':
                 func = JitCell.trace_next_iteration_hash
             else:
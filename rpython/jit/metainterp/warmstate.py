@@ -138,6 +138,7 @@ JC_TRACING         = 0x01
 JC_DONT_TRACE_HERE = 0x02
 JC_TEMPORARY       = 0x04
 JC_TRACING_OCCURRED= 0x08
+JC_TRACE_WHEN_REACHED = 0x10
 
 class BaseJitCell(object):
     """Subclasses of BaseJitCell are used in tandem with the single
@@ -184,6 +185,12 @@ class BaseJitCell(object):
         this particular function.  (We only set this flag when aborting
         due to a trace too long, so we use the same flag as a hint to
         also mean "please trace from here as soon as possible".)
+
+        JC_TRACE_WHEN_REACHED: start tracing the next time we reach this
+        greenkey, without counting.  Unlike trace_next_iteration(), which
+        only changes the counter of the greenkey, this is not lost when
+        the counters decay.  Used to replay a warmup profile saved by a
+        previous run of the program.
     """
     flags = 0     # JC_xxx flags
     wref_procedure_token = None
@@ -215,6 +222,9 @@ class BaseJitCell(object):
             return False    # don't remove JitCells with a procedure_token
         if self.flags & JC_TRACING:
             return False    # don't remove JitCells that are being traced
+        if (self.flags & (JC_TRACE_WHEN_REACHED | JC_TRACING_OCCURRED) ==
+                JC_TRACE_WHEN_REACHED):
+            return False    # don't remove JitCells that were never reached
         if self.flags & JC_DONT_TRACE_HERE:
             # if we have this flag, and we *had* a procedure_token but
             # we no longer have one, then remove me.  this prevents this
@@ -289,6 +299,12 @@ class WarmEnterState(object):
             self.warmrunnerdesc.memory_manager is not None):   # all for tests
             self.warmrunnerdesc.memory_manager.set_max_age(value)
 
+    def set_param_max_code_size(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if self.warmrunnerdesc:
+            if self.warmrunnerdesc.memory_manager:
+                self.warmrunnerdesc.memory_manager.set_max_code_size(value)
+
     def set_param_retrace_limit(self, value):
         if self.warmrunnerdesc:
             if self.warmrunnerdesc.memory_manager:
@@ -318,6 +334,12 @@ class WarmEnterState(object):
     def set_param_vec_cost(self, ivalue):
         self.vec_cost = ivalue
 
+    def set_param_frames_cache(self, ivalue):
+        # note: it's a global parameter, not a per-jitdriver one
+        if self.warmrunnerdesc:
+            if self.warmrunnerdesc.metainterp_sd:
+                self.warmrunnerdesc.metainterp_sd.frames_cache = bool(ivalue)
+
     def disable_noninlinable_function(self, greenkey):
         cell = self.JitCell.ensure_jit_cell_at_key(greenkey)
         cell.flags |= JC_DONT_TRACE_HERE
@@ -468,11 +490,12 @@ class WarmEnterState(object):
             # machine code was already compiled for these greenargs
             procedure_token = cell.get_procedure_token()
             if procedure_token is None:
-                if cell.flags & JC_DONT_TRACE_HERE:
+                if cell.flags & (JC_DONT_TRACE_HERE | JC_TRACE_WHEN_REACHED):
                     if not cell.has_seen_a_procedure_token():
-                        # A JC_DONT_TRACE_HERE, i.e. a non-inlinable function.
-                        # If we never tried to trace it, try it now immediately.
-                        # Otherwise, count normally.
+                        # A JC_DONT_TRACE_HERE, i.e. a non-inlinable function,
+                        # or a JC_TRACE_WHEN_REACHED.  If we never tried to
+                        # trace it, try it now immediately.  Otherwise, count
+                        # normally.
                         if cell.flags & JC_TRACING_OCCURRED:
                             tick = jitcounter.tick(hash, increment_threshold)
                         else:
@@ -630,6 +653,12 @@ class WarmEnterState(object):
             def dont_trace_here(*greenargs):
                 cell = JitCell._ensure_jit_cell_at_key(*greenargs)
                 cell.flags |= JC_DONT_TRACE_HERE
+
+            @staticmethod
+            def trace_when_reached(*greenargs):
+                cell = JitCell._ensure_jit_cell_at_key(*greenargs)
+                if cell.get_procedure_token() is None:
+                    cell.flags |= JC_TRACE_WHEN_REACHED
         #
         self.JitCell = JitCell
         return JitCell
@@ -10,6 +10,8 @@ import re
 REGEXES = [
     (('tracing_no', 'tracing_time'), '^Tracing:\s+([\d.]+)\s+([\d.]+)$'),
     (('backend_no', 'backend_time'), '^Backend:\s+([\d.]+)\s+([\d.]+)$'),
+    (('longest_tracing',), '^Longest tracing:\s+([\d.]+)$'),
+    (('longest_backend',), '^Longest backend:\s+([\d.]+)$'),
     (None, '^TOTAL.*$'),
     (('ops.total',), '^ops:\s+(\d+)$'),
     (('recorded_ops.total',), '^recorded ops:\s+(\d+)$'),
@@ -51,6 +53,8 @@ class OutputInfo(object):
     tracing_time = 0.0
     backend_no = 0
     backend_time = 0.0
+    longest_tracing = 0.0
+    longest_backend = 0.0
     asm_no = 0
     asm_time = 0.0
     guards = 0
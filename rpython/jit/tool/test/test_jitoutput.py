@@ -45,6 +45,8 @@ def test_really_run():
 
 DATA = '''Tracing:         1       0.006992
 Backend:        1       0.000525
+Longest tracing:        0.006992
+Longest backend:        0.000525
 TOTAL:                  0.025532
 ops:                    2
 recorded ops:           6
@@ -76,6 +78,8 @@ def test_parse():
     assert info.tracing_time == 0.006992
     assert info.backend_no == 1
     assert info.backend_time == 0.000525
+    assert info.longest_tracing == 0.006992
+    assert info.longest_backend == 0.000525
     assert info.ops.total == 2
     assert info.recorded_ops.total == 6
     assert info.recorded_ops.calls == 3
@@ -189,6 +189,12 @@ FORWARDSTUB = lltype.GcStruct('forwarding_stub',
                               ('forw', llmemory.Address))
 FORWARDSTUBPTR = lltype.Ptr(FORWARDSTUB)
 NURSARRAY = lltype.Array(llmemory.Address)
+PAUSE_HISTOGRAM = lltype.FixedSizeArray(lltype.Signed, rgc.PAUSE_HISTOGRAM_SIZE)
+
+# with a 'max_pause', the number of times that the marking can find new
+# objects added by the mutator in 'more_objects_to_trace' before they are
+# all visited at once anyway, as without a 'max_pause'
+MAX_PAUSE_MARKING_ROUNDS = 16
 
 # ____________________________________________________________
 
@@ -295,10 +301,12 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.growth_rate_max = growth_rate_max
         self.num_major_collects = 0
         self.min_heap_size = 0.0
+        self.min_heap_size_from_env = False
         self.max_heap_size = 0.0
         self.max_heap_size_already_raised = False
         self.max_delta = float(r_uint(-1))
         self.max_number_of_pinned_objects = 0      # computed later
+        self.max_number_of_pinned_objects_from_env = False
         #
         self.card_page_indices = card_page_indices
         if self.card_page_indices > 0:
@@ -317,6 +325,19 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.debug_rotating_nurseries = lltype.nullptr(NURSARRAY)
         self.extra_threshold = 0
         #
+        # The size of the nursery after the next minor collection; see
+        # _resize_nursery().  'nursery_size_configured' is the size that
+        # we use if there is no 'max_pause'.
+        self.nursery_size_wanted = nursery_size
+        self.nursery_size_configured = nursery_size
+        #
+        # The maximum duration of the GC pauses, in the units of
+        # read_timestamp(), or 0.  See set_max_pause().
+        self.max_pause = 0
+        self.max_pause_increment_step = 0
+        self.marking_rounds = 0
+        self.pause_histogram = lltype.nullptr(PAUSE_HISTOGRAM)
+        #
         # The ArenaCollection() handles the nonmovable objects allocation.
         if ArenaCollectionClass is None:
             from rpython.memory.gc import minimarkpage
@@ -386,6 +407,9 @@ class IncrementalMiniMarkGC(MovingGCBase):
         p = lltype.malloc(self._ADDRARRAY, 1, flavor='raw',
                           track_allocation=False)
         self.singleaddr = llmemory.cast_ptr_to_adr(p)
+        self.pause_histogram = lltype.malloc(PAUSE_HISTOGRAM, flavor='raw',
+                                             zero=True,
+                                             track_allocation=False)
         #
         # Two lists of all objects with destructors.
         self.young_objects_with_destructors = self.AddressStack()
@@ -467,6 +491,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
             min_heap_size = env.read_uint_from_env('PYPY_GC_MIN')
             if min_heap_size > 0:
                 self.min_heap_size = float(min_heap_size)
+                self.min_heap_size_from_env = True
             else:
                 # defaults to 8 times the nursery
                 self.min_heap_size = newsize * 8
@@ -496,9 +521,12 @@ class IncrementalMiniMarkGC(MovingGCBase):
             llarena.arena_free(self.nursery)
             self.nursery_size = newsize
             self.allocate_nursery()
+        self.nursery_size_wanted = self.nursery_size
+        self.nursery_size_configured = self.nursery_size
         #
         env_max_number_of_pinned_objects = os.environ.get('PYPY_GC_MAX_PINNED')
         if env_max_number_of_pinned_objects:
+            self.max_number_of_pinned_objects_from_env = True
             try:
                 env_max_number_of_pinned_objects = int(env_max_number_of_pinned_objects)
             except ValueError:
@@ -507,9 +535,12 @@ class IncrementalMiniMarkGC(MovingGCBase):
             if env_max_number_of_pinned_objects >= 0: # 0 allows to disable pinning completely
                 self.max_number_of_pinned_objects = env_max_number_of_pinned_objects
         else:
-            # Estimate this number conservatively
-            bigobj = self.nonlarge_max + 1
-            self.max_number_of_pinned_objects = self.nursery_size / (bigobj * 2)
+            self._estimate_max_number_of_pinned_objects()
+
+    def _estimate_max_number_of_pinned_objects(self):
+        # Estimate this number conservatively
+        bigobj = self.nonlarge_max + 1
+        self.max_number_of_pinned_objects = self.nursery_size / (bigobj * 2)
 
     def _nursery_memory_size(self):
         extra = self.nonlarge_max + 1
@@ -589,6 +620,26 @@ class IncrementalMiniMarkGC(MovingGCBase):
                         "extra nurseries")
             debug_stop("gc-debug")
 
+    def _resize_nursery(self):
+        """Replace the nursery with a new one of 'nursery_size_wanted'
+        bytes.  Must be called just after a minor collection.  Does nothing
+        if some pinned objects are still in the nursery."""
+        if (self.pinned_objects_in_nursery > 0 or
+                self.nursery_free != self.nursery or
+                self.debug_rotating_nurseries):
+            return
+        debug_start("gc-set-nursery-size")
+        llarena.arena_free(self.nursery)
+        self.nursery_size = self.nursery_size_wanted
+        debug_print("nursery size:", self.nursery_size)
+        self.nursery = self._alloc_nursery()
+        self.nursery_free = self.nursery
+        self.nursery_top = self.nursery + self.nursery_size
+        # a smaller nursery might not be able to hold as many pinned objects
+        if not self.max_number_of_pinned_objects_from_env:
+            self._estimate_max_number_of_pinned_objects()
+        debug_stop("gc-set-nursery-size")
+
     def debug_rotate_nursery(self):
         if self.debug_rotating_nurseries:
             debug_start("gc-debug")
@@ -762,7 +813,12 @@ class IncrementalMiniMarkGC(MovingGCBase):
         in progress, run at least one major collection step.  If there is
         no major GC but the threshold is reached, start a major GC.
         """
+        start = read_timestamp()
         self._minor_collection()
+        if self.max_pause > 0:
+            self._adapt_nursery_to_max_pause(read_timestamp() - start)
+        if self.nursery_size_wanted != self.nursery_size:
+            self._resize_nursery()
 
         # If the gc_state is STATE_SCANNING, we're not in the middle
         # of an incremental major collection.  In that case, wait
@@ -791,6 +847,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 self._minor_collection()
                 self.major_collection_step(extrasize)
 
+        self._record_pause(read_timestamp() - start)
         self.rrc_invoke_callback()
 
 
@@ -1030,6 +1087,61 @@ class IncrementalMiniMarkGC(MovingGCBase):
             if self.max_heap_size < self.next_major_collection_threshold:
                 self.next_major_collection_threshold = self.max_heap_size
 
+    def set_param(self, param_no, value):
+        """Change one of the parameters that are initially read from the
+        PYPY_GC_* environment variables; see rgc.GC_PARAM_*.  Returns
+        False if 'value' is out of range.  A new nursery size is used
+        after the next minor collection, the other parameters when the
+        next major collection starts or ends."""
+        maxint = float(sys.maxint // 2)
+        if param_no == rgc.GC_PARAM_NURSERY:
+            if not (1.0 <= value <= maxint):
+                return False
+            newsize = int(value) & ~(WORD-1)
+            if newsize < self._min_nursery_size():
+                newsize = self._min_nursery_size()
+            self.nursery_size_configured = newsize
+            self.nursery_size_wanted = newsize
+            if not self.min_heap_size_from_env:
+                # like in setup(): 8 times the nursery by default, and see
+                # allocate_nursery().  The limit on the number of pinned
+                # objects is recomputed by _resize_nursery().
+                self.min_heap_size = float(newsize) * max(
+                    8.0, self.major_collection_threshold)
+        elif param_no == rgc.GC_PARAM_MAJOR_COLLECT:
+            if not (value > 1.0):
+                return False
+            self.major_collection_threshold = value
+        elif param_no == rgc.GC_PARAM_MAX:
+            if not (0.0 <= value <= maxint):
+                return False
+            self.set_max_heap_size(int(value))
+            self.max_heap_size_already_raised = False
+        elif param_no == rgc.GC_PARAM_GROWTH:
+            if not (value > 1.0):
+                return False
+            self.growth_rate_max = value
+        elif param_no == rgc.GC_PARAM_INCREMENT_STEP:
+            if not (1.0 <= value <= maxint):
+                return False
+            self.gc_increment_step = r_uint(int(value))
+        else:
+            return False
+        return True
+
+    def get_param(self, param_no):
+        if param_no == rgc.GC_PARAM_NURSERY:
+            return float(self.nursery_size_configured)
+        elif param_no == rgc.GC_PARAM_MAJOR_COLLECT:
+            return self.major_collection_threshold
+        elif param_no == rgc.GC_PARAM_MAX:
+            return self.max_heap_size
+        elif param_no == rgc.GC_PARAM_GROWTH:
+            return self.growth_rate_max
+        elif param_no == rgc.GC_PARAM_INCREMENT_STEP:
+            return float(self.gc_increment_step)
+        return 0.0
+
     def raw_malloc_memory_pressure(self, sizehint, adr):
         # Decrement by 'sizehint' plus a very little bit extra.  This
         # is needed e.g. for _rawffi, which may allocate a lot of tiny
@@ -2306,6 +2418,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
             self.collect_roots()
             self.gc_state = STATE_MARKING
             self.more_objects_to_trace = self.AddressStack()
+            self.marking_rounds = 0
             #END SCANNING
         elif self.gc_state == STATE_MARKING:
             debug_print("number of objects to mark",
@@ -2317,7 +2430,13 @@ class IncrementalMiniMarkGC(MovingGCBase):
             if estimate_from_nursery > estimate:
                 estimate = estimate_from_nursery
             estimate = intmask(estimate)
+            if 0 < self.max_pause_increment_step < estimate:
+                estimate = self.max_pause_increment_step
+            marking_start = read_timestamp()
             remaining = self.visit_all_objects_step(estimate)
+            if self.max_pause > 0:
+                self._adapt_increment_to_max_pause(
+                    estimate - remaining, read_timestamp() - marking_start)
             #
             if remaining >= estimate // 2:
                 if self.more_objects_to_trace.non_empty():
@@ -2325,11 +2444,18 @@ class IncrementalMiniMarkGC(MovingGCBase):
                     # there are more objects added during the marking steps
                     # of this major collection.  Visit them all now.
                     # The idea is to ensure termination at the cost of some
-                    # incrementality, in theory.
+                    # incrementality, in theory.  With a 'max_pause', they
+                    # are only visited by the next steps, but only up to
+                    # MAX_PAUSE_MARKING_ROUNDS times: otherwise a mutator
+                    # that keeps modifying objects could prevent the
+                    # marking from ever finishing.
                     swap = self.objects_to_trace
                     self.objects_to_trace = self.more_objects_to_trace
                     self.more_objects_to_trace = swap
-                    self.visit_all_objects()
+                    self.marking_rounds += 1
+                    if (self.max_pause == 0 or
+                            self.marking_rounds > MAX_PAUSE_MARKING_ROUNDS):
+                        self.visit_all_objects()
 
             # XXX A simplifying assumption that should be checked,
             # finalizers/weak references are rare and short which means that
@@ -3000,8 +3126,77 @@ class IncrementalMiniMarkGC(MovingGCBase):
                                self.ac.total_memory_used))
         elif stats_no == rgc.NURSERY_SIZE:
             return intmask(self.nursery_size)
+        elif stats_no == rgc.MAX_PAUSE:
+            return self.max_pause
+        elif (rgc.PAUSE_HISTOGRAM <= stats_no <
+                  rgc.PAUSE_HISTOGRAM + rgc.PAUSE_HISTOGRAM_SIZE):
+            return self.pause_histogram[stats_no - rgc.PAUSE_HISTOGRAM]
         return 0
 
+    # ----------
+    # Pause-time budget
+
+    def set_max_pause(self, duration):
+        """Try to keep the GC pauses below 'duration', in the units of
+        read_timestamp(), by adapting the size of the marking steps and
+        of the nursery.  0 means no limit."""
+        if duration < 0:
+            duration = 0
+        self.max_pause = duration
+        self.max_pause_increment_step = 0
+        if duration == 0:
+            self.nursery_size_wanted = self.nursery_size_configured
+
+    def _min_nursery_size(self):
+        return 2 * (self.nonlarge_max + 1)
+
+    def _adapt_nursery_to_max_pause(self, duration):
+        # The duration of a minor collection is roughly proportional to
+        # the size of the surviving objects, and so to the size of the
+        # nursery.  It should not take more than half of 'max_pause':
+        # the other half is for the major collection step that follows.
+        # Don't grow the nursery again before it is clearly fast enough,
+        # so that it doesn't oscillate between two sizes.
+        if duration > self.max_pause // 2:
+            newsize = self.nursery_size // 2
+        elif duration < self.max_pause // 8:
+            newsize = self.nursery_size * 2
+        else:
+            return
+        newsize &= ~(WORD-1)
+        if newsize > self.nursery_size_configured:
+            newsize = self.nursery_size_configured
+        if newsize < self._min_nursery_size():
+            newsize = self._min_nursery_size()
+        self.nursery_size_wanted = newsize
+
+    def _adapt_increment_to_max_pause(self, visited, duration):
+        # Adapt the number of bytes visited by the next marking step to
+        # the speed of this one, aiming at half of 'max_pause'.  Average
+        # with the previous value to smooth out the variations.
+        if visited <= 0 or duration <= 0:
+            return
+        step = float(visited) * (float(self.max_pause) * 0.5) / float(duration)
+        if self.max_pause_increment_step > 0:
+            step = (step + float(self.max_pause_increment_step)) * 0.5
+        minstep = float(self.nonlarge_max + 1)
+        if step < minstep:
+            step = minstep
+        maxstep = float(sys.maxint // 2)
+        if step > maxstep:
+            step = maxstep
+        self.max_pause_increment_step = int(step)
+
+    def _record_pause(self, duration):
+        # 'pause_histogram[i]' counts the pauses that took between 2**i
+        # and 2**(i+1) units of read_timestamp()
+        i = 0
+        duration >>= 1
+        while duration > 0 and i < rgc.PAUSE_HISTOGRAM_SIZE - 1:
+            duration >>= 1
+            i += 1
+        self.pause_histogram[i] += 1
+
 
     # ----------
     # RawRefCount
@@ -771,3 +771,134 @@ class TestIncrementalMiniMarkGCFull(DirectGCTest):
                 assert elem.next == lltype.nullptr(S)
 
             
+
+    def test_max_pause_resizes_nursery(self):
+        from rpython.rlib import rgc
+        gc = self.gc
+        size = gc.nursery_size
+        p = self.malloc(S)
+        p.x = 42
+        self.stackroots.append(p)
+        gc.set_max_pause(1)     # impossible to reach
+        gc.minor_collection_with_major_progress()
+        assert gc.nursery_size == size // 2
+        assert gc.get_stats(rgc.NURSERY_SIZE) == size // 2
+        for i in range(5):
+            gc.minor_collection_with_major_progress()
+        assert gc.nursery_size == gc._min_nursery_size()
+        for i in range(50):
+            self.malloc(S)
+        assert self.stackroots[0].x == 42
+        gc.set_max_pause(0)
+        gc.minor_collection_with_major_progress()
+        assert gc.nursery_size == size
+        assert self.stackroots[0].x == 42
+
+    def test_max_pause_resizes_max_pinned(self):
+        gc = self.gc
+        max_pinned = gc.max_number_of_pinned_objects
+        gc.set_max_pause(1)     # impossible to reach
+        for i in range(3):
+            gc.minor_collection_with_major_progress()
+        assert gc.max_number_of_pinned_objects < max_pinned
+        assert gc.max_number_of_pinned_objects == (
+            gc.nursery_size // ((gc.nonlarge_max + 1) * 2))
+        gc.set_max_pause(0)
+        gc.minor_collection_with_major_progress()
+        assert gc.max_number_of_pinned_objects == max_pinned
+
+    def test_max_pause_marking_terminates(self):
+        gc = self.gc
+        for i in range(20):
+            p = self.malloc(S)
+            p.x = i
+            self.stackroots.append(p)
+        gc.minor_collection_with_major_progress()
+        gc.debug_gc_step_until(incminimark.STATE_MARKING)
+        gc.set_max_pause(1)
+        obj = llmemory.cast_ptr_to_adr(self.stackroots[0])
+        for i in range(incminimark.MAX_PAUSE_MARKING_ROUNDS * 10):
+            if gc.gc_state != incminimark.STATE_MARKING:
+                break
+            # like the write barrier, when the mutator keeps modifying
+            # an object which was already visited
+            gc._add_to_more_objects_to_trace(obj, None)
+            gc.debug_gc_step(1)
+        assert gc.gc_state != incminimark.STATE_MARKING
+        assert gc.marking_rounds == incminimark.MAX_PAUSE_MARKING_ROUNDS + 1
+        gc.debug_gc_step_until(incminimark.STATE_SCANNING)
+        assert [p.x for p in self.stackroots] == range(20)
+
+    def test_max_pause_increment_step(self):
+        from rpython.rlib import rgc
+        gc = self.gc
+        gc.set_max_pause(1)
+        assert gc.get_stats(rgc.MAX_PAUSE) == 1
+        for i in range(20):
+            p = self.malloc(S)
+            p.x = i
+            self.stackroots.append(p)
+        gc.minor_collection_with_major_progress()
+        gc.debug_gc_step_until(incminimark.STATE_MARKING)
+        gc.debug_gc_step(1)
+        assert gc.max_pause_increment_step == gc.nonlarge_max + 1
+        gc.debug_gc_step_until(incminimark.STATE_SCANNING)
+        assert [p.x for p in self.stackroots] == range(20)
+        gc.set_max_pause(0)
+        assert gc.max_pause_increment_step == 0
+
+    def test_pause_histogram(self):
+        from rpython.rlib import rgc
+        gc = self.gc
+        def total():
+            return sum([gc.get_stats(rgc.PAUSE_HISTOGRAM + i)
+                        for i in range(rgc.PAUSE_HISTOGRAM_SIZE)])
+        assert total() == 0
+        for i in range(3):
+            gc.minor_collection_with_major_progress()
+        assert total() == 3
+        gc._record_pause(0)
+        gc._record_pause(5)
+        gc._record_pause(1 << 60)
+        assert gc.get_stats(rgc.PAUSE_HISTOGRAM) >= 1
+        assert gc.get_stats(rgc.PAUSE_HISTOGRAM + 2) >= 1
+        assert gc.get_stats(rgc.PAUSE_HISTOGRAM +
+                            rgc.PAUSE_HISTOGRAM_SIZE - 1) == 1
+
+    def test_set_param(self):
+        from rpython.rlib import rgc
+        gc = self.gc
+        size = gc.nursery_size
+        p = self.malloc(S)
+        p.x = 42
+        self.stackroots.append(p)
+        max_pinned = gc.max_number_of_pinned_objects
+        assert gc.set_param(rgc.GC_PARAM_NURSERY, float(size * 4 + 3))
+        assert gc.get_param(rgc.GC_PARAM_NURSERY) == size * 4
+        assert gc.nursery_size == size      # not yet
+        assert gc.min_heap_size == size * 4 * 8.0
+        gc.minor_collection_with_major_progress()
+        assert gc.nursery_size == size * 4
+        assert gc.max_number_of_pinned_objects == max_pinned * 4
+        for i in range(50):
+            self.malloc(S)
+        assert self.stackroots[0].x == 42
+        assert gc.set_param(rgc.GC_PARAM_NURSERY, 1.0)
+        gc.minor_collection_with_major_progress()
+        assert gc.nursery_size == gc._min_nursery_size()
+        assert not gc.set_param(rgc.GC_PARAM_NURSERY, -5.0)
+        #
+        assert gc.set_param(rgc.GC_PARAM_MAJOR_COLLECT, 3.5)
+        assert gc.major_collection_threshold == 3.5
+        assert not gc.set_param(rgc.GC_PARAM_MAJOR_COLLECT, 1.0)
+        assert gc.set_param(rgc.GC_PARAM_GROWTH, 1.25)
+        assert gc.get_param(rgc.GC_PARAM_GROWTH) == 1.25
+        assert gc.set_param(rgc.GC_PARAM_INCREMENT_STEP, 12345.0)
+        assert gc.get_param(rgc.GC_PARAM_INCREMENT_STEP) == 12345.0
+        assert not gc.set_param(rgc.GC_PARAM_INCREMENT_STEP, 0.0)
+        assert gc.set_param(rgc.GC_PARAM_MAX, 1e7)
+        assert gc.get_param(rgc.GC_PARAM_MAX) == 1e7
+        assert gc.next_major_collection_threshold <= 1e7
+        assert gc.set_param(rgc.GC_PARAM_MAX, 0.0)
+        assert not gc.set_param(-1, 1.5)
+        assert gc.get_param(-1) == 0.0
@@ -417,6 +417,20 @@ class BaseFrameworkGCTransformer(GCTransformer):
             self.get_stats_ptr = getfn(get_stats, [annmodel.SomeInteger()],
                 annmodel.SomeInteger())
 
+        if getattr(GCClass, 'set_max_pause', False):
+            self.set_max_pause_ptr = getfn(GCClass.set_max_pause.im_func,
+                                           [s_gc, annmodel.SomeInteger()],
+                                           annmodel.s_None)
+
+        if getattr(GCClass, 'set_param', False):
+            self.set_param_ptr = getfn(GCClass.set_param.im_func,
+                                       [s_gc, annmodel.SomeInteger(),
+                                        annmodel.SomeFloat()],
+                                       annmodel.s_Bool)
+            self.get_param_ptr = getfn(GCClass.get_param.im_func,
+                                       [s_gc, annmodel.SomeInteger()],
+                                       annmodel.SomeFloat())
+
 
         self.identityhash_ptr = getfn(GCClass.identityhash.im_func,
                                       [s_gc, s_gcref],
@@ -1170,6 +1184,33 @@ class BaseFrameworkGCTransformer(GCTransformer):
                                   self.c_const_gc,
                                   v_size])
 
+    def gct_gc_set_max_pause(self, hop):
+        if hasattr(self, 'set_max_pause_ptr'):
+            [v_duration] = hop.spaceop.args
+            hop.genop("direct_call", [self.set_max_pause_ptr,
+                                      self.c_const_gc,
+                                      v_duration])
+
+    def gct_gc_set_param(self, hop):
+        if hasattr(self, 'set_param_ptr'):
+            [v_param_no, v_value] = hop.spaceop.args
+            hop.genop("direct_call", [self.set_param_ptr, self.c_const_gc,
+                                      v_param_no, v_value],
+                      resultvar=hop.spaceop.result)
+        else:
+            hop.genop("same_as", [rmodel.inputconst(lltype.Bool, False)],
+                      resultvar=hop.spaceop.result)
+
+    def gct_gc_get_param(self, hop):
+        if hasattr(self, 'get_param_ptr'):
+            [v_param_no] = hop.spaceop.args
+            hop.genop("direct_call", [self.get_param_ptr, self.c_const_gc,
+                                      v_param_no],
+                      resultvar=hop.spaceop.result)
+        else:
+            hop.genop("same_as", [rmodel.inputconst(lltype.Float, 0.0)],
+                      resultvar=hop.spaceop.result)
+
     def gct_gc_pin(self, hop):
         if not hasattr(self, 'pin_ptr'):
             c_false = rmodel.inputconst(lltype.Bool, False)
@@ -367,6 +367,21 @@ class BaseGCTransformer(object):
     def gct_gc_unpin(self, hop):
         pass
 
+    def gct_gc_set_max_pause(self, hop):
+        pass
+
+    def gct_gc_set_param(self, hop):
+        op = hop.spaceop
+        hop.genop("same_as",
+                  [rmodel.inputconst(lltype.Bool, False)],
+                  resultvar=op.result)
+
+    def gct_gc_get_param(self, hop):
+        op = hop.spaceop
+        hop.genop("same_as",
+                  [rmodel.inputconst(lltype.Float, 0.0)],
+                  resultvar=op.result)
+
     def gct_gc__is_pinned(self, hop):
         op = hop.spaceop
         hop.genop("same_as",
@@ -561,6 +561,10 @@ PARAMETER_DOCS = {
     'vec_cost': 'threshold for which traces to bail. Unpacking increases the counter,'\
                 ' vector operation decrease the cost',
     'vec_all': 'try to vectorize trace loops that occur outside of the numpypy library',
+    'max_code_size': 'maximum number of bytes of machine code; above it, '
+                     'the least recently entered loops are freed (0=no limit)',
+    'frames_cache': 'keep the decoded resume data of the guards that fail '
+                    'more than once without a bridge (1/0)',
 }
 
 PARAMETERS = {'threshold': 1039, # just above 1024, prime
@@ -579,6 +583,8 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'vec': 0,
               'vec_all': 0,
               'vec_cost': 0,
+              'max_code_size': 0,
+              'frames_cache': 0,
               }
 unroll_parameters = unrolling_iterable(PARAMETERS.items())
 
@@ -1056,9 +1062,13 @@ class JitDebugInfo(object):
     looptoken - description of a loop
     fail_descr - fail descr or None
     asminfo - extra assembler information
+    tracing_time - seconds spent tracing and optimizing, before the backend
+    backend_time - seconds spent in the backend
     """
 
     asminfo = None
+    tracing_time = 0.0
+    backend_time = 0.0
     def __init__(self, jitdriver_sd, logger, looptoken, operations, type,
                  greenkey=None, fail_descr=None):
         self.jitdriver_sd = jitdriver_sd
@@ -1151,6 +1161,15 @@ class JitHookInterface(object):
         instance, overwrite for custom behavior
         """
 
+    def on_blackhole(self, fail_descr, duration):
+        """ A hook called each time the failure of a guard is handled by
+        the blackhole interpreter instead of a bridge, with the descr of
+        the guard and the time until the regular interpreter resumes.  This
+        includes the residual calls done by the blackhole interpreter,
+        including recursive calls to the portal and the machine code they
+        run.
+        """
+
 def record_exact_class(value, cls):
     """
     Assure the JIT that value is an instance of cls. This is a precise
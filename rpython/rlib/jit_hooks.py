@@ -120,6 +120,10 @@ def stats_get_counter_value(warmrunnerdesc, no):
 def stats_get_times_value(warmrunnerdesc, no):
     return warmrunnerdesc.metainterp_sd.profiler.get_times(no)
 
+@register_helper(annmodel.SomeFloat())
+def stats_get_max_times_value(warmrunnerdesc, no):
+    return warmrunnerdesc.metainterp_sd.profiler.get_max_time(no)
+
 LOOP_RUN_CONTAINER = lltype.GcArray(lltype.Struct('elem',
                                                   ('type', lltype.Char),
                                                   ('number', lltype.Signed),
@@ -137,6 +141,10 @@ def stats_asmmemmgr_allocated(warmrunnerdesc):
 def stats_asmmemmgr_used(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.asmmemmgr.get_stats()[1]
 
+@register_helper(annmodel.SomeInteger())
+def stats_memmgr_evicted_loops(warmrunnerdesc):
+    return warmrunnerdesc.memory_manager.evicted_loops
+
 # ---------------------- jitcell interface ----------------------
 
 def _new_hook(name, resulttype):
@@ -166,3 +174,4 @@ get_jitcell_at_key = _new_hook('get_jitcell_at_key', SomePtr(llmemory.GCREF))
 trace_next_iteration = _new_hook('trace_next_iteration', None)
 dont_trace_here = _new_hook('dont_trace_here', None)
 trace_next_iteration_hash = _new_hook('trace_next_iteration_hash', None)
+trace_when_reached = _new_hook('trace_when_reached', None)
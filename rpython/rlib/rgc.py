@@ -19,6 +19,30 @@ def set_max_heap_size(nbytes):
     """
     pass
 
+def set_max_pause(duration):
+    """Ask the GC to try to keep its pauses below 'duration', expressed in
+    the units of read_timestamp().  0 means no limit.
+    """
+    pass
+
+# The parameters of the GC which can be changed at runtime with
+# set_gc_param().  They correspond to the PYPY_GC_* environment variables.
+(GC_PARAM_NURSERY, GC_PARAM_MAJOR_COLLECT, GC_PARAM_MAX, GC_PARAM_GROWTH,
+ GC_PARAM_INCREMENT_STEP) = range(5)
+
+@not_rpython
+def set_gc_param(param_no, value):
+    """Change the GC parameter 'param_no' to the float 'value'.  Returns
+    False if the GC does not support it or if 'value' is out of range.
+    """
+    raise NotImplementedError
+
+@not_rpython
+def get_gc_param(param_no):
+    """Returns the current value of the GC parameter 'param_no' as a float.
+    """
+    raise NotImplementedError
+
 def must_split_gc_address_space():
     """Returns True if we have a "split GC address space", i.e. if
     we are translating with an option that doesn't support taking raw
@@ -144,6 +168,43 @@ class SetMaxHeapSizeEntry(ExtRegistryEntry):
         return hop.genop('gc_set_max_heap_size', [v_nbytes],
                          resulttype=lltype.Void)
 
+class SetGcParamEntry(ExtRegistryEntry):
+    _about_ = set_gc_param
+
+    def compute_result_annotation(self, s_param_no, s_value):
+        from rpython.annotator import model as annmodel
+        return annmodel.s_Bool
+
+    def specialize_call(self, hop):
+        args_v = hop.inputargs(lltype.Signed, lltype.Float)
+        hop.exception_cannot_occur()
+        return hop.genop('gc_set_param', args_v, resulttype=lltype.Bool)
+
+class GetGcParamEntry(ExtRegistryEntry):
+    _about_ = get_gc_param
+
+    def compute_result_annotation(self, s_param_no):
+        from rpython.annotator import model as annmodel
+        return annmodel.SomeFloat()
+
+    def specialize_call(self, hop):
+        args_v = hop.inputargs(lltype.Signed)
+        hop.exception_cannot_occur()
+        return hop.genop('gc_get_param', args_v, resulttype=lltype.Float)
+
+class SetMaxPauseEntry(ExtRegistryEntry):
+    _about_ = set_max_pause
+
+    def compute_result_annotation(self, s_duration):
+        from rpython.annotator import model as annmodel
+        return annmodel.s_None
+
+    def specialize_call(self, hop):
+        [v_duration] = hop.inputargs(lltype.Signed)
+        hop.exception_cannot_occur()
+        return hop.genop('gc_set_max_pause', [v_duration],
+                         resulttype=lltype.Void)
+
 def can_move(p):
     """Check if the GC object 'p' is at an address that can move.
     Must not be called with None.  With non-moving GCs, it is always False.
@@ -704,7 +765,13 @@ def cast_gcref_to_int(gcref):
 (TOTAL_MEMORY, TOTAL_ALLOCATED_MEMORY, TOTAL_MEMORY_PRESSURE,
  PEAK_MEMORY, PEAK_ALLOCATED_MEMORY, TOTAL_ARENA_MEMORY,
  TOTAL_RAWMALLOCED_MEMORY, PEAK_ARENA_MEMORY, PEAK_RAWMALLOCED_MEMORY,
- NURSERY_SIZE) = range(10)
+ NURSERY_SIZE, MAX_PAUSE) = range(11)
+
+# get_stats(PAUSE_HISTOGRAM + i) returns the number of GC pauses that took
+# between 2**i and 2**(i+1) units of read_timestamp().  The first bucket
+# also counts the shorter pauses, and the last one the longer pauses.
+PAUSE_HISTOGRAM = 64
+PAUSE_HISTOGRAM_SIZE = 48
 
 @not_rpython
 def get_stats(stat_no):
@@ -1,6 +1,7 @@
 
 from zipfile import ZIP_STORED, ZIP_DEFLATED
-from rpython.rlib.streamio import open_file_as_stream
+from rpython.rlib.streamio import open_file_as_stream, Stream
+from rpython.rlib import rmmap
 from rpython.rlib.rstruct.runpack import runpack
 from rpython.rlib.rarithmetic import r_uint, intmask
 from rpython.rtyper.tool.rffi_platform import CompilationError
@@ -159,6 +160,56 @@ def _EndRecData(fpin):
             return EndRecStruct(endrec, comment, filesize - END_BLOCK + start)
     return      # Error, return None
 
+class MMapStream(Stream):
+    """A read-only stream over a memory map of the whole archive.  Reading
+    from it doesn't need any system call."""
+
+    def __init__(self, mmap):
+        self.mmap = mmap
+        self.pos = 0
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence):
+        if whence == 0:
+            self.pos = max(0, offset)
+        elif whence == 1:
+            self.pos = max(0, self.pos + offset)
+        elif whence == 2:
+            self.pos = max(0, self.mmap.size + offset)
+        else:
+            raise ValueError("seek(): whence must be 0, 1 or 2")
+
+    def read(self, n):
+        start = self.pos
+        end = min(start + n, self.mmap.size)
+        if end <= start:
+            return ''
+        self.pos = end
+        return self.mmap.getslice(start, end - start)
+
+    def readall(self):
+        return self.read(self.mmap.size - self.pos)
+
+    def close(self):
+        pass
+
+O_BINARY = getattr(os, 'O_BINARY', 0)
+
+def _map_file(filename):
+    """Map the whole file read-only, or return None if it cannot be."""
+    try:
+        fd = os.open(filename, os.O_RDONLY | O_BINARY, 0)
+    except OSError:
+        return None
+    try:
+        return rmmap.mmap(fd, 0, access=rmmap.ACCESS_READ)
+    except (rmmap.RMMapError, OSError):
+        return None
+    finally:
+        os.close(fd)
+
 class RZipInfo(object):
     def __init__(self, filename, date_time=(1980,1,1,0,0,0)):
         self.orig_filename = filename
@@ -192,7 +243,8 @@ class RZipInfo(object):
         # file_size             Size of the uncompressed file
 
 class RZipFile(object):
-    def __init__(self, zipname, mode='r', compression=ZIP_STORED):
+    def __init__(self, zipname, mode='r', compression=ZIP_STORED,
+                 use_mmap=False):
         if mode != 'r':
             raise TypeError("Read only support by now")
         self.compression = compression
@@ -202,6 +254,11 @@ class RZipFile(object):
         if 'b' not in mode:
             mode += 'b'
         self.mode = mode
+        # with use_mmap, the archive is mapped in memory and the directory
+        # and the members are read from there
+        self.mmap = None
+        if use_mmap:
+            self.mmap = _map_file(zipname)
         fp = self.get_fp()
         try:
             self._GetContents(fp)
@@ -209,8 +266,20 @@ class RZipFile(object):
             fp.close()
 
     def get_fp(self):
+        if self.mmap is not None and self._mmap_is_valid():
+            return MMapStream(self.mmap)
         return open_file_as_stream(self.filename, self.mode, 1024)
 
+    def _mmap_is_valid(self):
+        # reading a mapping past the current end of a file that was
+        # truncated gives a SIGBUS: if the size of the archive changed,
+        # go back to reading the file
+        try:
+            st = os.stat(self.filename)
+        except OSError:
+            return False
+        return st.st_size == self.mmap.size
+
     def _GetContents(self, fp):
         endrec = _EndRecData(fp)
         if not endrec:
@@ -238,7 +307,8 @@ class RZipFile(object):
                      + centdir[_CD_EXTRA_FIELD_LENGTH]
                      + centdir[_CD_COMMENT_LENGTH])
             x.header_offset = centdir[_CD_LOCAL_HEADER_OFFSET] + concat
-            # file_offset must be computed below...
+            # file_offset is computed from the local header on demand
+            x.file_offset = -1
             (x.create_version, x.create_system, x.extract_version, x.reserved,
                 x.flag_bits, x.compress_type, t, d,
                 crc, x.compress_size, x.file_size) = centdir[1:12]
@@ -251,24 +321,28 @@ class RZipFile(object):
                                      t>>11, (t>>5)&0x3F, (t&0x1F) * 2 )
             self.filelist.append(x)
             self.NameToInfo[x.filename] = x
-        for data in self.filelist:
+        fp.seek(self.start_dir, 0)
+
+    def _get_file_offset(self, fp, data):
+        # file_offset is computed here, since the extra field for the
+        # central directory and for the local file header refer to
+        # different fields, and they can have different lengths.  This is
+        # only done for the members that are actually read, which avoids
+        # two reads per member when opening a large archive.
+        if data.file_offset < 0:
             fp.seek(data.header_offset, 0)
             fheader = fp.read(30)
             if fheader[0:4] != stringFileHeader:
                 raise BadZipfile("Bad magic number for file header")
             fheader = runpack(structFileHeader, fheader)
-            # file_offset is computed here, since the extra field for
-            # the central directory and for the local file header
-            # refer to different fields, and they can have different
-            # lengths
-            data.file_offset = (data.header_offset + 30
-                                + fheader[_FH_FILENAME_LENGTH]
-                                + fheader[_FH_EXTRA_FIELD_LENGTH])
             fname = fp.read(fheader[_FH_FILENAME_LENGTH])
             if fname != data.orig_filename:
                 raise BadZipfile('File name in directory "%s" and '
                     'header "%s" differ.' % (data.orig_filename, fname))
-        fp.seek(self.start_dir, 0)
+            data.file_offset = (data.header_offset + 30
+                                + fheader[_FH_FILENAME_LENGTH]
+                                + fheader[_FH_EXTRA_FIELD_LENGTH])
+        return data.file_offset
 
     def getinfo(self, filename):
         """Return the instance of ZipInfo given 'filename'."""
@@ -279,7 +353,7 @@ class RZipFile(object):
         fp = self.get_fp()
         try:
             filepos = fp.tell()
-            fp.seek(zinfo.file_offset, 0)
+            fp.seek(self._get_file_offset(fp, zinfo), 0)
             bytes = fp.read(intmask(zinfo.compress_size))
             fp.seek(filepos, 0)
             if zinfo.compress_type == ZIP_STORED:
@@ -43,6 +43,22 @@ class BaseTestRZipFile(BaseRtypingTest):
         assert one()
         assert self.interpret(one, [])
 
+    def test_rzipfile_mmap(self):
+        zipname = self.zipname
+        year = self.year
+        compression = self.compression
+        def one():
+            rzip = RZipFile(zipname, "r", compression, use_mmap=True)
+            info = rzip.getinfo('one')
+            return (rzip.mmap is not None and
+                    info.date_time[0] == year and
+                    rzip.read('one') == 'stuff\n' and
+                    rzip.read('three') == 'hello, world' and
+                    rzip.read('one') == 'stuff\n')
+
+        assert one()
+        assert self.interpret(one, [])
+
 class TestRZipFile(BaseTestRZipFile):
     compression = ZIP_STORED
 
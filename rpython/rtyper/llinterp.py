@@ -901,6 +901,15 @@ class LLFrame(object):
     def op_gc_set_max_heap_size(self, maxsize):
         raise NotImplementedError("gc_set_max_heap_size")
 
+    def op_gc_set_max_pause(self, duration):
+        raise NotImplementedError("gc_set_max_pause")
+
+    def op_gc_set_param(self, param_no, value):
+        raise NotImplementedError("gc_set_param")
+
+    def op_gc_get_param(self, param_no):
+        raise NotImplementedError("gc_get_param")
+
     def op_gc_asmgcroot_static(self, index):
         raise NotImplementedError("gc_asmgcroot_static")
 
@@ -1704,6 +1704,69 @@ class TestIncrementalMiniMarkGC(TestMiniMarkGC):
         res = self.run("total_memory_pressure")
         assert res == 30 # total reachable is 3
 
+    def define_max_pause(cls):
+        class A(object):
+            pass
+
+        def f():
+            nursery_size = rgc.get_stats(rgc.NURSERY_SIZE)
+            rgc.set_max_pause(1)      # impossible to reach
+            head = None
+            for i in range(2000000):
+                a = A()
+                a.i = i
+                a.next = head
+                a.l = [i] * 16       # fill the big nursery a bit faster
+                if i % 10 == 0:
+                    head = a
+            ok = 1
+            i = 1999990
+            while head is not None:
+                if head.i != i or head.l[15] != i:
+                    ok = 0
+                i -= 10
+                head = head.next
+            total = 0
+            for i in range(rgc.PAUSE_HISTOGRAM_SIZE):
+                total += rgc.get_stats(rgc.PAUSE_HISTOGRAM + i)
+            shrunk = rgc.get_stats(rgc.NURSERY_SIZE) < nursery_size
+            return (ok * 100 + (total > 0) * 10 + shrunk +
+                    (rgc.get_stats(rgc.MAX_PAUSE) == 1) * 1000)
+        return f
+
+    def test_max_pause(self):
+        res = self.run("max_pause")
+        assert res == 1111
+
+    def define_gc_param(cls):
+        class A(object):
+            pass
+
+        def f():
+            res = 0
+            if rgc.set_gc_param(rgc.GC_PARAM_NURSERY, 1024.0 * 1024.0):
+                res += 1
+            if not rgc.set_gc_param(rgc.GC_PARAM_GROWTH, 0.5):
+                res += 10
+            if rgc.set_gc_param(rgc.GC_PARAM_GROWTH, 1.25):
+                res += 100
+            if rgc.get_gc_param(rgc.GC_PARAM_GROWTH) == 1.25:
+                res += 1000
+            a = A()
+            for i in range(1000000):
+                a = A()
+                a.l = [i] * 16
+            if a.l[15] == 999999:
+                res += 10000
+            if rgc.get_stats(rgc.NURSERY_SIZE) == 1024 * 1024:
+                res += 100000
+            return res
+        return f
+
+    def test_gc_param(self):
+        res = self.run("gc_param")
+        assert res == 111111
+
     def define_random_pin(self):
         class A:
             foo = None